@@ -0,0 +1,58 @@
+# app/api/admin_routes.py
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.core.auth import require_admin_user_id
+from app.core.executors import run_in_pool
+from app.services.cv_vectors import backfill_cv_vectors
+from app.services.skill_taxonomy import get_taxonomy, reload_taxonomy
+from app.services.tfidf_model import refit_tfidf_model, tfidf_store
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.get("/tfidf")
+async def tfidf_model_status(_: str = Depends(require_admin_user_id)):
+    model = await run_in_pool("scoring", tfidf_store.sync)
+    if model is None:
+        return {"fitted": False, "version": None}
+    return {
+        "fitted": True,
+        "version": model.version,
+        "fitted_at": model.fitted_at,
+        "n_docs": model.n_docs,
+        "vocabulary_size": len(model.vectorizer.vocabulary_),
+    }
+
+
+@router.post("/tfidf/refit")
+async def refit_tfidf(_: str = Depends(require_admin_user_id)):
+    try:
+        model = await refit_tfidf_model()
+    except BlockingIOError:
+        raise HTTPException(status_code=409, detail="A refit is already running in another worker.")
+    if model is None:
+        raise HTTPException(status_code=409, detail="Not enough stored CVs / job descriptions to fit a model yet.")
+    return {"version": model.version, "n_docs": model.n_docs}
+
+
+@router.post("/cv-vectors/backfill")
+async def backfill_vectors(force: bool = False, _: str = Depends(require_admin_user_id)):
+    if await run_in_pool("scoring", tfidf_store.sync) is None:
+        raise HTTPException(status_code=409, detail="No TF-IDF model has been fitted yet.")
+    return await backfill_cv_vectors(force=force)
+
+
+@router.get("/skills")
+async def skill_taxonomy_status(_: str = Depends(require_admin_user_id)):
+    taxonomy = get_taxonomy()
+    return {"version": taxonomy.version, "skills": len(taxonomy.skills)}
+
+
+@router.post("/skills/reload")
+async def reload_skill_taxonomy(_: str = Depends(require_admin_user_id)):
+    try:
+        taxonomy = reload_taxonomy()
+    except Exception as e:
+        # the previous taxonomy stays active
+        raise HTTPException(status_code=400, detail=f"Invalid skill taxonomy: {type(e).__name__}: {e}")
+    return {"version": taxonomy.version, "skills": len(taxonomy.skills)}
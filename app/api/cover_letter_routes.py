@@ -1,27 +1,38 @@
 # app/api/cover_letter_routes.py
+import json
 import os
-from bson import ObjectId
-from fastapi import APIRouter, HTTPException, Depends
+import re
+from typing import Any, Dict, Iterator, List, Optional
 
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from fastapi.responses import StreamingResponse
+
+from app.core import metrics
 from app.core.auth import get_current_user_id
+from app.core.pagination import build_projection, set_next_cursor
+from app.core.tasks import register_task, submit_task
 from app.schemas.cover_letter_schema import CoverLetterRequest
+from app.services.cover_letter_cache import (
+    cover_letter_cache_key,
+    get_cached_cover_letter,
+    put_cached_cover_letter,
+)
 from app.services.cover_letter_service import generate_cover_letter_text
-from app.services.openai_cover_letter import generate_cover_letter_llm
+from app.services.openai_cover_letter import generate_cover_letter_llm, stream_cover_letter_llm
 from app.services.cover_letter_repository import (
     save_cover_letter,
     get_latest_cover_letter_by_job_id,
     get_cover_letter_history_by_job_id,
 )
-from app.core.database import cvs_collection
+from app.services.cv_repository import get_cv_profile_for_user
 
 router = APIRouter()
 
-def _to_object_id(value: str):
-    try:
-        return ObjectId(value)
-    except Exception:
-        return None
-
+# history `fields` name -> stored field
+_HISTORY_FIELDS = {"tone": "tone", "mode": "mode", "note": "note", "cover_letter": "text"}
+_HISTORY_SUMMARY = ("tone", "mode", "note")
+# Words per SSE delta when streaming a template letter
+TEMPLATE_STREAM_WORDS = int(os.getenv("TEMPLATE_STREAM_WORDS", "8"))
 
 @router.get("/cover-letter/latest/{job_id}")
 async def get_latest_cover_letter(
@@ -43,43 +54,101 @@ async def get_latest_cover_letter(
 
 
 @router.get("/cover-letter/history/{job_id}")
-async def get_cover_letter_history(job_id: str):
-    docs = await get_cover_letter_history_by_job_id(job_id)
-    return [
+async def get_cover_letter_history(
+    job_id: str,
+    response: Response,
+    limit: int = Query(default=25, ge=1, le=200),
+    after: Optional[str] = Query(default=None, description="X-Next-Cursor from the previous page"),
+    fields: Optional[str] = Query(default=None, description="Comma-separated: tone, mode, note, cover_letter"),
+    summary: bool = Query(default=False, description="Metadata only (no letter bodies)"),
+    user_id: str = Depends(get_current_user_id),
+):
+    selected = build_projection(fields, summary, (), _HISTORY_FIELDS, _HISTORY_SUMMARY)
+    projection = {"job_id": 1, "created_at": 1, **{_HISTORY_FIELDS[f]: 1 for f in selected}}
+
+    docs, next_cursor = await get_cover_letter_history_by_job_id(
+        user_id=user_id, job_id=job_id, limit=limit, after=after, projection=projection
+    )
+    set_next_cursor(response, next_cursor)
+
+    items = []
+    for d in docs:
+        item = {"id": str(d.get("_id")), "job_id": d.get("job_id")}
+        for name in selected:
+            item[name] = d.get(_HISTORY_FIELDS[name], "" if name == "cover_letter" else None)
+        item["created_at"] = d.get("created_at")
+        items.append(item)
+    return items
+
+
+async def _load_cv_for_letter(cv_id: str, user_id: str):
+    # CV lookup (by _id, scoped to this user; shared cache with /jobs/match)
+    cv_doc = await get_cv_profile_for_user(cv_id, user_id)
+    if not cv_doc:
+        raise HTTPException(status_code=404, detail="CV not found")
+    return cv_doc
+
+
+def _cache_key(user_id: str, cv_doc, req: CoverLetterRequest) -> str:
+    return cover_letter_cache_key(
+        user_id, cv_doc, req.job_title, req.company, req.job_description, req.tone or "professional"
+    )
+
+
+async def _cache_letter(cache_key: str, letter: str) -> None:
+    # the letter is already generated: a failed cache write must not discard it
+    try:
+        await put_cached_cover_letter(cache_key, letter)
+    except Exception as e:
+        metrics.incr("cover_letter_cache_write_failures")
+        print(f"Cover letter cache write failed: {type(e).__name__}: {e}")
+
+
+async def _persist_cover_letter(user_id: str, req: CoverLetterRequest, letter: str, mode: str, note, cached: bool = False):
+    # a cached letter that is already the latest for this job is not saved again
+    if cached:
+        latest = await get_latest_cover_letter_by_job_id(user_id=user_id, job_id=req.job_id)
+        if latest and latest.get("text") == letter:
+            return latest["_id"]
+
+    # ✅ Persist as history (forever) scoped to this user + job
+    return await save_cover_letter(
         {
-            "id": str(d.get("_id")),
-            "job_id": d.get("job_id"),
-            "tone": d.get("tone"),
-            "mode": d.get("mode"),
-            "note": d.get("note"),
-            "cover_letter": d.get("text", ""),
-            "created_at": d.get("created_at"),
+            "user_id": user_id,  # ✅ critical
+            "cv_id": req.cv_id,
+            "job_id": req.job_id,
+            "job_title": req.job_title,
+            "company": req.company,
+            "tone": req.tone or "professional",
+            "text": letter,
+            "mode": mode,
+            "note": note,
         }
-        for d in (docs or [])
-    ]
+    )
 
 
-@router.post("/cover-letter/generate")
-async def generate_cover_letter(
-    req: CoverLetterRequest,
-    user_id: str = Depends(get_current_user_id),
-):
+async def _generate_cover_letter(user_id: str, req: CoverLetterRequest) -> Dict[str, Any]:
     # 1) CV lookup
-    cv_doc = await cvs_collection.find_one({"cv_id": req.cv_id})
-    if not cv_doc:
-        oid = _to_object_id(req.cv_id)
-        if oid:
-            cv_doc = await cvs_collection.find_one({"_id": oid})
-    if not cv_doc:
-        raise HTTPException(status_code=404, detail="CV not found")
+    cv_doc = await _load_cv_for_letter(req.cv_id, user_id)
 
-    # 2) Generate letter (OpenAI if key exists, else template)
+    # 2) Generate letter (cache, else OpenAI if key exists, else template)
     mode = "template"
     note = None
+    cached = False
+    letter = None
 
     if os.getenv("OPENAI_API_KEY"):
+        cache_key = _cache_key(user_id, cv_doc, req)
+        if not req.force_regenerate:
+            letter = await get_cached_cover_letter(cache_key)
+        if letter is not None:
+            mode, cached = "openai", True
+
+    if letter is None and os.getenv("OPENAI_API_KEY"):
         try:
-            letter = generate_cover_letter_llm(
+            # async client: bounded in-flight calls, timeouts + jittered retries;
+            # LLMBusyError when saturated -> template right away
+            letter = await generate_cover_letter_llm(
                 cv_doc=cv_doc,
                 job_title=req.job_title,
                 company=req.company,
@@ -91,22 +160,119 @@ async def generate_cover_letter(
             letter = generate_cover_letter_text(cv_doc, req)
             mode = "template"
             note = f"OpenAI failed: {type(e).__name__}"
-    else:
+        if mode == "openai":
+            await _cache_letter(cache_key, letter)
+    elif letter is None:
         letter = generate_cover_letter_text(cv_doc, req)
 
-    # ✅ 3) Persist as history (forever) scoped to this user + job
-    await save_cover_letter(
-        {
-            "user_id": user_id,  # ✅ critical
-            "cv_id": req.cv_id,
-            "job_id": req.job_id,
-            "job_title": req.job_title,
-            "company": req.company,
-            "tone": req.tone or "professional",
-            "text": letter,
-            "mode": mode,
-            "note": note,
-        }
-    )
+    # 3) Persist
+    await _persist_cover_letter(user_id, req, letter, mode, note, cached)
+
+    return {"cover_letter": letter, "mode": mode, "note": note, "cached": cached}
+
+
+@router.post("/cover-letter/generate")
+async def generate_cover_letter(
+    req: CoverLetterRequest,
+    user_id: str = Depends(get_current_user_id),
+):
+    return await _generate_cover_letter(user_id, req)
+
+
+async def _cover_letter_task(user_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    return await _generate_cover_letter(user_id, CoverLetterRequest(**payload))
+
+
+register_task("cover_letter", _cover_letter_task, concurrency=4)
 
-    return {"cover_letter": letter, "mode": mode, "note": note}
+
+@router.post("/cover-letter/generate/async", status_code=202)
+async def generate_cover_letter_async(
+    req: CoverLetterRequest,
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    Queue generation and return immediately; poll GET /tasks/{task_id}
+    (the result has the same shape as /cover-letter/generate).
+    """
+    task_id = await submit_task(user_id, "cover_letter", req.dict())
+    return {"task_id": task_id, "status": "queued"}
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _chunk_text(text: str, words_per_chunk: int = TEMPLATE_STREAM_WORDS) -> Iterator[str]:
+    # whitespace is kept with each word, so joining the chunks gives back `text`
+    words = re.findall(r"\S+\s*|\s+", text)
+    for i in range(0, len(words), words_per_chunk):
+        yield "".join(words[i:i + words_per_chunk])
+
+
+@router.post("/cover-letter/generate/stream")
+async def generate_cover_letter_stream(
+    req: CoverLetterRequest,
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    Server-sent events:
+      delta {"text"}   - append to the letter
+      reset {"note"}   - the LLM failed mid-stream; discard the text so far
+                         (the template letter follows as new deltas)
+      done  {"id", "cover_letter", "mode", "note", "cached"} - final text, saved to history
+    Template and cached letters are streamed in chunks too, so clients have one code path.
+    """
+    cv_doc = await _load_cv_for_letter(req.cv_id, user_id)
+
+    async def _events():
+        parts: List[str] = []
+        mode = "template"
+        note = None
+        cached_letter = None
+
+        if os.getenv("OPENAI_API_KEY"):
+            cache_key = _cache_key(user_id, cv_doc, req)
+            if not req.force_regenerate:
+                cached_letter = await get_cached_cover_letter(cache_key)
+
+        if cached_letter is not None:
+            mode = "openai"
+            for chunk in _chunk_text(cached_letter):
+                parts.append(chunk)
+                yield _sse("delta", {"text": chunk})
+        elif os.getenv("OPENAI_API_KEY"):
+            try:
+                async for delta in stream_cover_letter_llm(
+                    cv_doc=cv_doc,
+                    job_title=req.job_title,
+                    company=req.company,
+                    job_description=req.job_description,
+                    tone=req.tone or "professional",
+                ):
+                    parts.append(delta)
+                    yield _sse("delta", {"text": delta})
+                mode = "openai"
+            except Exception as e:
+                note = f"OpenAI failed: {type(e).__name__}"
+                if parts:
+                    parts = []
+                    yield _sse("reset", {"note": note})
+            if mode == "openai":
+                await _cache_letter(cache_key, "".join(parts).strip())
+
+        if mode == "template":
+            for chunk in _chunk_text(generate_cover_letter_text(cv_doc, req)):
+                parts.append(chunk)
+                yield _sse("delta", {"text": chunk})
+
+        letter = "".join(parts).strip()
+        cached = cached_letter is not None
+        letter_id = await _persist_cover_letter(user_id, req, letter, mode, note, cached)
+        yield _sse("done", {"id": letter_id, "cover_letter": letter, "mode": mode, "note": note, "cached": cached})
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,12 +1,93 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, status, Depends
+from fastapi import APIRouter, UploadFile, File, HTTPException, Response, status, Depends
+import hashlib
 import traceback
+from typing import Tuple
 
+from pymongo.errors import DuplicateKeyError
+
+from app.core import metrics
 from app.core.auth import get_current_user_id
-from app.services.cv_parser import parse_pdf, extract_skills, extract_experience
-from app.services.cv_repository import insert_cv
+from app.core.executors import run_in_pool
+from app.services.cv_parser import (
+    PDF_MAX_BYTES,
+    PdfLimitError,
+    cv_skill_fields,
+    extract_experience,
+    parse_pdf_parallel,
+)
+from app.services.cv_repository import (
+    delete_cv_for_user,
+    find_cv_by_content_hash_for_user,
+    get_cv_texts_for_user,
+    insert_cv,
+    update_cv_for_user,
+)
+from app.services.cv_vectors import compute_cv_vector, skills_are_current
 
 router = APIRouter()
 
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+
+async def _read_upload_limited(file: UploadFile, max_bytes: int) -> Tuple[bytes, str]:
+    """
+    Read the upload in chunks, failing as soon as it exceeds max_bytes.
+    Returns (bytes, sha256 hex digest of the bytes).
+    """
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"PDF is too large (max {max_bytes // (1024 * 1024)} MB).",
+    )
+    if file.size is not None and file.size > max_bytes:
+        raise too_large
+
+    buffer = bytearray()
+    hasher = hashlib.sha256()
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        if len(buffer) + len(chunk) > max_bytes:
+            raise too_large
+        buffer.extend(chunk)
+        hasher.update(chunk)
+    return bytes(buffer), hasher.hexdigest()
+
+
+def _extract_cv_data(parsed_text: str) -> dict:
+    # runs on the scoring pool: skill automaton scan + experience heuristics
+    return {**cv_skill_fields(parsed_text), "experience": extract_experience(parsed_text)}
+
+
+def _upload_response(cv_doc: dict, cv_id: str, file_name: str, cached: bool) -> dict:
+    return {
+        "cv_id": cv_id,
+        "file_name": file_name,
+        "skills": cv_doc.get("skills", []),
+        "experience": cv_doc.get("experience", []),
+        "cached": cached,
+    }
+
+
+async def _find_previous_upload(user_id: str, content_hash: str):
+    previous = await find_cv_by_content_hash_for_user(
+        user_id,
+        content_hash,
+        projection={"skills": 1, "experience": 1, "skills_version": 1},
+    )
+    if previous is None or skills_are_current(previous):
+        return previous
+
+    # stored before the current skill taxonomy: re-derive the skills from the stored text
+    texts = await get_cv_texts_for_user(user_id, [previous["id"]])
+    if not texts.get(previous["id"]):
+        return previous
+    skill_fields = await run_in_pool("scoring", cv_skill_fields, texts[previous["id"]])
+    await update_cv_for_user(previous["id"], user_id, skill_fields)
+    metrics.incr("cv_upload_dedup_skill_refreshes")
+    return {**previous, **skill_fields}
+
+
 @router.post("/upload_cv")
 async def upload_cv(
     file: UploadFile = File(...),
@@ -18,15 +99,22 @@ async def upload_cv(
             detail="Only PDF files are supported.",
         )
 
-    file_bytes = await file.read()
+    file_bytes, content_hash = await _read_upload_limited(file, PDF_MAX_BYTES)
     if not file_bytes:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Uploaded file is empty.",
         )
 
+    # ⚡ same PDF uploaded before by this user -> reuse the stored parse
+    previous = await _find_previous_upload(user_id, content_hash)
+    if previous:
+        metrics.incr("cv_upload_dedup_hits")
+        return _upload_response(previous, previous["id"], file.filename, cached=True)
+    metrics.incr("cv_upload_dedup_misses")
+
     try:
-        parsed_text = parse_pdf(file_bytes)
+        parsed_text = await parse_pdf_parallel(file_bytes)
         if not parsed_text or not parsed_text.strip():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -34,6 +122,11 @@ async def upload_cv(
             )
     except HTTPException:
         raise
+    except PdfLimitError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e),
+        )
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(
@@ -42,8 +135,9 @@ async def upload_cv(
         )
 
     try:
-        skills = extract_skills(parsed_text)
-        experience = extract_experience(parsed_text)
+        extracted = await run_in_pool("scoring", _extract_cv_data, parsed_text)
+    except HTTPException:
+        raise
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(
@@ -54,12 +148,23 @@ async def upload_cv(
     cv_doc = {
         "file_name": file.filename,
         "parsed_text": parsed_text,
-        "skills": skills,
-        "experience": experience,
+        **extracted,
+        "content_hash": content_hash,
     }
 
+    # ⚡ store the CV vector now so /jobs/match only vectorizes the job side
+    vector = await run_in_pool("scoring", compute_cv_vector, parsed_text)
+    if vector:
+        cv_doc["vector"] = vector
+
     try:
         cv_id = await insert_cv(cv_doc, user_id=user_id)  # ✅ pass user_id
+    except DuplicateKeyError:
+        # the same file was uploaded concurrently; unique (user_id, content_hash) kept the first
+        previous = await _find_previous_upload(user_id, content_hash)
+        if not previous:
+            raise HTTPException(status_code=500, detail="Error saving CV to database: duplicate upload.")
+        return _upload_response(previous, previous["id"], file.filename, cached=True)
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(
@@ -67,9 +172,12 @@ async def upload_cv(
             detail=f"Error saving CV to database: {type(e).__name__}: {e}",
         )
 
-    return {
-        "cv_id": cv_id,
-        "file_name": file.filename,
-        "skills": skills,
-        "experience": experience,
-    }
+    return _upload_response(cv_doc, cv_id, file.filename, cached=False)
+
+
+@router.delete("/cv/{cv_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Delete CV")
+async def delete_cv(cv_id: str, user_id: str = Depends(get_current_user_id)):
+    deleted = await delete_cv_for_user(cv_id, user_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="CV not found")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,81 +1,140 @@
 # app/api/job_routes.py
+import json
+import os
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, HTTPException, status, Query, Response, Depends
+from fastapi.responses import StreamingResponse
 
 from app.core.auth import get_current_user_id
-from app.schemas.job_match_schema import JobMatchRequest, JobMatchResponse
+from app.core.executors import run_in_pool
+from app.core.pagination import build_projection, set_next_cursor
+from app.core.tasks import register_task, submit_task
+from app.schemas.job_match_schema import (
+    BatchJobMatchRequest,
+    BatchJobMatchResponse,
+    JobMatchRequest,
+    JobMatchResponse,
+    RankCvsRequest,
+    RankCvsResponse,
+    SimilarJobItem,
+)
 from app.schemas.job_tracker_schema import JobCreate, JobResponse, JobUpdate
-from app.services.cv_repository import get_cv_by_id_for_user
+from app.services.cv_vectors import is_usable_vector, load_cv_for_matching, load_cvs_for_ranking
 from app.services.job_matcher import JobMatcherService
 from app.services.cv_parser import extract_skills_from_text
+from app.services.job_index import JobIndexUnavailable, find_similar_to_cv, find_similar_to_job
+from app.services.job_posting_repository import posting_id_for
+from app.services.match_cache import (
+    MATCH_CACHE_SKIP_DUPLICATE_HISTORY,
+    get_cached_match,
+    match_cache_key,
+    put_cached_match,
+)
 from app.services.job_repository import (
-    save_job_match_for_user,
+    save_match_and_track_for_user,
+    track_existing_match_for_user,
+    save_matches_and_track_for_user,
     get_matches_by_cv_id_for_user,
     get_tracked_jobs_for_user,
     create_tracked_job_for_user,
     delete_tracked_job_for_user,
     update_tracked_job_for_user,
-    upsert_tracked_job_from_match_for_user,
 )
 
-import app.services.job_repository as jr
-print("JOB_REPO_LOADED_FROM:", jr.__file__)
-
-
 
 router = APIRouter(prefix="/jobs", tags=["Job Matching"])
 job_matcher = JobMatcherService()
 
+# Max job descriptions per /jobs/match/batch request
+MAX_BATCH_JOBS = int(os.getenv("MAX_BATCH_JOBS", "500"))
+# Max CVs of a user ranked by /jobs/rank-cvs (newest first)
+MAX_RANK_CVS = int(os.getenv("MAX_RANK_CVS", "200"))
+# Streamed batches are flushed in chunks of this many results
+BATCH_STREAM_CHUNK = 50
+
+# List projections: `always` fields are required by the response models
+_MATCH_ALWAYS = ("created_at", "cv_id", "job_title", "company", "match_score", "semantic_score", "skill_score")
+_MATCH_FIELDS = ("job_description", "job_skills", "overlapping_skills", "missing_skills")
+_MATCH_SUMMARY = ("overlapping_skills", "missing_skills")
+
+_TRACKED_ALWAYS = ("created_at", "cv_id", "job_title", "company", "status")
+_TRACKED_FIELDS = ("notes", "job_description", "job_match_id", "job_url", "source")
+_TRACKED_SUMMARY = ("job_match_id", "job_url", "source")
+
+
+def _score_job(**kwargs: Any) -> Dict[str, Any]:
+    # runs on the scoring pool: skill extraction (automaton scan) + scoring
+    job_skills = extract_skills_from_text(kwargs["job_description"])
+    return job_matcher.compute_match_result(job_skills=job_skills, **kwargs)
+
 
 @router.post("/match", response_model=JobMatchResponse)
 async def match_job(
     payload: JobMatchRequest,
     user_id: str = Depends(get_current_user_id),  # ✅ require auth
 ):
-    cv_doc = await get_cv_by_id_for_user(payload.cv_id, user_id)
+    # ⚡ stored CV vector -> parsed_text is only loaded if the vector is stale
+    cv_doc = await load_cv_for_matching(payload.cv_id, user_id)
     if cv_doc is None:
         raise HTTPException(status_code=404, detail="CV not found (or not owned by this user).")
 
+    cv_text = cv_doc.get("parsed_text") or ""
+    cv_vector = cv_doc.get("vector")
+    cv_skills = cv_doc.get("skill_ids") or cv_doc.get("skills", [])
 
-    cv_text = cv_doc.get("parsed_text") or cv_doc.get("text") or ""
-    cv_skills = cv_doc.get("skills", [])
-
-    if not cv_text:
+    if not cv_text and not is_usable_vector(cv_vector):
         raise HTTPException(status_code=400, detail="Stored CV does not contain parsed text.")
 
     job_description = payload.job_description
     job_url = payload.job_url
     source = payload.source
-    job_skills = extract_skills_from_text(job_description)
 
-    result_dict = job_matcher.compute_match_result(
-        cv_id=payload.cv_id,
-        cv_text=cv_text,
-        cv_skills=cv_skills,
-        job_title=payload.job_title,
-        company=payload.company,
-        job_description=job_description,
-        job_skills=job_skills,
-    )
+    # ⚡ same CV version + same posting + same model -> same scores (repeat "Save tracked job" clicks)
+    cache_key = match_cache_key(user_id, payload.cv_id, cv_doc, job_description)
+    cached = get_cached_match(cache_key)
+    if cached is None:
+        result_dict = await run_in_pool(
+            "scoring",
+            _score_job,
+            cv_id=payload.cv_id,
+            cv_text=cv_text,
+            cv_skills=cv_skills,
+            job_title=payload.job_title,
+            company=payload.company,
+            job_description=job_description,
+            cv_vector=cv_vector,
+        )
+    else:
+        result_dict = {k: v for k, v in cached.items() if k != "match_id"}
+        result_dict.update(job_title=payload.job_title, company=payload.company)
 
-    # ✅ Save match history scoped by user
+    # ✅ Save match history + upsert tracked job (scoped by user, written concurrently)
     result_dict["job_description"] = job_description
-    match_id = await save_job_match_for_user(user_id, result_dict)
+    tracked = {
+        "cv_id": payload.cv_id,
+        "job_title": payload.job_title,
+        "company": payload.company,
+        "job_description": job_description,
+        "job_url": job_url,
+        "source": source,
+        **result_dict,
+    }
+    duplicate = (
+        cached is not None
+        and MATCH_CACHE_SKIP_DUPLICATE_HISTORY
+        and (cached.get("job_title"), cached.get("company")) == (payload.job_title, payload.company)
+    )
+    if duplicate:
+        match_id = cached["match_id"]
+        tracked_job_id = await track_existing_match_for_user(user_id, match_id, tracked)
+    else:
+        match_id, tracked_job_id = await save_match_and_track_for_user(user_id, result_dict, tracked)
 
-    # ✅ Upsert tracked job scoped by user
-    tracked_job_id = await upsert_tracked_job_from_match_for_user(
-        user_id,
-        {
-            "cv_id": payload.cv_id,
-            "job_title": payload.job_title,
-            "company": payload.company,
-            "job_description": job_description,
-            "job_url": job_url,
-            "source": source,
-            **result_dict,
-        },
+    put_cached_match(
+        cache_key,
+        {**{k: v for k, v in result_dict.items() if k != "job_description"}, "match_id": match_id},
     )
 
     result_dict["match_id"] = match_id
@@ -89,18 +148,241 @@ async def match_job(
     return result_dict
 
 
+def _score_jobs_batch(cv_doc: Dict[str, Any], jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # runs on the scoring pool: skill extraction + one sparse product for all jobs
+    for job in jobs:
+        job["job_skills"] = extract_skills_from_text(job["job_description"])
+
+    return job_matcher.compute_match_results_batch(
+        cv_id=cv_doc["id"],
+        cv_text=cv_doc.get("parsed_text") or "",
+        cv_skills=cv_doc.get("skill_ids") or cv_doc.get("skills", []),
+        jobs=jobs,
+        cv_vector=cv_doc.get("vector"),
+    )
+
+
+async def _persist_batch_results(
+    user_id: str,
+    jobs: List[Dict[str, Any]],
+    results: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    # one insert_many for history + one bulk_write for tracked jobs, concurrently
+    match_ids, tracked_job_ids = await save_matches_and_track_for_user(
+        user_id,
+        [{**r, "job_description": job["job_description"]} for job, r in zip(jobs, results)],
+        [
+            {
+                "cv_id": r["cv_id"],
+                "job_title": job.get("job_title"),
+                "company": job.get("company"),
+                "job_description": job["job_description"],
+                "job_url": job.get("job_url"),
+                "source": job.get("source"),
+                **r,
+            }
+            for job, r in zip(jobs, results)
+        ],
+    )
+
+    return [
+        {
+            **r,
+            "id": match_id,
+            "match_id": match_id,
+            "tracked_job_id": tracked_job_id,
+            "job_description": job["job_description"],
+            "job_url": job.get("job_url"),
+            "source": job.get("source"),
+        }
+        for job, r, match_id, tracked_job_id in zip(jobs, results, match_ids, tracked_job_ids)
+    ]
+
+
+def _check_batch_size(payload: BatchJobMatchRequest) -> None:
+    if not payload.jobs:
+        raise HTTPException(status_code=400, detail="No jobs to match.")
+    if len(payload.jobs) > MAX_BATCH_JOBS:
+        raise HTTPException(status_code=400, detail=f"Too many jobs (max {MAX_BATCH_JOBS} per batch).")
+
+
+async def _rank_batch(user_id: str, payload: BatchJobMatchRequest):
+    """
+    Score every job against the CV; returns (jobs, results) ranked best first.
+    """
+    cv_doc = await load_cv_for_matching(payload.cv_id, user_id)
+    if cv_doc is None:
+        raise HTTPException(status_code=404, detail="CV not found (or not owned by this user).")
+    if not cv_doc.get("parsed_text") and not is_usable_vector(cv_doc.get("vector")):
+        raise HTTPException(status_code=400, detail="Stored CV does not contain parsed text.")
+
+    jobs = [job.dict() for job in payload.jobs]
+    results = await run_in_pool("scoring", _score_jobs_batch, cv_doc, jobs)
+
+    # rank best first
+    order = sorted(range(len(results)), key=lambda i: results[i]["match_score"], reverse=True)
+    return [jobs[i] for i in order], [results[i] for i in order]
+
+
+@router.post("/match/batch", response_model=BatchJobMatchResponse, summary="Match one CV against many jobs")
+async def match_jobs_batch(
+    payload: BatchJobMatchRequest,
+    user_id: str = Depends(get_current_user_id),
+):
+    _check_batch_size(payload)
+    jobs, results = await _rank_batch(user_id, payload)
+    # saved in full before the first byte goes out: a client that disconnects
+    # mid-stream still gets the whole batch in its history, never part of it
+    items = await _persist_batch_results(user_id, jobs, results)
+
+    if payload.stream:
+        async def _ndjson():
+            for start in range(0, len(items), BATCH_STREAM_CHUNK):
+                yield "".join(json.dumps(item) + "\n" for item in items[start:start + BATCH_STREAM_CHUNK])
+
+        return StreamingResponse(_ndjson(), media_type="application/x-ndjson")
+
+    return {"cv_id": payload.cv_id, "count": len(items), "results": items}
+
+
+async def _batch_match_task(user_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    request = BatchJobMatchRequest(**payload)
+    jobs, results = await _rank_batch(user_id, request)
+    items = await _persist_batch_results(user_id, jobs, results)
+    # task records are kept for TASK_RESULT_TTL: reference each posting instead of
+    # storing every description a second time (the client sent them)
+    for item in items:
+        item["job_posting_id"] = posting_id_for(item.pop("job_description"))
+    return {"cv_id": request.cv_id, "count": len(items), "results": items}
+
+
+register_task("batch_match", _batch_match_task, concurrency=2)
+
+
+@router.post("/match/batch/async", status_code=202, summary="Queue a batch match")
+async def match_jobs_batch_async(
+    payload: BatchJobMatchRequest,
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    Queue the batch and return immediately; poll GET /tasks/{task_id}
+    (the result has the same shape as /jobs/match/batch, except that each item
+    has `job_posting_id` instead of `job_description`; `stream` is ignored).
+    """
+    _check_batch_size(payload)
+    task_id = await submit_task(user_id, "batch_match", payload.dict())
+    return {"task_id": task_id, "status": "queued"}
+
+
+def _rank_cvs(payload: RankCvsRequest, cvs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # runs on the scoring pool: job skills once, one sparse product for all CVs
+    job_skills = extract_skills_from_text(payload.job_description)
+    results = job_matcher.rank_cvs_for_job(
+        job_title=payload.job_title,
+        company=payload.company,
+        job_description=payload.job_description,
+        job_skills=job_skills,
+        cvs=cvs,
+    )
+    return {"count": len(results), "job_skills": job_skills, "results": results}
+
+
+@router.post("/rank-cvs", response_model=RankCvsResponse, summary="Rank all of the user's CVs for one job")
+async def rank_cvs_for_job(
+    payload: RankCvsRequest,
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    Which of my CVs fits this job best? Nothing is saved to the match history.
+    """
+    if not payload.job_description.strip():
+        raise HTTPException(status_code=400, detail="Job description is empty.")
+
+    # ⚡ one projected query for every CV (raw text only for stale vectors)
+    cvs = await load_cvs_for_ranking(user_id, limit=MAX_RANK_CVS)
+    cvs = [cv for cv in cvs if cv.get("parsed_text") or is_usable_vector(cv.get("vector"))]
+    if not cvs:
+        return {"count": 0, "job_skills": [], "results": []}
+
+    return await run_in_pool("scoring", _rank_cvs, payload, cvs)
+
+
+def _index_unavailable(e: JobIndexUnavailable) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": "30"},
+    )
+
+
+@router.get("/similar", response_model=List[SimilarJobItem], summary="Saved jobs most similar to a CV")
+async def similar_jobs_for_cv(
+    cv_id: str = Query(..., description="ID of the stored CV document"),
+    k: int = Query(default=10, ge=1, le=50),
+    user_id: str = Depends(get_current_user_id),
+):
+    cv_doc = await load_cv_for_matching(cv_id, user_id)
+    if cv_doc is None:
+        raise HTTPException(status_code=404, detail="CV not found (or not owned by this user).")
+
+    try:
+        return await find_similar_to_cv(user_id, cv_doc, k)
+    except JobIndexUnavailable as e:
+        raise _index_unavailable(e)
+
+
+@router.get("/{job_id}/similar", response_model=List[SimilarJobItem], summary="Saved jobs most similar to a job")
+async def similar_jobs_for_job(
+    job_id: str,
+    k: int = Query(default=10, ge=1, le=50),
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    `job_id` is a tracked job id or a match id.
+    """
+    try:
+        results = await find_similar_to_job(user_id, job_id, k)
+    except JobIndexUnavailable as e:
+        raise _index_unavailable(e)
+    if results is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return results
+
+
 @router.get("/history/{cv_id}", response_model=List[JobMatchResponse])
-async def get_job_history(cv_id: str, user_id: str = Depends(get_current_user_id)):
-    matches = await get_matches_by_cv_id_for_user(user_id=user_id, cv_id=cv_id)
+async def get_job_history(
+    cv_id: str,
+    response: Response,
+    limit: int = Query(default=50, ge=1, le=500),
+    after: Optional[str] = Query(default=None, description="X-Next-Cursor from the previous page"),
+    fields: Optional[str] = Query(default=None, description=f"Comma-separated: {', '.join(_MATCH_FIELDS)}"),
+    summary: bool = Query(default=False, description="Scores + skill overlap only (no description)"),
+    user_id: str = Depends(get_current_user_id),
+):
+    projection = build_projection(fields, summary, _MATCH_ALWAYS, _MATCH_FIELDS, _MATCH_SUMMARY)
+    matches, next_cursor = await get_matches_by_cv_id_for_user(
+        user_id=user_id, cv_id=cv_id, limit=limit, after=after, projection=projection
+    )
+    set_next_cursor(response, next_cursor)
     return matches or []
 
 
 @router.get("", response_model=List[JobResponse], summary="List tracked jobs")
 async def list_tracked_jobs(
+    response: Response,
     cv_id: Optional[str] = Query(default=None),
+    limit: int = Query(default=200, ge=1, le=500),
+    after: Optional[str] = Query(default=None, description="X-Next-Cursor from the previous page"),
+    fields: Optional[str] = Query(default=None, description=f"Comma-separated: {', '.join(_TRACKED_FIELDS)}"),
+    summary: bool = Query(default=False, description="List view fields only (no description / notes)"),
     user_id: str = Depends(get_current_user_id),
 ):
-    return await get_tracked_jobs_for_user(user_id=user_id, cv_id=cv_id)
+    projection = build_projection(fields, summary, _TRACKED_ALWAYS, _TRACKED_FIELDS, _TRACKED_SUMMARY)
+    jobs, next_cursor = await get_tracked_jobs_for_user(
+        user_id=user_id, cv_id=cv_id, limit=limit, after=after, projection=projection
+    )
+    set_next_cursor(response, next_cursor)
+    return jobs
 
 
 @router.post("", response_model=JobResponse, summary="Create tracked job")
@@ -124,3 +406,4 @@ async def delete_tracked_job_endpoint(job_id: str, user_id: str = Depends(get_cu
     if not deleted:
         raise HTTPException(status_code=404, detail="Tracked job not found")
     return Response(status_code=status.HTTP_204_NO_CONTENT)
+
@@ -0,0 +1,26 @@
+# app/api/task_routes.py
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.core.auth import get_current_user_id
+from app.core.tasks import get_task_for_user
+
+router = APIRouter(prefix="/tasks", tags=["Tasks"])
+
+
+@router.get("/{task_id}")
+async def get_task(task_id: str, user_id: str = Depends(get_current_user_id)):
+    doc = await get_task_for_user(user_id, task_id)
+    if not doc:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    return {
+        "task_id": str(doc["_id"]),
+        "type": doc.get("type"),
+        "status": doc.get("status"),  # queued | running | succeeded | failed
+        "result": doc.get("result"),
+        "error": doc.get("error"),
+        "attempts": doc.get("attempts", 0),
+        "created_at": doc.get("created_at"),
+        "started_at": doc.get("started_at"),
+        "finished_at": doc.get("finished_at"),
+    }
@@ -1,14 +1,234 @@
 # app/core/auth.py
+import hashlib
+import json
 import os
+import threading
+import time
+import urllib.request
+from typing import Any, Dict, Optional
+
 import jwt
-from jwt import PyJWKClient
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from app.core import metrics
+from app.core.executors import run_in_pool
+from app.core.lru import LRUCache
+
 CLERK_ISSUER = os.getenv("CLERK_ISSUER")
 
+# JWKS cache tuning (seconds)
+JWKS_CACHE_TTL = float(os.getenv("JWKS_CACHE_TTL", "3600"))
+JWKS_FETCH_TIMEOUT = float(os.getenv("JWKS_FETCH_TIMEOUT", "5"))
+JWKS_MIN_REFETCH_INTERVAL = float(os.getenv("JWKS_MIN_REFETCH_INTERVAL", "30"))
+
+# Comma-separated Clerk user ids allowed to call /admin endpoints
+ADMIN_USER_IDS = {u.strip() for u in os.getenv("ADMIN_USER_IDS", "").split(",") if u.strip()}
+
+# Verified-token cache size (0 disables it)
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "1024"))
+
 bearer_scheme = HTTPBearer(auto_error=False)
 
+
+class JWKSCache:
+    """
+    Process-wide store of the issuer's signing keys, keyed by `kid`.
+
+    - Keys are fetched once and served from memory.
+    - When the keys are older than `ttl`, a background thread refreshes them
+      while requests keep using the current set.
+    - An unknown `kid` triggers at most one synchronous refetch (rate limited
+      by `min_refetch_interval`, shared by concurrent callers).
+    - If the issuer is down, the last good keys keep being served.
+    """
+
+    def __init__(
+        self,
+        jwks_url: str,
+        ttl: float = JWKS_CACHE_TTL,
+        fetch_timeout: float = JWKS_FETCH_TIMEOUT,
+        min_refetch_interval: float = JWKS_MIN_REFETCH_INTERVAL,
+    ):
+        self.jwks_url = jwks_url
+        self.ttl = ttl
+        self.fetch_timeout = fetch_timeout
+        self.min_refetch_interval = min_refetch_interval
+
+        self._keys: Dict[str, Any] = {}
+        self._fetched_at = 0.0
+        self._last_attempt = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def _fetch(self) -> Dict[str, Any]:
+        with urllib.request.urlopen(self.jwks_url, timeout=self.fetch_timeout) as resp:
+            data = json.load(resp)
+
+        jwk_set = jwt.PyJWKSet.from_dict(data)
+        return {
+            jwk.key_id: jwk.key
+            for jwk in jwk_set.keys
+            if jwk.key_id and jwk.public_key_use in ("sig", None)
+        }
+
+    def refresh(self) -> bool:
+        """
+        Fetch the key set now. Returns False (and keeps the old keys) on failure.
+        """
+        with self._lock:
+            return self._refresh_locked()
+
+    def _refresh_locked(self) -> bool:
+        self._last_attempt = time.monotonic()
+        try:
+            keys = self._fetch()
+        except Exception:
+            metrics.incr("jwks_refresh_failures")
+            return False
+
+        # keep the old key objects for unchanged kids so verified tokens stay cached
+        for kid, key in keys.items():
+            old = self._keys.get(kid)
+            if old is not None and _same_public_key(old, key):
+                keys[kid] = old
+
+        # swap the whole dict so readers never see a half-built key set
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+        metrics.incr("jwks_refreshes")
+        return True
+
+    def _is_stale(self) -> bool:
+        return time.monotonic() - self._fetched_at > self.ttl
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            if time.monotonic() - self._last_attempt < self.min_refetch_interval:
+                return
+            self._refreshing = True
+
+        def _run():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=_run, name="jwks-refresh", daemon=True).start()
+
+    def _refetch_for_unknown_kid(self, seen_at: float) -> None:
+        with self._lock:
+            # another caller already refreshed while we were waiting
+            if self._fetched_at > seen_at:
+                return
+            # protect the issuer from floods of random `kid`s
+            if self._last_attempt and time.monotonic() - self._last_attempt < self.min_refetch_interval:
+                return
+            self._refresh_locked()
+
+    def maybe_refresh(self) -> None:
+        """
+        Starts a background refresh if the key set is older than `ttl`.
+        """
+        if self._is_stale():
+            self._refresh_in_background()
+
+    def peek(self, kid: Optional[str]) -> Optional[Any]:
+        """
+        Returns the current key for `kid` without touching metrics or refreshing.
+        """
+        return self._keys.get(kid) if kid else None
+
+    def get_cached_key(self, kid: Optional[str]) -> Optional[Any]:
+        """
+        Non-blocking lookup. Returns None if `kid` is not in the current key set.
+        """
+        key = self._keys.get(kid) if kid else None
+        if key is not None:
+            metrics.incr("jwks_hits")
+            self.maybe_refresh()
+        return key
+
+    def get_signing_key(self, kid: Optional[str]) -> Any:
+        """
+        Returns the public key for `kid`, fetching the key set at most once
+        if `kid` is unknown. May block on network I/O.
+        """
+        key = self.get_cached_key(kid)
+        if key is not None:
+            return key
+
+        metrics.incr("jwks_misses")
+        self._refetch_for_unknown_kid(seen_at=self._fetched_at)
+
+        key = self._keys.get(kid) if kid else None
+        if key is None:
+            raise jwt.PyJWKClientError(f'Unable to find a signing key that matches: "{kid}"')
+        return key
+
+
+def _same_public_key(a: Any, b: Any) -> bool:
+    try:
+        return a.public_numbers() == b.public_numbers()
+    except Exception:
+        return False
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of tokens that already passed signature verification.
+
+    Keyed by sha256(token) so raw tokens are never kept in memory. An entry
+    expires with the token's `exp` and is only served while its signing key
+    (by identity) is still the current key for its `kid`, so key rotation
+    drops entries without any crypto work.
+    """
+
+    def __init__(self, maxsize: int = AUTH_TOKEN_CACHE_SIZE):
+        self._cache = LRUCache("auth_token_cache", maxsize)
+
+    @staticmethod
+    def _hash(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str, jwks: JWKSCache) -> Optional[str]:
+        entry = self._cache.get(self._hash(token), valid=lambda e: jwks.peek(e[1]) is e[2])
+        if entry is None:
+            return None
+
+        jwks.maybe_refresh()
+        return entry[0]
+
+    def put(self, token: str, user_id: str, exp: Any, kid: Optional[str], key: Any) -> None:
+        # tokens without `exp` or `kid` are never cached
+        if not kid or not isinstance(exp, (int, float)):
+            return
+
+        ttl = exp - time.time()
+        if ttl > 0:
+            self._cache.put(self._hash(token), (user_id, kid, key), ttl=ttl)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+token_cache = VerifiedTokenCache()
+
+_jwks_cache: Optional[JWKSCache] = None
+_jwks_cache_lock = threading.Lock()
+
+
+def get_jwks_cache() -> JWKSCache:
+    global _jwks_cache
+    if _jwks_cache is None:
+        with _jwks_cache_lock:
+            if _jwks_cache is None:
+                _jwks_cache = JWKSCache(f"{CLERK_ISSUER}/.well-known/jwks.json")
+    return _jwks_cache
+
+
 def _require_env() -> None:
     if not CLERK_ISSUER:
         raise HTTPException(
@@ -16,7 +236,7 @@ def _require_env() -> None:
             detail="CLERK_ISSUER is not set on the backend.",
         )
 
-def get_current_user_id(
+async def get_current_user_id(
     creds: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
 ) -> str:
     """
@@ -32,11 +252,19 @@ def get_current_user_id(
         )
 
     token = creds.credentials
-    jwks_url = f"{CLERK_ISSUER}/.well-known/jwks.json"
+    jwks = get_jwks_cache()
+
+    # ⚡ repeat tokens skip RS256 verification entirely
+    cached_user_id = token_cache.get(token, jwks)
+    if cached_user_id:
+        return cached_user_id
 
     try:
-        jwks_client = PyJWKClient(jwks_url)
-        signing_key = jwks_client.get_signing_key_from_jwt(token).key
+        kid = jwt.get_unverified_header(token).get("kid")
+        signing_key = jwks.get_cached_key(kid)
+        if signing_key is None:
+            # unknown kid / cold cache: the JWKS fetch must not block the event loop
+            signing_key = await run_in_pool("http", jwks.get_signing_key, kid)
 
         payload = jwt.decode(
             token,
@@ -53,9 +281,24 @@ def get_current_user_id(
                 detail="Token is valid but missing `sub` (user id).",
             )
 
+        token_cache.put(token, user_id, payload.get("exp"), kid, signing_key)
         return user_id
 
+    except HTTPException:
+        raise
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired. Sign in again.")
     except Exception as e:
         raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
+
+
+async def require_admin_user_id(user_id: str = Depends(get_current_user_id)) -> str:
+    """
+    Like get_current_user_id, but only for users listed in ADMIN_USER_IDS.
+    """
+    if user_id not in ADMIN_USER_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required.",
+        )
+    return user_id
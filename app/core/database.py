@@ -1,6 +1,10 @@
 import os
+from typing import TYPE_CHECKING
+
 from dotenv import load_dotenv
-from motor.motor_asyncio import AsyncIOMotorClient
+
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorClient
 
 # Load variables from .env (local only)
 load_dotenv()
@@ -8,15 +12,20 @@ load_dotenv()
 MONGO_URI = os.getenv("MONGO_URI")
 MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "jobpilot")
 
-if not MONGO_URI:
-    raise RuntimeError("MONGO_URI environment variable is not set")
+client: "AsyncIOMotorClient | None" = None
 
-client: AsyncIOMotorClient | None = None
 
-
-def get_client() -> AsyncIOMotorClient:
+def get_client() -> "AsyncIOMotorClient":
+    """
+    The app creates the client in its lifespan (connect_database), i.e. after
+    any pre-fork, inside the worker that uses it. CLI scripts get one lazily.
+    """
     global client
     if client is None:
+        if not MONGO_URI:
+            raise RuntimeError("MONGO_URI environment variable is not set")
+        from motor.motor_asyncio import AsyncIOMotorClient
+
         client = AsyncIOMotorClient(MONGO_URI)
     return client
 
@@ -26,7 +35,12 @@ def get_database():
     return mongo_client[MONGO_DB_NAME]
 
 
-# collections
-db = get_database()
-cvs_collection = db["cvs"]
-jobs_collection = db["jobs"]
+def connect_database() -> None:
+    get_client()
+
+
+def close_database() -> None:
+    global client
+    if client is not None:
+        client.close()
+        client = None
@@ -0,0 +1,133 @@
+# app/core/executors.py
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException, status
+
+from app.core import metrics
+
+# Start method for process pools ("spawn" is safe with Motor/OpenAI threads in the parent)
+EXECUTOR_MP_START_METHOD = os.getenv("EXECUTOR_MP_START_METHOD", "spawn")
+
+
+class BoundedPool:
+    """
+    A lazily created thread or process pool with a hard cap on queued work.
+
+    At most `workers` calls run at once and at most `max_queue` more wait for
+    a worker. Anything beyond that is rejected with 503 instead of piling up
+    behind slow PDFs or LLM calls.
+    """
+
+    def __init__(self, name: str, kind: str, workers: int, max_queue: int):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind for pool '{name}': {kind}")
+
+        self.name = name
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+
+        self._executor: Optional[Executor] = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context(EXECUTOR_MP_START_METHOD),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers,
+                        thread_name_prefix=f"{self.name}-pool",
+                    )
+            return self._executor
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                metrics.incr(f"executor_{self.name}_rejected")
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"Server is busy ({self.name} workers saturated). Try again shortly.",
+                    headers={"Retry-After": "1"},
+                )
+            self._in_flight += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        self._acquire()
+        try:
+            future = self.executor().submit(partial(fn, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+        metrics.incr(f"executor_{self.name}_submitted")
+
+        # the slot is freed when the job itself finishes (or is cancelled before
+        # it starts), not when the awaiting request is cancelled: a disconnected
+        # client's job keeps its worker busy and still counts against the bound
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _pool_from_env(name: str, kind: str, workers: int, max_queue: int) -> BoundedPool:
+    prefix = f"EXECUTOR_{name.upper()}_"
+    return BoundedPool(
+        name=name,
+        kind=os.getenv(prefix + "KIND", kind),
+        workers=int(os.getenv(prefix + "WORKERS", str(workers))),
+        max_queue=int(os.getenv(prefix + "MAX_QUEUE", str(max_queue))),
+    )
+
+
+# - pdf:     PyMuPDF parsing (CPU heavy, holds the GIL) -> processes
+# - scoring: scikit-learn / numpy matching             -> threads
+# - http:    blocking outbound calls (JWKS key fetches)   -> threads
+_pools: Dict[str, BoundedPool] = {
+    "pdf": _pool_from_env("pdf", kind="process", workers=2, max_queue=8),
+    "scoring": _pool_from_env("scoring", kind="thread", workers=4, max_queue=32),
+    "http": _pool_from_env("http", kind="thread", workers=16, max_queue=64),
+}
+
+
+def get_pool(name: str) -> BoundedPool:
+    try:
+        return _pools[name]
+    except KeyError:
+        raise ValueError(f"Unknown executor pool: {name}")
+
+
+async def run_in_pool(name: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run blocking `fn(*args, **kwargs)` on the named pool without blocking the event loop.
+    Raises HTTPException(503) when the pool's queue is full.
+    """
+    return await get_pool(name).run(fn, *args, **kwargs)
+
+
+def shutdown_pools() -> None:
+    for pool in _pools.values():
+        pool.shutdown()
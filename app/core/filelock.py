@@ -0,0 +1,43 @@
+# app/core/filelock.py
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows dev boxes: single process, no file locking
+    fcntl = None
+
+
+class FileLock:
+    """
+    flock() on `path`, shared between every worker process on the host.
+
+    With blocking=False, entering raises BlockingIOError if another process
+    holds the lock.
+    """
+
+    def __init__(self, path: str, shared: bool = False, blocking: bool = True):
+        self.path = path
+        self.shared = shared
+        self.blocking = blocking
+        self._f = None
+
+    def __enter__(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._f = open(self.path, "a")
+        if fcntl is not None:
+            flags = fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX
+            if not self.blocking:
+                flags |= fcntl.LOCK_NB
+            try:
+                fcntl.flock(self._f, flags)
+            except OSError:
+                self._f.close()
+                raise BlockingIOError(f"{self.path} is locked by another process")
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self._f, fcntl.LOCK_UN)
+        self._f.close()
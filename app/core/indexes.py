@@ -0,0 +1,226 @@
+# app/core/indexes.py
+"""
+Index bootstrap + query-plan verification for every collection.
+
+    python -m app.core.indexes            # create indexes
+    python -m app.core.indexes --verify   # create, then explain() every repository query
+                                          # and exit 1 if any of them scans a collection
+"""
+import asyncio
+import os
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from app.core.database import get_database
+from app.core.pagination import encode_cursor, keyset_query
+
+# Lifetime (seconds) of cached cover letters (a changed value is applied with collMod)
+COVER_LETTER_CACHE_TTL = int(os.getenv("COVER_LETTER_CACHE_TTL", str(30 * 24 * 3600)))
+# Lifetime (seconds) of finished background task records
+TASK_RESULT_TTL = int(os.getenv("TASK_RESULT_TTL", str(7 * 24 * 3600)))
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "cvs": [
+        # dedup lookup on upload (partial: older CVs have no hash)
+        IndexModel(
+            [("user_id", ASCENDING), ("content_hash", ASCENDING)],
+            name="user_content_hash_unique",
+            unique=True,
+            partialFilterExpression={"content_hash": {"$exists": True}},
+        ),
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_created_at"),
+        # TF-IDF corpus (newest first)
+        IndexModel([("created_at", DESCENDING)], name="created_at"),
+    ],
+    "job_matches": [
+        # match history per CV (keyset pages on created_at, _id)
+        IndexModel(
+            [("user_id", ASCENDING), ("cv_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="user_cv_created_at_id",
+        ),
+        # TF-IDF corpus (newest first)
+        IndexModel([("created_at", DESCENDING)], name="created_at"),
+    ],
+    "tracked_jobs": [
+        # list tracked jobs (all / per CV), keyset pages on created_at, _id
+        IndexModel(
+            [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="user_created_at_id",
+        ),
+        IndexModel(
+            [("user_id", ASCENDING), ("cv_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="user_cv_created_at_id",
+        ),
+        # upsert after a match
+        IndexModel(
+            [("user_id", ASCENDING), ("cv_id", ASCENDING), ("job_title", ASCENDING), ("company", ASCENDING)],
+            name="user_cv_title_company",
+        ),
+        # similar-jobs index catch-up after a rebuild
+        IndexModel([("created_at", DESCENDING)], name="created_at"),
+    ],
+    "job_postings": [
+        # _id is the content hash; TF-IDF corpus reads newest first
+        IndexModel([("created_at", DESCENDING)], name="created_at"),
+    ],
+    "cover_letters": [
+        # latest + history per job (keyset pages on created_at, _id)
+        IndexModel(
+            [("user_id", ASCENDING), ("job_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="user_job_created_at_id",
+        ),
+    ],
+    "cover_letter_cache": [
+        # _id is the prompt hash; Mongo drops entries COVER_LETTER_CACHE_TTL after created_at
+        IndexModel([("created_at", ASCENDING)], name="created_at_ttl", expireAfterSeconds=COVER_LETTER_CACHE_TTL),
+    ],
+    "tasks": [
+        # recovery sweep: queued tasks oldest first, running tasks by heartbeat
+        IndexModel([("status", ASCENDING), ("type", ASCENDING), ("created_at", ASCENDING)], name="status_type_created_at"),
+        IndexModel([("status", ASCENDING), ("heartbeat_at", ASCENDING)], name="status_heartbeat_at"),
+        # only finished tasks have finished_at, so queued / running ones never expire
+        IndexModel([("finished_at", ASCENDING)], name="finished_at_ttl", expireAfterSeconds=TASK_RESULT_TTL),
+    ],
+}
+
+
+async def _sync_ttl(collection: str, models: List[IndexModel]) -> None:
+    """
+    Apply a changed expireAfterSeconds to existing TTL indexes with collMod
+    (create_indexes would fail with IndexOptionsConflict instead).
+    """
+    ttls = {m.document["name"]: m.document["expireAfterSeconds"] for m in models if "expireAfterSeconds" in m.document}
+    if not ttls:
+        return
+
+    db = get_database()
+    existing = await db[collection].index_information()
+    for name, seconds in ttls.items():
+        info = existing.get(name)
+        if info is not None and info.get("expireAfterSeconds") != seconds:
+            await db.command("collMod", collection, index={"name": name, "expireAfterSeconds": seconds})
+            print(f"TTL of {collection}.{name}: {info.get('expireAfterSeconds')}s -> {seconds}s")
+
+
+async def ensure_indexes() -> None:
+    """
+    Create every index (no-op for the ones that already exist) and bring
+    TTL lifetimes in line with the environment.
+    """
+    db = get_database()
+    for collection, models in INDEXES.items():
+        await _sync_ttl(collection, models)
+        await db[collection].create_indexes(models)
+
+
+# (name, collection, filter, sort) - one entry per repository query shape;
+# filters that have a builder (keyset pages) are built with it
+_SAMPLE_USER = "verify-user"
+_SAMPLE_ID = str(ObjectId())
+_SAMPLE_TIME = datetime(2024, 1, 1)
+
+QUERIES: List[Tuple[str, str, Dict[str, Any], List[Tuple[str, int]]]] = [
+    ("cv_repository.get/update/delete_cv_for_user", "cvs",
+     {"_id": ObjectId(_SAMPLE_ID), "user_id": _SAMPLE_USER}, []),
+    ("cv_repository.get_cv_texts_for_user", "cvs",
+     {"_id": {"$in": [ObjectId(_SAMPLE_ID)]}, "user_id": _SAMPLE_USER}, []),
+    ("cv_repository.find_cv_by_content_hash_for_user", "cvs",
+     {"user_id": _SAMPLE_USER, "content_hash": "0" * 64}, []),
+    ("cv_repository.list_cv_profiles_for_user", "cvs",
+     {"user_id": _SAMPLE_USER}, [("created_at", -1)]),
+    ("tfidf_model.load_corpus (cvs)", "cvs", {}, [("created_at", -1)]),
+    ("job_repository.get_matches_by_cv_id_for_user", "job_matches",
+     {"user_id": _SAMPLE_USER, "cv_id": _SAMPLE_ID}, [("created_at", -1), ("_id", -1)]),
+    ("tfidf_model.load_corpus (job_postings)", "job_postings", {}, [("created_at", -1)]),
+    ("tfidf_model.load_corpus (legacy job_matches)", "job_matches",
+     {"job_description": {"$exists": True}}, [("created_at", -1)]),
+    ("job_posting_repository.get_job_descriptions", "job_postings",
+     {"_id": {"$in": ["0" * 64]}}, []),
+    ("job_repository.get_tracked_jobs_for_user", "tracked_jobs",
+     {"user_id": _SAMPLE_USER}, [("created_at", -1), ("_id", -1)]),
+    ("job_repository.get_tracked_jobs_for_user (cv_id)", "tracked_jobs",
+     {"user_id": _SAMPLE_USER, "cv_id": _SAMPLE_ID}, [("created_at", -1), ("_id", -1)]),
+    ("job_repository.get_tracked_jobs_for_user (after cursor)", "tracked_jobs",
+     keyset_query({"user_id": _SAMPLE_USER}, encode_cursor(_SAMPLE_TIME, ObjectId(_SAMPLE_ID))),
+     [("created_at", -1), ("_id", -1)]),
+    ("job_repository.get_tracked_jobs_for_user (after an undated cursor)", "tracked_jobs",
+     keyset_query({"user_id": _SAMPLE_USER}, encode_cursor(None, ObjectId(_SAMPLE_ID))),
+     [("created_at", -1), ("_id", -1)]),
+    ("job_repository.upsert_tracked_job_from_match_for_user", "tracked_jobs",
+     {"user_id": _SAMPLE_USER, "cv_id": _SAMPLE_ID, "job_title": "t", "company": "c"}, []),
+    ("job_repository.update/delete_tracked_job_for_user", "tracked_jobs",
+     {"_id": ObjectId(_SAMPLE_ID), "user_id": _SAMPLE_USER}, []),
+    ("cover_letter_repository.get_latest_cover_letter_by_job_id", "cover_letters",
+     {"user_id": _SAMPLE_USER, "job_id": _SAMPLE_ID}, [("created_at", -1)]),
+    ("cover_letter_repository.get_cover_letter_history_by_job_id", "cover_letters",
+     {"user_id": _SAMPLE_USER, "job_id": _SAMPLE_ID}, [("created_at", -1), ("_id", -1)]),
+    ("job_index.rebuild_job_index (catch-up)", "job_matches",
+     {"created_at": {"$gte": _SAMPLE_TIME}}, []),
+    ("job_index.rebuild_job_index (catch-up)", "tracked_jobs",
+     {"created_at": {"$gte": _SAMPLE_TIME}}, []),
+    ("job_index.find_similar_to_job", "tracked_jobs",
+     {"_id": ObjectId(_SAMPLE_ID), "user_id": _SAMPLE_USER}, []),
+    ("tasks.sweep (queued)", "tasks",
+     {"type": {"$in": ["cover_letter", "batch_match"]}, "status": "queued"}, [("created_at", 1)]),
+    ("tasks.sweep (stale running)", "tasks",
+     {"type": {"$in": ["cover_letter", "batch_match"]}, "status": "running", "heartbeat_at": {"$lt": _SAMPLE_TIME}}, []),
+]
+
+
+def _stages(plan: Any) -> List[str]:
+    """
+    Every `stage` name in an explain() plan tree.
+    """
+    found: List[str] = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            found.append(plan["stage"])
+        for value in plan.values():
+            found.extend(_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            found.extend(_stages(item))
+    return found
+
+
+async def verify_query_plans() -> List[str]:
+    """
+    explain() every query in QUERIES; returns the names of those whose
+    winning plan contains a COLLSCAN.
+    """
+    db = get_database()
+    failures: List[str] = []
+
+    for name, collection, query, sort in QUERIES:
+        cursor = db[collection].find(query).limit(1)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+        stages = _stages(winning_plan)
+
+        status = "COLLSCAN" if "COLLSCAN" in stages else "ok"
+        print(f"{status:8} {collection:14} {name}: {' > '.join(stages)}")
+        if status != "ok":
+            failures.append(name)
+
+    return failures
+
+
+async def _main(argv: List[str]) -> None:
+    await ensure_indexes()
+    print("Indexes ensured.")
+
+    if "--verify" in argv:
+        failures = await verify_query_plans()
+        if failures:
+            print(f"{len(failures)} queries scan a collection: {', '.join(failures)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(_main(sys.argv[1:]))
@@ -0,0 +1,78 @@
+# app/core/lru.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from app.core import metrics
+
+
+class LRUCache:
+    """
+    Thread-safe bounded LRU with an optional per-entry TTL (seconds; `put`
+    may override it per entry).
+
+    Hits / misses are counted as `<name>_hits` / `<name>_misses` on /metrics.
+    maxsize <= 0 disables the cache.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: Optional[float] = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, valid: Optional[Callable[[Any], bool]] = None) -> Optional[Any]:
+        """
+        The cached value, or None. Entries that expired, or whose value fails
+        `valid`, are dropped and count as misses.
+        """
+        if self.maxsize <= 0:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[1] <= time.monotonic() or (valid is not None and not valid(entry[0]))):
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                metrics.incr(f"{self.name}_misses")
+                return None
+            self._entries.move_to_end(key)
+
+        metrics.incr(f"{self.name}_hits")
+        return entry[0]
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl else float("inf")
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def pop_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Drop every entry whose key matches `predicate`. Returns how many were dropped.
+        """
+        with self._lock:
+            keys = [k for k in self._entries if predicate(k)]
+            for k in keys:
+                del self._entries[k]
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,29 @@
+# app/core/metrics.py
+import threading
+from collections import defaultdict
+from typing import Dict
+
+# Simple in-process counters (per worker). Exposed via GET /metrics.
+_counters: Dict[str, int] = defaultdict(int)
+_lock = threading.Lock()
+
+
+def incr(name: str, amount: int = 1) -> None:
+    """
+    Increment a named counter.
+    """
+    with _lock:
+        _counters[name] += amount
+
+
+def get(name: str) -> int:
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def snapshot() -> Dict[str, int]:
+    """
+    Returns a copy of all counters (sorted by name).
+    """
+    with _lock:
+        return dict(sorted(_counters.items()))
@@ -0,0 +1,121 @@
+# app/core/pagination.py
+"""
+Keyset pagination on (created_at, _id), newest first, plus `fields` /
+`summary` selectors that become Mongo projections.
+
+Routes return the page as a plain list and the cursor for the next page in
+the `X-Next-Cursor` response header (absent on the last page), so existing
+clients keep working unchanged.
+
+Legacy documents without `created_at` sort after every dated one (null is
+the lowest value); their cursors carry an empty date and page on _id alone.
+"""
+import base64
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# newest first; _id breaks ties between docs written in the same millisecond
+KEYSET_SORT = [("created_at", -1), ("_id", -1)]
+
+
+def encode_cursor(created_at: Optional[datetime], _id: ObjectId) -> str:
+    raw = f"{created_at.isoformat() if created_at else ''}|{_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], ObjectId]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, _id = base64.urlsafe_b64decode(padded).decode("utf-8").split("|", 1)
+        return (datetime.fromisoformat(created_at) if created_at else None), ObjectId(_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+
+
+def keyset_query(query: Dict[str, Any], after: Optional[str]) -> Dict[str, Any]:
+    """
+    `query` restricted to documents strictly after the `after` cursor.
+    """
+    if not after:
+        return query
+    created_at, _id = decode_cursor(after)
+    if created_at is None:
+        # already among the undated documents (matches null and missing)
+        return {**query, "$or": [{"created_at": None, "_id": {"$lt": _id}}]}
+    return {
+        **query,
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": _id}},
+            {"created_at": None},
+        ],
+    }
+
+
+async def fetch_page(
+    collection: Any,
+    query: Dict[str, Any],
+    limit: int,
+    after: Optional[str] = None,
+    projection: Optional[Dict[str, int]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of `collection` (newest first). Returns (items, next_cursor).
+    Reads limit + 1 documents to know whether another page exists.
+    """
+    cursor = (
+        collection
+        .find(keyset_query(query, after), projection)
+        .sort(KEYSET_SORT)
+        .limit(limit + 1)
+    )
+    items = await cursor.to_list(length=limit + 1)
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor(last.get("created_at"), last["_id"])
+    return items, next_cursor
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+
+def build_projection(
+    fields: Optional[str],
+    summary: bool,
+    always: Iterable[str],
+    allowed: Iterable[str],
+    summary_fields: Iterable[str],
+) -> Dict[str, int]:
+    """
+    Inclusion projection for a list endpoint.
+
+    - `fields`: comma-separated subset of `allowed` (400 on unknown names)
+    - `summary`: the endpoint's small preset
+    - neither: every field in `allowed`
+    `always` (ids, sort keys, required response fields) is always included.
+    """
+    allowed = set(allowed)
+    if fields:
+        selected = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = selected - allowed - set(always)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(sorted(allowed))}",
+            )
+    elif summary:
+        selected = set(summary_fields)
+    else:
+        selected = allowed
+
+    return {name: 1 for name in (*always, *sorted(selected))}
@@ -0,0 +1,268 @@
+# app/core/tasks.py
+"""
+In-process background task queue backed by the Mongo `tasks` collection.
+
+- register_task(type, handler, concurrency) at import time
+- submit_task(user_id, type, payload) stores a task record and returns its id
+  right away; workers of this process pick it up (at most `concurrency` tasks
+  of a type run at once, per process)
+- task records: status queued -> running -> succeeded | failed, plus result / error
+- running tasks heartbeat; a sweeper re-queues tasks whose worker died
+  (restart, crash, another instance) and picks up queued tasks this process
+  never saw, so unfinished work is recovered without an external broker
+"""
+import asyncio
+import os
+import socket
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from bson import ObjectId
+from fastapi import HTTPException, status
+from pymongo import ReturnDocument
+
+from app.core import metrics
+from app.core.database import get_database
+
+# Seconds between heartbeats of a running task / sweeps for orphaned tasks
+TASK_HEARTBEAT_INTERVAL = float(os.getenv("TASK_HEARTBEAT_INTERVAL", "10"))
+TASK_SWEEP_INTERVAL = float(os.getenv("TASK_SWEEP_INTERVAL", "30"))
+# A running task whose heartbeat is older than this is considered orphaned
+TASK_STALE_AFTER = float(os.getenv("TASK_STALE_AFTER", str(3 * TASK_HEARTBEAT_INTERVAL)))
+# Orphaned tasks are retried until they have been started this many times
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "3"))
+# Queued tasks per type and process before submissions get 503
+TASK_MAX_PENDING = int(os.getenv("TASK_MAX_PENDING", "100"))
+
+TaskHandler = Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+# identifies this process in task records (host:pid:random)
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class TaskError(Exception):
+    """
+    Raise from a handler to fail the task with a message meant for the client.
+    """
+
+
+@dataclass
+class _TaskType:
+    name: str
+    handler: TaskHandler
+    concurrency: int
+    queue: Optional[asyncio.Queue] = None
+
+
+class TaskQueue:
+    def __init__(self):
+        self._types: Dict[str, _TaskType] = {}
+        self._workers: List[asyncio.Task] = []
+        self._sweeper: Optional[asyncio.Task] = None
+        self._pending: set = set()  # ids queued locally (not yet claimed)
+
+    @property
+    def _tasks(self):
+        return get_database()["tasks"]
+
+    def register(self, name: str, handler: TaskHandler, concurrency: int) -> None:
+        concurrency = int(os.getenv(f"TASKS_{name.upper()}_CONCURRENCY", str(concurrency)))
+        self._types[name] = _TaskType(name=name, handler=handler, concurrency=max(1, concurrency))
+
+    # --------------------------
+    # lifecycle
+    # --------------------------
+    async def start(self) -> None:
+        for task_type in self._types.values():
+            task_type.queue = asyncio.Queue()
+            for _ in range(task_type.concurrency):
+                self._workers.append(asyncio.create_task(self._worker(task_type)))
+
+        # recover work left behind by the previous run before accepting new work
+        await self.sweep()
+        self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self) -> None:
+        running = [*self._workers, *([self._sweeper] if self._sweeper else [])]
+        for t in running:
+            t.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        self._workers = []
+        self._sweeper = None
+        self._pending.clear()
+
+        # hand interrupted tasks back right away (a crash is caught by the heartbeat instead)
+        await self._tasks.update_many(
+            {"status": "running", "worker": WORKER_ID},
+            {"$set": {"status": "queued", "updated_at": datetime.utcnow()}, "$unset": {"heartbeat_at": "", "worker": ""}},
+        )
+
+    # --------------------------
+    # submit / read
+    # --------------------------
+    async def submit(self, user_id: str, name: str, payload: Dict[str, Any]) -> str:
+        task_type = self._types.get(name)
+        if task_type is None or task_type.queue is None:
+            raise HTTPException(status_code=500, detail=f"Task type '{name}' is not available.")
+        if task_type.queue.qsize() >= TASK_MAX_PENDING:
+            metrics.incr(f"tasks_{name}_rejected")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Server is busy ({name} queue full). Try again shortly.",
+                headers={"Retry-After": "5"},
+            )
+
+        now = datetime.utcnow()
+        doc = {
+            "user_id": user_id,
+            "type": name,
+            "status": "queued",
+            "payload": payload,
+            "attempts": 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+        res = await self._tasks.insert_one(doc)
+        self._enqueue(task_type, res.inserted_id)
+        metrics.incr(f"tasks_{name}_submitted")
+        return str(res.inserted_id)
+
+    async def get(self, user_id: str, task_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            oid = ObjectId(task_id)
+        except Exception:
+            return None
+        return await self._tasks.find_one({"_id": oid, "user_id": user_id}, {"payload": 0})
+
+    def _enqueue(self, task_type: _TaskType, task_id: ObjectId) -> None:
+        if task_id in self._pending:
+            return
+        self._pending.add(task_id)
+        task_type.queue.put_nowait(task_id)
+
+    # --------------------------
+    # workers
+    # --------------------------
+    async def _claim(self, task_id: ObjectId) -> Optional[Dict[str, Any]]:
+        # atomic queued -> running, so a task only runs once across processes
+        now = datetime.utcnow()
+        return await self._tasks.find_one_and_update(
+            {"_id": task_id, "status": "queued"},
+            {
+                "$set": {"status": "running", "worker": WORKER_ID, "started_at": now, "heartbeat_at": now, "updated_at": now},
+                "$inc": {"attempts": 1},
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _heartbeat(self, task_id: ObjectId) -> None:
+        while True:
+            await asyncio.sleep(TASK_HEARTBEAT_INTERVAL)
+            await self._tasks.update_one(
+                {"_id": task_id, "status": "running", "worker": WORKER_ID},
+                {"$set": {"heartbeat_at": datetime.utcnow()}},
+            )
+
+    async def _finish(self, task_id: ObjectId, updates: Dict[str, Any]) -> None:
+        now = datetime.utcnow()
+        await self._tasks.update_one(
+            {"_id": task_id, "worker": WORKER_ID},
+            {"$set": {**updates, "finished_at": now, "updated_at": now}, "$unset": {"heartbeat_at": ""}},
+        )
+
+    async def _worker(self, task_type: _TaskType) -> None:
+        while True:
+            task_id = await task_type.queue.get()
+            self._pending.discard(task_id)
+            try:
+                doc = await self._claim(task_id)
+                if doc is None:
+                    continue  # already claimed / finished elsewhere
+
+                heartbeat = asyncio.create_task(self._heartbeat(task_id))
+                try:
+                    result = await task_type.handler(doc["user_id"], doc.get("payload") or {})
+                    await self._finish(task_id, {"status": "succeeded", "result": result})
+                    metrics.incr(f"tasks_{task_type.name}_succeeded")
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    if isinstance(e, HTTPException):
+                        error = str(e.detail)
+                    elif isinstance(e, TaskError):
+                        error = str(e)
+                    else:
+                        error = f"{type(e).__name__}"
+                        print(f"Task {task_id} ({task_type.name}) failed: {type(e).__name__}: {e}")
+                    await self._finish(task_id, {"status": "failed", "error": error})
+                    metrics.incr(f"tasks_{task_type.name}_failed")
+                finally:
+                    heartbeat.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Mongo hiccup while claiming/finishing: the sweeper retries the task later
+                print(f"Task worker error ({task_type.name}): {type(e).__name__}: {e}")
+
+    # --------------------------
+    # recovery
+    # --------------------------
+    async def sweep(self) -> None:
+        """
+        Re-queue running tasks with a stale heartbeat (or fail them after
+        TASK_MAX_ATTEMPTS), then enqueue queued tasks of the types this
+        process handles.
+        """
+        names = list(self._types)
+        stale_before = datetime.utcnow() - timedelta(seconds=TASK_STALE_AFTER)
+        stale = {"type": {"$in": names}, "status": "running", "heartbeat_at": {"$lt": stale_before}}
+        now = datetime.utcnow()
+
+        res = await self._tasks.update_many(
+            {**stale, "attempts": {"$gte": TASK_MAX_ATTEMPTS}},
+            {"$set": {"status": "failed", "error": "Worker stopped while running the task.", "finished_at": now, "updated_at": now},
+             "$unset": {"heartbeat_at": ""}},
+        )
+        if res.modified_count:
+            metrics.incr("tasks_abandoned", res.modified_count)
+
+        res = await self._tasks.update_many(
+            stale,
+            {"$set": {"status": "queued", "updated_at": now}, "$unset": {"heartbeat_at": "", "worker": ""}},
+        )
+        if res.modified_count:
+            metrics.incr("tasks_recovered", res.modified_count)
+
+        cursor = self._tasks.find({"type": {"$in": names}, "status": "queued"}, {"type": 1}).sort("created_at", 1)
+        async for doc in cursor:
+            task_type = self._types[doc["type"]]
+            if task_type.queue is not None and task_type.queue.qsize() < TASK_MAX_PENDING:
+                self._enqueue(task_type, doc["_id"])
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(TASK_SWEEP_INTERVAL)
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"Task sweep failed: {type(e).__name__}: {e}")
+
+
+task_queue = TaskQueue()
+
+
+def register_task(name: str, handler: TaskHandler, concurrency: int = 2) -> None:
+    """
+    Concurrency per process can be overridden with TASKS_<NAME>_CONCURRENCY.
+    """
+    task_queue.register(name, handler, concurrency)
+
+
+async def submit_task(user_id: str, name: str, payload: Dict[str, Any]) -> str:
+    return await task_queue.submit(user_id, name, payload)
+
+
+async def get_task_for_user(user_id: str, task_id: str) -> Optional[Dict[str, Any]]:
+    return await task_queue.get(user_id, task_id)
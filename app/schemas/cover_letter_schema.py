@@ -13,3 +13,7 @@ class CoverLetterRequest(BaseModel):
         default="professional",
         description="Tone of the cover letter (e.g. professional, enthusiastic)",
     )
+    force_regenerate: bool = Field(
+        default=False,
+        description="Skip the cached letter for identical inputs and call the LLM again",
+    )
@@ -31,20 +31,76 @@ class JobMatchResponse(BaseModel):
     cv_id: str
     job_title: Optional[str]
     company: Optional[str]
-    job_description: str  # ✅ ADD THIS
+    job_description: Optional[str] = None  # ✅ omitted by history `fields` / `summary`
 
     match_score: float
     semantic_score: float
     skill_score: float
 
-    job_skills: List[str]
-    overlapping_skills: List[str]
-    missing_skills: List[str]
+    job_skills: List[str] = []
+    overlapping_skills: List[str] = []
+    missing_skills: List[str] = []
 
     match_id: Optional[str] = None
     tracked_job_id: Optional[str] = None
 
 
+class BatchJobItem(BaseModel):
+    job_title: Optional[str] = None
+    company: Optional[str] = None
+    job_description: str = Field(..., description="Full job description text")
+    job_url: Optional[str] = None
+    source: Optional[str] = None
+
+
+class BatchJobMatchRequest(BaseModel):
+    cv_id: str = Field(..., description="ID of the stored CV document")
+    jobs: List[BatchJobItem] = Field(..., description="Job descriptions to score against the CV")
+    stream: bool = Field(
+        False, description="Stream ranked results as NDJSON (one JobMatchResponse per line)"
+    )
+
+
+class BatchJobMatchResponse(BaseModel):
+    cv_id: str
+    count: int
+    results: List[JobMatchResponse]  # ranked by match_score (best first)
+
+
+class RankCvsRequest(BaseModel):
+    job_title: Optional[str] = None
+    company: Optional[str] = None
+    job_description: str = Field(..., description="Full job description text to rank the user's CVs against")
+
+
+class CvRankItem(BaseModel):
+    cv_id: str
+    file_name: Optional[str] = None
+
+    match_score: float
+    semantic_score: float
+    skill_score: float
+
+    overlapping_skills: List[str] = []
+    missing_skills: List[str] = []
+
+
+class RankCvsResponse(BaseModel):
+    count: int
+    job_skills: List[str] = []
+    results: List[CvRankItem]  # ranked by match_score (best first)
+
+
+class SimilarJobItem(BaseModel):
+    job_posting_id: str
+    job_title: Optional[str] = None
+    company: Optional[str] = None
+    cv_id: Optional[str] = None
+    match_id: Optional[str] = None
+    tracked_job_id: Optional[str] = None
+    similarity: float  # cosine, -1–1 (best first)
+
+
 class JobUpdate(BaseModel):
     status: Optional[str] = None
     notes: Optional[str] = None
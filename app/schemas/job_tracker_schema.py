@@ -25,3 +25,5 @@ class JobResponse(BaseModel):
     notes: Optional[str] = None
     job_description: Optional[str] = None
     job_match_id: Optional[str] = None
+    job_url: Optional[str] = None
+    source: Optional[str] = None
@@ -0,0 +1,68 @@
+# app/services/cover_letter_cache.py
+"""
+Cache of generated (LLM) cover letters, keyed by a hash of the exact prompt.
+
+Two tiers: an in-process LRU, then the `cover_letter_cache` collection
+(expired by a TTL index on created_at).
+"""
+import hashlib
+import os
+from datetime import datetime
+from typing import Dict, Optional
+
+from app.core import metrics
+from app.core.database import get_database
+from app.core.indexes import COVER_LETTER_CACHE_TTL
+from app.core.lru import LRUCache
+from app.services.openai_cover_letter import build_cover_letter_prompt, get_model_name
+
+COVER_LETTER_CACHE_SIZE = int(os.getenv("COVER_LETTER_CACHE_SIZE", "256"))
+
+_memory = LRUCache("cover_letter_cache_memory", COVER_LETTER_CACHE_SIZE, ttl=COVER_LETTER_CACHE_TTL)
+
+
+def cover_letter_cache_key(
+    user_id: str,
+    cv_doc: Dict,
+    job_title: str,
+    company: str,
+    job_description: str,
+    tone: str,
+) -> str:
+    """
+    sha256 over (user, model, prompt). The prompt already contains every CV fact,
+    job field and the tone the LLM sees, so any change to them is a new key.
+    """
+    prompt = build_cover_letter_prompt(cv_doc, job_title, company, job_description, tone)
+    raw = "\n".join([user_id, get_model_name(), prompt])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def get_cached_cover_letter(key: str) -> Optional[str]:
+    text = _memory.get(key)
+    if text is not None:
+        return text
+
+    db = get_database()
+    doc = await db["cover_letter_cache"].find_one({"_id": key}, {"text": 1, "created_at": 1})
+    # the TTL monitor only runs once a minute; don't serve entries it hasn't removed yet
+    if not doc or (datetime.utcnow() - doc["created_at"]).total_seconds() > COVER_LETTER_CACHE_TTL:
+        metrics.incr("cover_letter_cache_mongo_misses")
+        return None
+
+    metrics.incr("cover_letter_cache_mongo_hits")
+    _memory.put(key, doc["text"])
+    return doc["text"]
+
+
+async def put_cached_cover_letter(key: str, text: str) -> None:
+    if not text:
+        return
+    _memory.put(key, text)
+
+    db = get_database()
+    await db["cover_letter_cache"].update_one(
+        {"_id": key},
+        {"$set": {"text": text, "model": get_model_name(), "created_at": datetime.utcnow()}},
+        upsert=True,
+    )
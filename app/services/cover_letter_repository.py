@@ -1,9 +1,10 @@
 # app/services/cover_letter_repository.py
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from bson import ObjectId
 from app.core.database import get_database
+from app.core.pagination import fetch_page
 
 
 async def save_cover_letter(doc: Dict[str, Any]) -> str:
@@ -19,14 +20,14 @@ async def save_cover_letter(doc: Dict[str, Any]) -> str:
     return str(res.inserted_id)
 
 
-async def get_latest_cover_letter_by_job_id(job_id: str) -> Optional[Dict[str, Any]]:
+async def get_latest_cover_letter_by_job_id(user_id: str, job_id: str) -> Optional[Dict[str, Any]]:
     """
-    Returns the most recent cover letter for a given tracked job_id.
+    Returns the most recent cover letter for a given tracked job_id, owned by user_id.
     """
     db = get_database()
     doc = await (
         db["cover_letters"]
-        .find({"job_id": job_id})
+        .find({"user_id": user_id, "job_id": job_id})
         .sort("created_at", -1)
         .limit(1)
         .to_list(length=1)
@@ -40,22 +41,27 @@ async def get_latest_cover_letter_by_job_id(job_id: str) -> Optional[Dict[str, A
     return item
 
 
-async def get_cover_letter_history_by_job_id(job_id: str, limit: int = 25) -> List[Dict[str, Any]]:
+async def get_cover_letter_history_by_job_id(
+    user_id: str,
+    job_id: str,
+    limit: int = 25,
+    after: Optional[str] = None,
+    projection: Optional[Dict[str, int]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
     """
-    Returns cover letter history for a tracked job_id (newest first).
+    One page of cover letter history for a tracked job_id owned by user_id
+    (newest first). Returns (items, next_cursor).
     """
     db = get_database()
-
-    cursor = (
-        db["cover_letters"]
-        .find({"job_id": job_id})
-        .sort("created_at", -1)
-        .limit(limit)
+    items, next_cursor = await fetch_page(
+        db["cover_letters"],
+        {"user_id": user_id, "job_id": job_id},
+        limit=limit,
+        after=after,
+        projection=projection,
     )
 
-    results: List[Dict[str, Any]] = []
-    async for item in cursor:
+    for item in items:
         item["_id"] = str(item["_id"])
-        results.append(item)
 
-    return results
+    return items, next_cursor
@@ -1,127 +1,168 @@
+import asyncio
 import io
-import fitz  # PyMuPDF
+import os
 import re
-from typing import List
+import tempfile
+from typing import Any, Dict, List, Tuple, Union
+
+from app.core.executors import get_pool, run_in_pool
+from app.services.skill_matcher import SkillMatch
+from app.services.skill_taxonomy import get_taxonomy
+
+# Upload / parsing limits
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", str(10 * 1024 * 1024)))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "30"))
+# Documents with more pages than this are split across the PDF process pool
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "6"))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "4"))
+# Stop extracting once this much text was found (0 = read every page)
+PDF_TARGET_CHARS = int(os.getenv("PDF_TARGET_CHARS", "50000"))
+
+
+class PdfLimitError(ValueError):
+    """
+    The PDF is larger than PDF_MAX_BYTES / PDF_MAX_PAGES.
+    """
+
+
+def parse_pdf_pages(
+    source: Union[bytes, str],
+    start: int,
+    end: int,
+    max_pages: int = PDF_MAX_PAGES,
+    max_chars: int = PDF_TARGET_CHARS,
+) -> Tuple[str, int]:
+    """
+    Extract text from pages [start, end) and return (text, total page count).
+    `source` is the PDF bytes or the path of a PDF file.
+    Stops early once `max_chars` of text were collected.
+    Raises PdfLimitError if the document has more than `max_pages` pages.
+    """
+    import fitz  # PyMuPDF (imported on first parse, in the PDF worker process)
+
+    if isinstance(source, str):
+        doc = fitz.open(source, filetype="pdf")
+    else:
+        # IMPORTANT: pass bytes directly (not BytesIO)
+        doc = fitz.open(stream=source, filetype="pdf")
+    try:
+        page_count = doc.page_count
+        if max_pages and page_count > max_pages:
+            raise PdfLimitError(f"PDF has {page_count} pages (max {max_pages}).")
+
+        all_text = []
+        collected = 0
+        for page_number in range(start, min(end, page_count)):
+            text = doc.load_page(page_number).get_text("text")
+            if text:
+                all_text.append(text)
+                collected += len(text)
+            if max_chars and collected >= max_chars:
+                break
+    finally:
+        doc.close()
+
+    return "\n".join(all_text).strip(), page_count
+
 
 def parse_pdf(file_bytes: bytes) -> str:
     """
     Take raw PDF bytes and return the combined text from all pages.
     """
-    # IMPORTANT: pass bytes directly (not BytesIO)
-    doc = fitz.open(stream=file_bytes, filetype="pdf")
-
-    all_text = []
-    for page in doc:
-        text = page.get_text("text")
-        if text:
-            all_text.append(text)
-
-    doc.close()
-    return "\n".join(all_text).strip()
-
-# Simple skill vocabulary for now (you can expand this)
-SKILL_KEYWORDS = [
-    "python", "fastapi", "react", "javascript", "typescript",
-    "html", "css", "linux", "sql", "mongodb", "docker",
-    "git", "jira", "power bi", "excel", "data analysis",
-    "networking", "troubleshooting", "azure", "aws"
-
-    # Core IT Support / Helpdesk
-    "it support",
-    "technical support",
-    "helpdesk",
-    "service desk",
-    "troubleshooting",
-    "ticketing",
-    "incident management",
-    "hardware support",
-    "software support",
-    "desktop support",
-    "end-user support",
-
-    # Device Management (Mac + Windows)
-    "mac",
-    "macos",
-    "windows",
-    "intune",
-    "jamf",
-    "mdm",
-    "device management",
-    "device provisioning",
-    "asset management",
-    "oomnitza",
-
-    # Identity & Access Management
-    "okta",
-    "azure ad",
-    "google workspace",
-    "ldap",
-    "sso",
-    "iam",
-    "user provisioning",
-    "user deprovisioning",
-    "user lifecycle",
-
-    # SaaS Administration
-    "saas",
-    "saas administration",
-    "google admin",
-    "office 365",
-    "gsuite",
-
-    # Ticketing Tools
-    "jira",
-    "zendesk",
-    "freshdesk",
-    "servicenow",
-
-    # Collaboration Tools
-    "slack",
-    "google chat",
-    "webex",
-    "zoom",
-    "microsoft teams",
-
-    # General Technical Skills
-    "git",
-    "github",
-    "excel",
-    "sql",
-    "python",
-    "bash",
-    "powershell",
-    "api",
-    "rest",
-    "networking",
-    "vpn",
-    "wifi",
-    "active directory",
-
-    # Onboarding / Offboarding
-    "onboarding",
-    "offboarding",
-    "documentation",
-    "knowledge base",
-]
+    text, _ = parse_pdf_pages(file_bytes, 0, PDF_MAX_PAGES or 10**6)
+    return text
+
+
+async def parse_pdf_parallel(file_bytes: bytes) -> str:
+    """
+    parse_pdf on the PDF process pool. Small documents are parsed in one task;
+    larger ones are split into page ranges, run a wave (one range per worker)
+    at a time, stopping once PDF_TARGET_CHARS of text were found.
+    """
+    head_text, page_count = await run_in_pool(
+        "pdf", parse_pdf_pages, file_bytes, 0, PDF_PARALLEL_MIN_PAGES
+    )
+
+    parts = [head_text] if head_text else []
+    collected = len(head_text)
+
+    ranges = [
+        (start, min(start + PDF_PAGES_PER_TASK, page_count))
+        for start in range(PDF_PARALLEL_MIN_PAGES, page_count, PDF_PAGES_PER_TASK)
+    ]
+    if not ranges or (PDF_TARGET_CHARS and collected >= PDF_TARGET_CHARS):
+        return "\n".join(parts).strip()
+
+    # range tasks get a path, not the bytes: the PDF is written once instead of
+    # being pickled into a worker process for every page range
+    fd, path = tempfile.mkstemp(prefix="cv-", suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(file_bytes)
+        wave_size = get_pool("pdf").workers
+
+        for i in range(0, len(ranges), wave_size):
+            if PDF_TARGET_CHARS and collected >= PDF_TARGET_CHARS:
+                break
+
+            results = await asyncio.gather(
+                *[run_in_pool("pdf", parse_pdf_pages, path, start, end) for start, end in ranges[i:i + wave_size]]
+            )
+            for text, _ in results:
+                if text:
+                    parts.append(text)
+                    collected += len(text)
+    finally:
+        os.remove(path)
+
+    return "\n".join(parts).strip()
+
+# Skill vocabulary lives in app/data/skills.json (see skill_taxonomy.py)
+
+def find_skill_matches(text: str) -> List[SkillMatch]:
+    """
+    All whole-word skill occurrences in `text`, with character offsets
+    (match.skill is the canonical skill id).
+    """
+    return get_taxonomy().find(text)
+
+
+def extract_skill_ids(text: str) -> List[str]:
+    """
+    Canonical ids of the skills found in `text`, in order of first appearance.
+    """
+    if not text:
+        return []
+
+    return get_taxonomy().extract_ids(text)
+
 
 def extract_skills_from_text(text: str) -> List[str]:
     """
-    Very simple helper to detect which of the known skills appear in a block of text.
+    Detect which of the known skills appear (as whole words or synonyms) in a block of text.
     Used for both:
       - Parsed CV text
       - Job descriptions
+    Returns each skill's display name once, in order of first appearance.
     """
     if not text:
         return []
 
-    lowered = text.lower()
-    found: List[str] = []
+    taxonomy = get_taxonomy()
+    return [taxonomy.display(skill_id) for skill_id in taxonomy.extract_ids(text)]
 
-    for skill in SKILL_KEYWORDS:
-        if skill.lower() in lowered:
-            found.append(skill)
-
-    return found
+def cv_skill_fields(text: str) -> Dict[str, Any]:
+    """
+    Skill fields stored on a CV: display names, sorted canonical ids and the
+    taxonomy version they were extracted with (a newer taxonomy re-extracts them).
+    """
+    taxonomy = get_taxonomy()
+    skill_ids = taxonomy.extract_ids(text) if text else []
+    return {
+        "skills": [taxonomy.display(skill_id) for skill_id in skill_ids],
+        "skill_ids": sorted(skill_ids),
+        "skills_version": taxonomy.version,
+    }
 
 def extract_skills(text: str) -> List[str]:
     """
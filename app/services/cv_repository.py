@@ -1,8 +1,19 @@
+import os
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 from bson import ObjectId
 from app.core.database import get_database
+from app.core.lru import LRUCache
+
+# Per-process cache of CV profiles, keyed by (user_id, cv_id)
+CV_CACHE_SIZE = int(os.getenv("CV_CACHE_SIZE", "512"))
+CV_CACHE_TTL = float(os.getenv("CV_CACHE_TTL", "300"))
+
+# Everything but the (large) raw text: what matching and cover letters need
+CV_PROFILE_PROJECTION = {"parsed_text": 0, "text": 0}
+
+_cv_cache = LRUCache("cv_cache", CV_CACHE_SIZE, ttl=CV_CACHE_TTL)
 
 
 async def insert_cv(cv_data: Dict[str, Any], user_id: str) -> str:
@@ -17,12 +28,18 @@ async def insert_cv(cv_data: Dict[str, Any], user_id: str) -> str:
     }
 
     result = await db["cvs"].insert_one(doc)
+    invalidate_cv(user_id, str(result.inserted_id))
     return str(result.inserted_id)
 
 
-async def get_cv_by_id_for_user(cv_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+async def get_cv_by_id_for_user(
+    cv_id: str,
+    user_id: str,
+    projection: Optional[Dict[str, Any]] = None,
+) -> Optional[Dict[str, Any]]:
     """
     Fetch CV by id ONLY if it belongs to user_id.
+    Pass `projection` to skip large fields (e.g. parsed_text).
     """
     db = get_database()
     try:
@@ -30,7 +47,7 @@ async def get_cv_by_id_for_user(cv_id: str, user_id: str) -> Optional[Dict[str,
     except Exception:
         return None
 
-    doc = await db["cvs"].find_one({"_id": oid, "user_id": user_id})
+    doc = await db["cvs"].find_one({"_id": oid, "user_id": user_id}, projection)
     if not doc:
         return None
 
@@ -39,6 +56,116 @@ async def get_cv_by_id_for_user(cv_id: str, user_id: str) -> Optional[Dict[str,
     return doc
 
 
+async def update_cv_for_user(cv_id: str, user_id: str, updates: Dict[str, Any]) -> bool:
+    """
+    Set fields on a CV owned by user_id (e.g. a recomputed vector).
+    """
+    db = get_database()
+    try:
+        oid = ObjectId(cv_id)
+    except Exception:
+        return False
+
+    res = await db["cvs"].update_one({"_id": oid, "user_id": user_id}, {"$set": updates})
+    invalidate_cv(user_id, cv_id)
+    return res.matched_count > 0
+
+
+async def delete_cv_for_user(cv_id: str, user_id: str) -> bool:
+    """
+    Delete a CV owned by user_id.
+    """
+    db = get_database()
+    try:
+        oid = ObjectId(cv_id)
+    except Exception:
+        return False
+
+    res = await db["cvs"].delete_one({"_id": oid, "user_id": user_id})
+    invalidate_cv(user_id, cv_id)
+    return res.deleted_count > 0
+
+
+async def get_cv_profile_for_user(cv_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    """
+    The CV without its raw text (skills, skill_ids, experience, vector, ...),
+    served from the per-process cache when possible. Every route that needs a
+    CV goes through here; only vector recomputation reads parsed_text directly.
+    Returns a copy, so callers may add fields.
+    """
+    key = (user_id, cv_id)
+    doc = _cv_cache.get(key)
+    if doc is None:
+        doc = await get_cv_by_id_for_user(cv_id, user_id, projection=CV_PROFILE_PROJECTION)
+        if doc is None:
+            return None
+        _cv_cache.put(key, doc)
+    return dict(doc)
+
+
+async def list_cv_profiles_for_user(user_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+    """
+    Every CV owned by user_id (newest first, without raw text), in one query.
+    """
+    db = get_database()
+    cursor = (
+        db["cvs"]
+        .find({"user_id": user_id}, CV_PROFILE_PROJECTION)
+        .sort("created_at", -1)
+        .limit(limit)
+    )
+    docs = await cursor.to_list(length=limit)
+    for doc in docs:
+        doc["id"] = str(doc["_id"])
+        doc["_id"] = str(doc["_id"])
+    return docs
+
+
+async def get_cv_texts_for_user(user_id: str, cv_ids: Iterable[str]) -> Dict[str, str]:
+    """
+    cv_id -> parsed_text for the given CVs owned by user_id (one query).
+    """
+    oids = []
+    for cv_id in cv_ids:
+        try:
+            oids.append(ObjectId(cv_id))
+        except Exception:
+            continue
+    if not oids:
+        return {}
+
+    db = get_database()
+    cursor = db["cvs"].find({"_id": {"$in": oids}, "user_id": user_id}, {"parsed_text": 1, "text": 1})
+    return {str(doc["_id"]): doc.get("parsed_text") or doc.get("text") or "" async for doc in cursor}
+
+
+def invalidate_cv(user_id: str, cv_id: str) -> None:
+    _cv_cache.pop((user_id, cv_id))
+
+
+def clear_cv_cache() -> None:
+    # after bulk writes (e.g. the vector backfill)
+    _cv_cache.clear()
+
+
+async def find_cv_by_content_hash_for_user(
+    user_id: str,
+    content_hash: str,
+    projection: Optional[Dict[str, Any]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    A previous upload of the exact same file (sha256) by user_id, if any.
+    """
+    db = get_database()
+    doc = await db["cvs"].find_one({"user_id": user_id, "content_hash": content_hash}, projection)
+    if not doc:
+        return None
+
+    doc["id"] = str(doc["_id"])
+    doc["_id"] = str(doc["_id"])
+    return doc
+
+
 # (Optional) keep your old function if other routes still use it
 async def get_cv_by_id(cv_id: str) -> Optional[Dict[str, Any]]:
     db = get_database()
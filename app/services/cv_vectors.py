@@ -0,0 +1,245 @@
+# app/services/cv_vectors.py
+"""
+Stored CV vectors, so matching only has to vectorize the job side.
+
+Backfill / recompute stale vectors:
+    python -m app.services.cv_vectors [--force]
+"""
+import asyncio
+import sys
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.core.database import get_database
+from app.core.executors import run_in_pool
+from app.services.cv_parser import cv_skill_fields
+from app.services.cv_repository import (
+    clear_cv_cache,
+    get_cv_by_id_for_user,
+    get_cv_profile_for_user,
+    get_cv_texts_for_user,
+    invalidate_cv,
+    list_cv_profiles_for_user,
+    update_cv_for_user,
+)
+from app.services.scoring_backends import get_scoring_backend
+from app.services.skill_taxonomy import get_taxonomy
+from app.services.tfidf_model import tfidf_store
+
+if TYPE_CHECKING:
+    from scipy.sparse import csr_matrix
+
+
+def encode_vector(row: "csr_matrix", version: str) -> Dict[str, Any]:
+    """
+    Compact sparse encoding of a single (1 x dim) row for Mongo.
+    """
+    row = row.tocsr()
+    return {
+        "version": version,
+        "dim": int(row.shape[1]),
+        "indices": [int(i) for i in row.indices],
+        "values": [float(v) for v in row.data],
+    }
+
+
+def decode_vector(stored: Dict[str, Any]) -> "csr_matrix":
+    from scipy.sparse import csr_matrix
+
+    indices = stored.get("indices") or []
+    values = stored.get("values") or []
+    return csr_matrix(
+        (values, (([0] * len(indices)), indices)),
+        shape=(1, int(stored["dim"])),
+    )
+
+
+def decode_vectors(stored: List[Dict[str, Any]]) -> "csr_matrix":
+    """
+    Stack many stored rows (same model, so same dim) into one (n x dim) matrix.
+    """
+    from scipy.sparse import csr_matrix
+
+    indptr = [0]
+    indices: List[int] = []
+    values: List[float] = []
+    for row in stored:
+        indices.extend(row.get("indices") or [])
+        values.extend(row.get("values") or [])
+        indptr.append(len(indices))
+    return csr_matrix((values, indices, indptr), shape=(len(stored), int(stored[0]["dim"])))
+
+
+def is_current_vector(stored: Optional[Dict[str, Any]]) -> bool:
+    version = tfidf_store.version
+    return bool(stored) and version is not None and stored.get("version") == version
+
+
+def is_usable_vector(stored: Optional[Dict[str, Any]]) -> bool:
+    """
+    True if scoring can use the stored vector instead of the CV text
+    (current model, and the configured backend scores with TF-IDF vectors).
+    """
+    return get_scoring_backend().uses_stored_vectors and is_current_vector(stored)
+
+
+def compute_cv_vectors(texts: List[str]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Vectorize CV texts with the current corpus model. Blocking.
+    Returns None while no model has been fitted yet.
+    """
+    model = tfidf_store.sync()
+    if model is None:
+        return None
+    matrix = model.vectorizer.transform(texts)
+    return [encode_vector(matrix[i], model.version) for i in range(matrix.shape[0])]
+
+
+def compute_cv_vector(text: str) -> Optional[Dict[str, Any]]:
+    vectors = compute_cv_vectors([text])
+    return vectors[0] if vectors else None
+
+
+def skills_are_current(cv_doc: Dict[str, Any]) -> bool:
+    """
+    True if the CV's skills were extracted with the current skill taxonomy.
+    """
+    return cv_doc.get("skills_version") == get_taxonomy().version
+
+
+def recompute_cv_fields(cvs: List[Dict[str, Any]], force: bool = False) -> List[Dict[str, Any]]:
+    """
+    One $set per CV (each with `parsed_text`): a vector from the current
+    model if the stored one is missing / outdated, and skills re-extracted
+    from the text if the taxonomy changed since. Empty if nothing is stale. Blocking.
+    """
+    updates: List[Dict[str, Any]] = [{} for _ in cvs]
+
+    stale = [i for i, cv in enumerate(cvs) if force or not is_current_vector(cv.get("vector"))]
+    vectors = compute_cv_vectors([cvs[i]["parsed_text"] for i in stale]) if stale else None
+    for i, vector in zip(stale, vectors or []):
+        updates[i]["vector"] = vector
+
+    for cv, update in zip(cvs, updates):
+        if force or not skills_are_current(cv):
+            update.update(cv_skill_fields(cv["parsed_text"]))
+    return updates
+
+
+async def load_cv_for_matching(cv_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetch a CV for matching. `parsed_text` is only loaded when the stored
+    vector can't be used (missing, built by an older model, or a backend
+    that needs text) or the skills predate the current taxonomy; outdated
+    fields are recomputed and written back.
+    """
+    cv_doc = await get_cv_profile_for_user(cv_id, user_id)
+    if cv_doc is None:
+        return None
+
+    if is_usable_vector(cv_doc.get("vector")) and skills_are_current(cv_doc):
+        return cv_doc
+
+    text_doc = await get_cv_by_id_for_user(cv_id, user_id, projection={"parsed_text": 1, "text": 1})
+    cv_text = (text_doc or {}).get("parsed_text") or (text_doc or {}).get("text") or ""
+    cv_doc["parsed_text"] = cv_text
+
+    if cv_text:
+        updates = (await run_in_pool("scoring", recompute_cv_fields, [cv_doc]))[0]
+        if updates:
+            cv_doc.update(updates)
+            await update_cv_for_user(cv_id, user_id, updates)
+
+    return cv_doc
+
+
+async def load_cvs_for_ranking(user_id: str, limit: int) -> List[Dict[str, Any]]:
+    """
+    Every CV of a user for ranking: one projected query. CVs whose stored
+    vector can't be used (or whose skills are outdated) also get their
+    parsed_text (one extra query for all of them); outdated fields are
+    recomputed and written back.
+    """
+    cvs = await list_cv_profiles_for_user(user_id, limit=limit)
+    need_text = [cv for cv in cvs if not (is_usable_vector(cv.get("vector")) and skills_are_current(cv))]
+    if not need_text:
+        return cvs
+
+    texts = await get_cv_texts_for_user(user_id, [cv["id"] for cv in need_text])
+    for cv in need_text:
+        cv["parsed_text"] = texts.get(cv["id"], "")
+
+    with_text = [cv for cv in need_text if cv["parsed_text"]]
+    updates = await run_in_pool("scoring", recompute_cv_fields, with_text) if with_text else []
+    changed = [(cv, u) for cv, u in zip(with_text, updates) if u]
+    if changed:
+        db = get_database()
+        await db["cvs"].bulk_write(
+            [UpdateOne({"_id": ObjectId(cv["id"]), "user_id": user_id}, {"$set": u}) for cv, u in changed],
+            ordered=False,
+        )
+        for cv, u in changed:
+            cv.update(u)
+            invalidate_cv(user_id, cv["id"])
+
+    return cvs
+
+
+async def backfill_cv_vectors(batch_size: int = 200, force: bool = False) -> Dict[str, int]:
+    """
+    Compute vectors for CVs that have none or whose version is not the
+    current model's, and re-extract skills from the text of CVs whose
+    skills predate the current taxonomy.
+    """
+    version = tfidf_store.version
+    if version is None:
+        raise RuntimeError("No TF-IDF model has been fitted yet (POST /admin/tfidf/refit).")
+
+    db = get_database()
+    query: Dict[str, Any] = {} if force else {
+        "$or": [{"vector.version": {"$ne": version}}, {"skills_version": {"$ne": get_taxonomy().version}}]
+    }
+    cursor = db["cvs"].find(query, {"parsed_text": 1, "text": 1, "vector.version": 1, "skills_version": 1})
+
+    updated = 0
+    skipped = 0
+    batch: List[Dict[str, Any]] = []
+
+    async def _flush():
+        nonlocal updated
+        for d in batch:
+            d["parsed_text"] = d.get("parsed_text") or d.get("text") or ""
+        updates = await run_in_pool("scoring", recompute_cv_fields, batch, force)
+        ops = [UpdateOne({"_id": d["_id"]}, {"$set": u}) for d, u in zip(batch, updates) if u]
+        if ops:
+            await db["cvs"].bulk_write(ops, ordered=False)
+            clear_cv_cache()
+            updated += len(ops)
+        batch.clear()
+
+    async for doc in cursor:
+        if not (doc.get("parsed_text") or doc.get("text")):
+            skipped += 1
+            continue
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            await _flush()
+
+    if batch:
+        await _flush()
+
+    return {"updated": updated, "skipped": skipped}
+
+
+async def _main(argv: List[str]) -> None:
+    if not tfidf_store.load():
+        print(f"No TF-IDF model found at {tfidf_store.path}")
+        sys.exit(1)
+    result = await backfill_cv_vectors(force="--force" in argv)
+    print(f"CV vectors ({tfidf_store.version}): {result}")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main(sys.argv[1:]))
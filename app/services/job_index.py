@@ -0,0 +1,703 @@
+# app/services/job_index.py
+"""
+On-disk vector index of the job descriptions in each user's match history /
+tracked jobs, for "find similar postings" without reading Mongo.
+
+Rows are the corpus TF-IDF vectors (same vectorizer as JobMatcherService)
+reduced with a sparse random projection to JOB_INDEX_DIM dense float32
+values and L2-normalized, so cosine similarity is a dot product. One row per
+(user, posting); a later row for the same pair supersedes the earlier one.
+Search is a top-k over that user's rows only.
+
+Files in JOB_INDEX_DIR:
+    meta.json       model version (+ fit time), dim, build id
+    projection.npz  (n_features x dim) projection for that model
+    vectors.f32     append-only float32 rows
+    rows.jsonl      append-only row metadata (same order as vectors.f32)
+
+Appends take an exclusive lock on JOB_INDEX_DIR.lock; rebuild / compaction
+write a new directory and swap it in under the same lock. Every worker
+process picks up appended rows and swapped builds on its next search.
+
+    python -m app.services.job_index rebuild   # re-index from Mongo (current model)
+    python -m app.services.job_index compact   # drop superseded rows
+    python -m app.services.job_index stats
+"""
+import asyncio
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from app.core import metrics
+from app.core.database import get_database
+from app.core.executors import run_in_pool
+from app.core.filelock import FileLock
+from app.services.job_posting_repository import get_job_descriptions, posting_id_for
+from app.services.tfidf_model import tfidf_store
+
+if TYPE_CHECKING:
+    import numpy as np
+    from scipy.sparse import csr_matrix
+
+    from app.services.tfidf_model import TfidfModel
+
+JOB_INDEX_DIR = os.getenv("JOB_INDEX_DIR", "data/job_index")
+JOB_INDEX_DIM = int(os.getenv("JOB_INDEX_DIM", "256"))
+# Descriptions vectorized per chunk during a rebuild
+JOB_INDEX_BATCH = 500
+
+# metadata kept per row (everything a search result needs)
+_ROW_FIELDS = ("job_title", "company", "cv_id", "match_id", "tracked_job_id")
+
+
+class JobIndexUnavailable(Exception):
+    """
+    No index for the current TF-IDF model yet (none fitted, or rebuilding).
+    """
+
+
+def build_projection(n_features: int, dim: int, seed: int = 0) -> "csr_matrix":
+    """
+    Sparse random projection (Achlioptas / Li: ±1 entries, density 1/sqrt(n_features)).
+    """
+    import numpy as np
+    from scipy.sparse import csr_matrix
+
+    rng = np.random.default_rng(seed)
+    nnz = max(dim, int(n_features * dim / max(1.0, np.sqrt(n_features))))
+    rows = rng.integers(0, n_features, nnz)
+    cols = rng.integers(0, dim, nnz)
+    values = rng.choice(np.array([-1.0, 1.0], dtype=np.float32), nnz)
+    return csr_matrix((values, (rows, cols)), shape=(n_features, dim), dtype=np.float32)
+
+
+def _normalize(matrix: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+class JobIndex:
+    def __init__(self, directory: str = JOB_INDEX_DIR, dim: int = JOB_INDEX_DIM):
+        self.directory = directory
+        self.dim = dim
+        self.lock_path = f"{directory}.lock"
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.meta: Optional[Dict[str, Any]] = None
+        self._meta_mtime: Optional[int] = None
+        self._projection = None
+        self._chunks: list = []
+        self._vectors = None
+        self._rows: List[Dict[str, Any]] = []
+        self._rows_offset = 0
+        self._latest: Dict[str, Dict[str, int]] = {}  # user -> posting -> latest row
+        self._refs: Dict[Tuple[str, str], str] = {}  # (user, match / tracked job id) -> posting
+        self._user_rows: Dict[str, Any] = {}  # user -> np.ndarray of live rows (cache)
+
+    def _path(self, name: str, directory: Optional[str] = None) -> str:
+        return os.path.join(directory or self.directory, name)
+
+    # --------------------------
+    # loading
+    # --------------------------
+    def refresh(self) -> bool:
+        """
+        Pick up rows appended (or a build swapped in) by any process.
+        Returns True if an index exists.
+        """
+        try:
+            mtime = os.stat(self._path("meta.json")).st_mtime_ns
+        except OSError:
+            with self._lock:
+                self._reset()
+            return False
+
+        with self._lock, FileLock(self.lock_path, shared=True):
+            if mtime != self._meta_mtime:
+                self._load_build()
+            self._read_tail()
+        return True
+
+    def _load_build(self) -> None:
+        from scipy.sparse import load_npz
+
+        self._reset()
+        with open(self._path("meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self._meta_mtime = os.stat(self._path("meta.json")).st_mtime_ns
+        self._projection = load_npz(self._path("projection.npz")).tocsr()
+
+    def _read_tail(self) -> None:
+        import numpy as np
+
+        rows_path = self._path("rows.jsonl")
+        if not os.path.exists(rows_path) or os.path.getsize(rows_path) <= self._rows_offset:
+            return
+
+        with open(rows_path, "rb") as f:
+            f.seek(self._rows_offset)
+            data = f.read()
+        complete = data[: data.rfind(b"\n") + 1]  # a line is only used once fully written
+        lines = complete.splitlines()
+        if not lines:
+            return
+
+        dim = self.meta["dim"]
+        start = len(self._rows)
+        vectors = np.fromfile(self._path("vectors.f32"), dtype=np.float32, count=len(lines) * dim, offset=start * dim * 4)
+        if vectors.size < len(lines) * dim:
+            return  # vectors are written first, so this only happens mid-swap
+        self._rows_offset += len(complete)
+        self._chunks.append(vectors.reshape(len(lines), dim))
+        self._vectors = None
+
+        for i, line in enumerate(lines, start=start):
+            row = json.loads(line)
+            self._rows.append(row)
+            user_id = row["user_id"]
+            if row.get("removed_tracked_job_id"):
+                self._refs.pop((user_id, row["removed_tracked_job_id"]), None)
+            if row.get("deleted"):
+                self._latest.get(user_id, {}).pop(row["posting_id"], None)
+            else:
+                self._latest.setdefault(user_id, {})[row["posting_id"]] = i
+                for ref in ("match_id", "tracked_job_id"):
+                    if row.get(ref):
+                        self._refs[(user_id, row[ref])] = row["posting_id"]
+            self._user_rows.pop(user_id, None)
+
+    def _matrix(self) -> "np.ndarray":
+        import numpy as np
+
+        if self._vectors is None:
+            if not self._chunks:
+                return np.zeros((0, self.meta["dim"]), dtype=np.float32)
+            self._vectors = np.concatenate(self._chunks) if len(self._chunks) > 1 else self._chunks[0]
+            self._chunks = [self._vectors]
+        return self._vectors
+
+    def _live_rows(self, user_id: str) -> "np.ndarray":
+        import numpy as np
+
+        rows = self._user_rows.get(user_id)
+        if rows is None:
+            rows = np.fromiter(self._latest.get(user_id, {}).values(), dtype=np.int64)
+            self._user_rows[user_id] = rows
+        return rows
+
+    # --------------------------
+    # vectors
+    # --------------------------
+    def is_current(self) -> bool:
+        version = tfidf_store.version
+        return self.meta is not None and version is not None and self.meta["model_version"] == version
+
+    def needs_rebuild(self) -> bool:
+        """
+        True if the index is missing or was built for a model older than the
+        persisted one. A process that has not picked up the persisted model
+        yet never rebuilds (it would overwrite a newer index with an older model).
+        """
+        model = tfidf_store.current
+        if model is None:
+            return False
+        persisted = tfidf_store.persisted_info()
+        if persisted is not None and persisted.get("version") != model.version:
+            return False
+        if self.meta is None:
+            return True
+        return self.meta["model_version"] != model.version and self.meta.get("model_fitted_at", 0) < model.fitted_at
+
+    def project(self, tfidf_rows: "csr_matrix", projection=None) -> "np.ndarray":
+        projection = self._projection if projection is None else projection
+        return _normalize((tfidf_rows @ projection).toarray())
+
+    def embed(self, texts: List[str]) -> "np.ndarray":
+        model = tfidf_store.current
+        return self.project(model.vectorizer.transform(texts))
+
+    # --------------------------
+    # writes
+    # --------------------------
+    def _append(self, directory: str, vectors: "np.ndarray", rows: List[Dict[str, Any]]) -> None:
+        # vectors first: a reader only uses rows whose vectors are already on disk
+        with open(self._path("vectors.f32", directory), "ab") as f:
+            f.write(vectors.astype("float32").tobytes())
+        with open(self._path("rows.jsonl", directory), "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in rows))
+
+    def add(self, user_id: str, entries: List[Dict[str, Any]]) -> int:
+        """
+        Index new match / tracked job entries ({description, job_title, ...}). Blocking.
+        Returns how many rows were written (0 if the index is missing or stale).
+        """
+        if not self.refresh() or not self.is_current():
+            return 0
+
+        entries = [e for e in entries if e.get("description")]
+        if not entries:
+            return 0
+
+        with self._lock:
+            vectors = self.embed([e["description"] for e in entries])
+            rows = []
+            for e in entries:
+                posting_id = posting_id_for(e["description"])
+                previous = self._latest.get(user_id, {}).get(posting_id)
+                merged = {k: v for k, v in self._rows[previous].items() if k in _ROW_FIELDS} if previous is not None else {}
+                merged.update({k: e[k] for k in _ROW_FIELDS if e.get(k)})
+                rows.append({**merged, "user_id": user_id, "posting_id": posting_id})
+
+            with FileLock(self.lock_path):
+                if os.stat(self._path("meta.json")).st_mtime_ns != self._meta_mtime:
+                    return 0  # a rebuild swapped in meanwhile (it reads these rows from Mongo)
+                self._append(self.directory, vectors, rows)
+        metrics.incr("job_index_rows_added", len(rows))
+        return len(rows)
+
+    def remove_tracked_job(self, user_id: str, tracked_job_id: str) -> int:
+        """
+        Drop a deleted tracked job. Its posting stays indexed (without the
+        tracked job id) while match history still references it, like a
+        rebuild from Mongo would. Blocking. Returns how many rows were written.
+        """
+        import numpy as np
+
+        if not self.refresh():
+            return 0
+
+        with self._lock:
+            posting_id = self._refs.get((user_id, tracked_job_id))
+            latest = self._latest.get(user_id, {}).get(posting_id) if posting_id else None
+            if latest is None:
+                return 0
+
+            previous = self._rows[latest]
+            row = {k: v for k, v in previous.items() if k in _ROW_FIELDS}
+            if row.get("tracked_job_id") == tracked_job_id:
+                del row["tracked_job_id"]
+            row.update({"user_id": user_id, "posting_id": posting_id, "removed_tracked_job_id": tracked_job_id})
+
+            if row.get("match_id") or row.get("tracked_job_id"):
+                vector = self._matrix()[latest]
+            else:
+                # a tombstone: rows and vectors stay aligned, compaction drops both
+                row["deleted"] = True
+                vector = np.zeros(self.meta["dim"], dtype=np.float32)
+
+            with FileLock(self.lock_path):
+                if os.stat(self._path("meta.json")).st_mtime_ns != self._meta_mtime:
+                    return 0  # a rebuild swapped in meanwhile (it no longer sees the deleted job)
+                self._append(self.directory, vector[None, :], [row])
+        metrics.incr("job_index_rows_removed")
+        return 1
+
+    def write_build(self, directory: str, n_features: int) -> "csr_matrix":
+        """
+        Start a fresh build in `directory`; returns its projection. Blocking.
+        """
+        from scipy.sparse import save_npz
+
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+        projection = build_projection(n_features, self.dim)
+        save_npz(self._path("projection.npz", directory), projection)
+        for name in ("vectors.f32", "rows.jsonl"):
+            open(self._path(name, directory), "wb").close()
+        return projection
+
+    def swap_in(self, directory: str, model: "TfidfModel") -> None:
+        """
+        Finish a build: write its meta.json and replace the live index. Blocking.
+        """
+        meta = {
+            "model_version": model.version,
+            "model_fitted_at": model.fitted_at,
+            "dim": self.dim,
+            "build_id": uuid.uuid4().hex,
+            "built_at": time.time(),
+        }
+        with open(self._path("meta.json", directory), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+        old = f"{self.directory}.old-{uuid.uuid4().hex[:8]}"
+        with FileLock(self.lock_path):
+            if os.path.exists(self.directory):
+                os.replace(self.directory, old)
+            os.replace(directory, self.directory)
+        shutil.rmtree(old, ignore_errors=True)
+
+    def compact(self) -> Dict[str, int]:
+        """
+        Rewrite the index with only the latest row per (user, posting). Blocking.
+        """
+        if not self.refresh():
+            return {"rows": 0, "dropped": 0}
+
+        tmp = f"{self.directory}.compact-{uuid.uuid4().hex[:8]}"
+        # same lock order as refresh() / add(): thread lock, then the file lock
+        with self._lock, FileLock(self.lock_path):
+            # no appends while copying, so nothing is lost by the swap
+            self._read_tail()
+            live = sorted(i for postings in self._latest.values() for i in postings.values())
+            vectors = self._matrix()[live]
+            rows = [{k: v for k, v in self._rows[i].items() if k != "removed_tracked_job_id"} for i in live]
+            total = len(self._rows)
+
+            os.makedirs(tmp)
+            shutil.copy(self._path("projection.npz"), self._path("projection.npz", tmp))
+            for name in ("vectors.f32", "rows.jsonl"):
+                open(self._path(name, tmp), "wb").close()
+            self._append(tmp, vectors, rows)
+            meta = {**self.meta, "build_id": uuid.uuid4().hex, "compacted_at": time.time()}
+            with open(self._path("meta.json", tmp), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+            old = f"{self.directory}.old-{uuid.uuid4().hex[:8]}"
+            os.replace(self.directory, old)
+            os.replace(tmp, self.directory)
+        shutil.rmtree(old, ignore_errors=True)
+        return {"rows": len(rows), "dropped": total - len(rows)}
+
+    # --------------------------
+    # search
+    # --------------------------
+    def posting_for_ref(self, user_id: str, ref_id: str) -> Optional[str]:
+        return self._refs.get((user_id, ref_id))
+
+    def vector_for_posting(self, user_id: str, posting_id: str) -> Optional["np.ndarray"]:
+        row = self._latest.get(user_id, {}).get(posting_id)
+        return None if row is None else self._matrix()[row]
+
+    def search(
+        self,
+        user_id: str,
+        vector: "np.ndarray",
+        k: int = 10,
+        exclude_posting: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Top-k of the user's indexed postings by cosine similarity to `vector`. Blocking.
+        """
+        import numpy as np
+
+        with self._lock:
+            rows = self._live_rows(user_id)
+            if exclude_posting is not None:
+                excluded = self._latest.get(user_id, {}).get(exclude_posting)
+                rows = rows[rows != excluded]
+            if not len(rows):
+                return []
+
+            scores = self._matrix()[rows] @ vector
+            k = min(k, len(rows))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                {
+                    **{k: v for k, v in self._rows[rows[i]].items() if k in _ROW_FIELDS},
+                    "job_posting_id": self._rows[rows[i]]["posting_id"],
+                    "similarity": round(float(scores[i]), 4),
+                }
+                for i in top
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        self.refresh()
+        with self._lock:
+            return {
+                "model_version": self.meta["model_version"] if self.meta else None,
+                "current": self.is_current(),
+                "rows": len(self._rows),
+                "live_rows": sum(len(postings) for postings in self._latest.values()),
+                "users": len(self._latest),
+            }
+
+
+job_index = JobIndex()
+
+_rebuild_task: Optional[asyncio.Task] = None
+_update_tasks: set = set()
+
+
+async def _indexed_entries(since: Optional[datetime] = None) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """
+    (user, posting) -> row metadata from job_matches + tracked_jobs (latest wins).
+    Legacy docs with inline text carry it as `description`.
+    """
+    db = get_database()
+    query = {"created_at": {"$gte": since}} if since else {}
+    fields = {"user_id": 1, "job_posting_id": 1, "job_description": 1, "job_title": 1,
+              "company": 1, "cv_id": 1, "job_match_id": 1, "created_at": 1}
+
+    entries: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for collection, ref in (("job_matches", "match_id"), ("tracked_jobs", "tracked_job_id")):
+        async for doc in db[collection].find(query, fields):
+            posting_id = doc.get("job_posting_id") or (posting_id_for(doc["job_description"]) if doc.get("job_description") else None)
+            if not posting_id or not doc.get("user_id"):
+                continue
+            key = (doc["user_id"], posting_id)
+            entry = entries.setdefault(key, {"created_at": doc.get("created_at") or datetime.min})
+            newer = (doc.get("created_at") or datetime.min) >= entry["created_at"]
+            values = {
+                "job_title": doc.get("job_title"),
+                "company": doc.get("company"),
+                "cv_id": doc.get("cv_id"),
+                ref: str(doc["_id"]),
+                "match_id": doc.get("job_match_id") if ref == "tracked_job_id" else str(doc["_id"]),
+                "description": doc.get("job_description"),
+            }
+            for k, v in values.items():
+                if v and (newer or not entry.get(k)):
+                    entry[k] = v
+            if newer:
+                entry["created_at"] = doc.get("created_at") or entry["created_at"]
+    return entries
+
+
+async def _write_entries(directory: str, projection, entries: Dict[Tuple[str, str], Dict[str, Any]]) -> int:
+    model = tfidf_store.current
+    items = list(entries.items())
+    written = 0
+
+    for start in range(0, len(items), JOB_INDEX_BATCH):
+        chunk = items[start:start + JOB_INDEX_BATCH]
+        texts = await get_job_descriptions(p for (_, p), e in chunk if not e.get("description"))
+        docs = [(key, e, e.get("description") or texts.get(key[1])) for key, e in chunk]
+        docs = [d for d in docs if d[2]]
+        if not docs:
+            continue
+
+        rows = [
+            {**{k: e[k] for k in _ROW_FIELDS if e.get(k)}, "user_id": user_id, "posting_id": posting_id}
+            for (user_id, posting_id), e, _ in docs
+        ]
+
+        def _embed_and_append():
+            vectors = job_index.project(model.vectorizer.transform([text for _, _, text in docs]), projection)
+            with FileLock(job_index.lock_path):
+                job_index._append(directory, vectors, rows)
+
+        # vectorizing, the flock and the file writes all block: scoring pool
+        await run_in_pool("scoring", _embed_and_append)
+        written += len(rows)
+    return written
+
+
+def _stale_index() -> bool:
+    tfidf_store.sync()
+    job_index.refresh()
+    return job_index.needs_rebuild()
+
+
+async def rebuild_job_index(only_if_stale: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Re-index every stored match / tracked job with the current TF-IDF model.
+
+    One rebuild at a time across processes (flock on JOB_INDEX_DIR.rebuild.lock;
+    BlockingIOError if another one is running). With `only_if_stale`, returns
+    None without rebuilding unless needs_rebuild() says so.
+    """
+    model = await run_in_pool("scoring", tfidf_store.sync)
+    if model is None:
+        raise JobIndexUnavailable("No TF-IDF model has been fitted yet.")
+
+    with FileLock(f"{job_index.directory}.rebuild.lock", blocking=False):
+        # checked under the lock: another process may have just finished a rebuild
+        if only_if_stale and not await run_in_pool("scoring", _stale_index):
+            return None
+
+        started = datetime.utcnow()
+        tmp = f"{job_index.directory}.build-{uuid.uuid4().hex[:8]}"
+        projection = await run_in_pool("scoring", job_index.write_build, tmp, len(model.vectorizer.vocabulary_))
+        written = await _write_entries(tmp, projection, await _indexed_entries())
+        await run_in_pool("scoring", job_index.swap_in, tmp, model)
+
+        # catch up on rows saved while the build ran (those appends went to the old index)
+        await run_in_pool("scoring", job_index.refresh)
+        entries = await _indexed_entries(since=started)
+        if entries:
+            written += await _write_entries(job_index.directory, job_index._projection, entries)
+
+    metrics.incr("job_index_rebuilds")
+    return {"model_version": model.version, "rows": written}
+
+
+def ensure_job_index() -> None:
+    """
+    Start a background rebuild if the index is missing or was built for a
+    model older than the persisted one (at most one at a time across processes).
+    """
+    global _rebuild_task
+    if _rebuild_task is not None and not _rebuild_task.done():
+        return
+
+    async def _run():
+        try:
+            await rebuild_job_index(only_if_stale=True)
+        except (JobIndexUnavailable, BlockingIOError):
+            pass
+        except Exception as e:
+            print(f"Job index rebuild failed: {type(e).__name__}: {e}")
+
+    _rebuild_task = asyncio.create_task(_run())
+
+
+def schedule_job_index_update(user_id: str, entries: List[Dict[str, Any]]) -> None:
+    """
+    Index freshly saved matches / tracked jobs in the background (never
+    delays or fails the request that saved them). Entries need `description`
+    and may carry job_title, company, cv_id, match_id, tracked_job_id.
+    """
+    entries = [e for e in entries if e.get("description")]
+    if not entries:
+        return
+
+    async def _run():
+        try:
+            if not await run_in_pool("scoring", job_index.add, user_id, entries):
+                if not job_index.is_current():
+                    ensure_job_index()
+        except Exception as e:
+            # pool saturated / disk error: the next rebuild picks these rows up
+            metrics.incr("job_index_updates_dropped")
+            print(f"Job index update skipped: {type(e).__name__}: {e}")
+
+    _track(asyncio.create_task(_run()))
+
+
+def schedule_job_index_removal(user_id: str, tracked_job_id: str) -> None:
+    """
+    Drop a deleted tracked job from the index in the background.
+    """
+
+    async def _run():
+        try:
+            await run_in_pool("scoring", job_index.remove_tracked_job, user_id, tracked_job_id)
+        except Exception as e:
+            # a rebuild / compaction from Mongo drops it too
+            metrics.incr("job_index_updates_dropped")
+            print(f"Job index removal skipped: {type(e).__name__}: {e}")
+
+    _track(asyncio.create_task(_run()))
+
+
+def _track(task: asyncio.Task) -> None:
+    # keep a reference so the task isn't garbage-collected mid-run
+    _update_tasks.add(task)
+    task.add_done_callback(_update_tasks.discard)
+
+
+def _search_ready() -> None:
+    # blocking part of a search: load the model + pick up other processes' appends
+    tfidf_store.sync()
+    job_index.refresh()
+
+
+async def _ready_index() -> None:
+    await run_in_pool("scoring", _search_ready)
+    if not job_index.is_current():
+        ensure_job_index()
+        raise JobIndexUnavailable("Similar-job index is being built.")
+
+
+async def find_similar_to_cv(user_id: str, cv_doc: Dict[str, Any], k: int) -> List[Dict[str, Any]]:
+    """
+    cv_doc as returned by load_cv_for_matching (stored vector and/or parsed_text).
+    """
+    await _ready_index()
+
+    def _search():
+        from app.services.cv_vectors import decode_vector, is_current_vector
+
+        stored = cv_doc.get("vector")
+        if is_current_vector(stored):
+            query = job_index.project(decode_vector(stored))[0]
+        else:
+            query = job_index.embed([cv_doc.get("parsed_text") or ""])[0]
+        return job_index.search(user_id, query, k)
+
+    return await run_in_pool("scoring", _search)
+
+
+async def find_similar_to_job(user_id: str, ref_id: str, k: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Postings similar to a tracked job or match (by id). None if it doesn't exist.
+    """
+    await _ready_index()
+
+    posting_id = job_index.posting_for_ref(user_id, ref_id)
+    description = None
+    if posting_id is None:
+        # not indexed (yet): one point read for its posting reference
+        from bson import ObjectId
+
+        try:
+            oid = ObjectId(ref_id)
+        except Exception:
+            return None
+        db = get_database()
+        fields = {"job_posting_id": 1, "job_description": 1}
+        doc = await db["tracked_jobs"].find_one({"_id": oid, "user_id": user_id}, fields)
+        doc = doc or await db["job_matches"].find_one({"_id": oid, "user_id": user_id}, fields)
+        if doc is None:
+            return None
+        description = doc.get("job_description")
+        posting_id = doc.get("job_posting_id") or (posting_id_for(description) if description else None)
+        if posting_id is None:
+            return []
+
+    def _search():
+        query = job_index.vector_for_posting(user_id, posting_id)
+        if query is None:
+            if not description:
+                return None
+            query = job_index.embed([description])[0]
+        return job_index.search(user_id, query, k, exclude_posting=posting_id)
+
+    results = await run_in_pool("scoring", _search)
+    if results is None:
+        # not indexed yet and no inline text: embed the posting's stored text
+        text = (await get_job_descriptions([posting_id])).get(posting_id)
+        if not text:
+            return []
+        query = await run_in_pool("scoring", lambda: job_index.embed([text])[0])
+        results = await run_in_pool("scoring", job_index.search, user_id, query, k, posting_id)
+    return results
+
+
+async def _main(argv: List[str]) -> None:
+    command = argv[0] if argv else "stats"
+    if command not in ("rebuild", "compact", "stats"):
+        print(__doc__)
+        sys.exit(1)
+
+    if not tfidf_store.ensure_loaded():
+        print(f"No TF-IDF model found at {tfidf_store.path}")
+        sys.exit(1)
+
+    if command == "rebuild":
+        try:
+            print(f"Rebuilt: {await rebuild_job_index()}")
+        except BlockingIOError:
+            print("A rebuild is already running.")
+            sys.exit(1)
+    elif command == "compact":
+        print(f"Compacted: {job_index.compact()}")
+    else:
+        print(job_index.stats())
+
+
+if __name__ == "__main__":
+    asyncio.run(_main(sys.argv[1:]))
@@ -1,24 +1,74 @@
-from typing import List, Dict, Any, Optional
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
 
+from app.services.scoring_backends import ScoringBackend, get_scoring_backend, scoring_weights
+from app.services.skill_taxonomy import get_taxonomy
+from app.services.tfidf_model import TfidfModelStore, tfidf_store
+
+if TYPE_CHECKING:
+    from app.services.skill_overlap import SkillOverlap
 
-class JobMatcherService:
-    def __init__(self):
-        # You can reuse a single vectorizer instance
-        self.vectorizer = TfidfVectorizer(stop_words="english")
 
-    def compute_semantic_score(self, cv_text: str, job_text: str) -> float:
+class JobMatcherService:
+    def __init__(
+        self,
+        model_store: TfidfModelStore = tfidf_store,
+        backend: Optional[ScoringBackend] = None,
+        weights: Optional[Tuple[float, float]] = None,
+    ):
+        # Corpus-fitted vectorizer (transform only, safe to share across requests)
+        self.model_store = model_store
+        # None -> SCORING_BACKEND / SCORING_*_WEIGHT
+        self._backend = backend
+        self._weights = weights
+
+    @property
+    def backend(self) -> ScoringBackend:
+        return self._backend or get_scoring_backend()
+
+    @property
+    def weights(self) -> Tuple[float, float]:
+        return self._weights or scoring_weights()
+
+    def compute_semantic_scores(
+        self,
+        cv_text: str,
+        job_texts: List[str],
+        cv_vector: Optional[Dict[str, Any]] = None,
+    ) -> List[float]:
         """
-        Returns a semantic similarity score between 0 and 1.
+        Semantic similarity (0–1) of one CV against many job texts, in one
+        backend call (TF-IDF: a single sparse matrix product).
+        If `cv_vector` was stored with the current model, only the jobs are vectorized.
         """
-        documents = [cv_text, job_text]
+        return self.backend.similarities(cv_text, job_texts, text_vector=cv_vector)
 
-        tfidf_matrix = self.vectorizer.fit_transform(documents)
-        similarity_matrix = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])
-        score = float(similarity_matrix[0][0])
+    def compute_cv_semantic_scores(
+        self,
+        job_text: str,
+        cvs: List[Dict[str, Any]],
+    ) -> List[float]:
+        """
+        Semantic similarity (0–1) of one job against many CVs: the job is
+        vectorized once and scored against every CV in one backend call.
+        Each CV dict has a stored `vector` and/or `parsed_text`; CVs whose
+        vector was built by the current model are not re-vectorized.
+        """
+        return self.backend.similarities(
+            job_text,
+            [cv.get("parsed_text") or "" for cv in cvs],
+            other_vectors=[cv.get("vector") for cv in cvs],
+        )
 
-        return score
+    def compute_semantic_score(
+        self,
+        cv_text: str,
+        job_text: str,
+        cv_vector: Optional[Dict[str, Any]] = None,
+    ) -> float:
+        """
+        Returns a semantic similarity score between 0 and 1.
+        """
+        return self.compute_semantic_scores(cv_text, [job_text], cv_vector)[0]
 
     def compute_skill_overlap(
         self,
@@ -27,6 +77,7 @@ class JobMatcherService:
     ) -> Dict[str, Any]:
         """
         Compute overlap between CV skills and job skills.
+        Skills (names, synonyms or ids) are compared by canonical skill id.
 
         Returns:
             {
@@ -35,36 +86,22 @@ class JobMatcherService:
                 "skill_score": 0.0–1.0
             }
         """
-        # Normalize skills: lowercase + strip whitespace
-        cv_set = {
-            skill.strip().lower()
-            for skill in cv_skills
-            if skill and skill.strip()
-        }
-        job_set = {
-            skill.strip().lower()
-            for skill in job_skills
-            if skill and skill.strip()
-        }
-
-        # If the job has no skills detected, we can't compute a meaningful score
-        if not job_set:
-            return {
-                "overlapping_skills": [],
-                "missing_skills": [],
-                "skill_score": 0.0,
-            }
+        # Normalized to canonical ids ("gsuite" == "google workspace");
+        # a job with no detected skills scores 0
+        return self.compute_skill_overlaps([cv_skills], [job_skills]).result(0, 0)
 
-        overlapping = cv_set.intersection(job_set)
-        missing = job_set.difference(cv_set)
+    def compute_skill_overlaps(
+        self,
+        cv_skill_lists: List[List[str]],
+        job_skill_lists: List[List[str]],
+    ) -> "SkillOverlap":
+        """
+        Skill overlap for every (CV, job) pair: each list is encoded once as a
+        bit row, `.result(cv_index, job_index)` gives the compute_skill_overlap dict.
+        """
+        from app.services.skill_overlap import SkillOverlap  # numpy: first match only
 
-        skill_score = len(overlapping) / len(job_set)
-
-        return {
-            "overlapping_skills": sorted(list(overlapping)),
-            "missing_skills": sorted(list(missing)),
-            "skill_score": skill_score,
-        }
+        return SkillOverlap(cv_skill_lists, job_skill_lists, get_taxonomy())
 
 
     def compute_match_result(
@@ -76,25 +113,105 @@ class JobMatcherService:
         company: Optional[str],
         job_description: str,
         job_skills: List[str],
+        cv_vector: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         Combine semantic similarity and skill overlap into a final match score.
-        - semantic_score: 0–1 (TF-IDF cosine similarity)
+        - semantic_score: 0–1 (scoring backend, TF-IDF cosine by default)
         - skill_score:    0–1 (overlap of skills)
         - match_score:    0–100 (weighted combination)
         """
         # 1. Semantic similarity between CV text and job description
-        semantic_score = self.compute_semantic_score(cv_text, job_description)
+        semantic_score = self.compute_semantic_score(cv_text, job_description, cv_vector)
+
+        # 2. Skill overlap + weighted combination
+        return self._build_match_result(
+            cv_id=cv_id,
+            job_title=job_title,
+            company=company,
+            job_skills=job_skills,
+            semantic_score=semantic_score,
+            overlap_result=self.compute_skill_overlap(cv_skills, job_skills),
+        )
+
+    def compute_match_results_batch(
+        self,
+        cv_id: str,
+        cv_text: str,
+        cv_skills: List[str],
+        jobs: List[Dict[str, Any]],
+        cv_vector: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Score one CV against many jobs. Each job dict needs `job_description`
+        and `job_skills` (optionally `job_title` / `company`).
+        Results are returned in input order.
+        """
+        semantic_scores = self.compute_semantic_scores(
+            cv_text,
+            [job["job_description"] for job in jobs],
+            cv_vector,
+        )
+        overlap = self.compute_skill_overlaps([cv_skills], [job["job_skills"] for job in jobs])
+
+        return [
+            self._build_match_result(
+                cv_id=cv_id,
+                job_title=job.get("job_title"),
+                company=job.get("company"),
+                job_skills=job["job_skills"],
+                semantic_score=semantic_score,
+                overlap_result=overlap.result(0, i),
+            )
+            for i, (job, semantic_score) in enumerate(zip(jobs, semantic_scores))
+        ]
+
+    def rank_cvs_for_job(
+        self,
+        job_title: Optional[str],
+        company: Optional[str],
+        job_description: str,
+        job_skills: List[str],
+        cvs: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Score every CV against one job; results ranked best first.
+        """
+        semantic_scores = self.compute_cv_semantic_scores(job_description, cvs)
+        overlap = self.compute_skill_overlaps([cv.get("skill_ids") or cv.get("skills", []) for cv in cvs], [job_skills])
+
+        results = [
+            {
+                **self._build_match_result(
+                    cv_id=cv["id"],
+                    job_title=job_title,
+                    company=company,
+                    job_skills=job_skills,
+                    semantic_score=semantic_score,
+                    overlap_result=overlap.result(i, 0),
+                ),
+                "file_name": cv.get("file_name"),
+            }
+            for i, (cv, semantic_score) in enumerate(zip(cvs, semantic_scores))
+        ]
+        results.sort(key=lambda r: r["match_score"], reverse=True)
+        return results
 
-        # 2. Skill overlap
-        overlap_result = self.compute_skill_overlap(cv_skills, job_skills)
+    def _build_match_result(
+        self,
+        cv_id: str,
+        job_title: Optional[str],
+        company: Optional[str],
+        job_skills: List[str],
+        semantic_score: float,
+        overlap_result: Dict[str, Any],
+    ) -> Dict[str, Any]:
         skill_score = overlap_result["skill_score"]
         overlapping_skills = overlap_result["overlapping_skills"]
         missing_skills = overlap_result["missing_skills"]
 
-        # 3. Weighted combination
-        weight_semantic = 0.7
-        weight_skills = 0.3
+        # 3. Weighted combination (SCORING_SEMANTIC_WEIGHT / SCORING_SKILL_WEIGHT)
+        weight_semantic, weight_skills = self.weights
 
         raw_score = weight_semantic * semantic_score + weight_skills * skill_score
         match_score = raw_score * 100.0
@@ -115,4 +232,3 @@ class JobMatcherService:
             "overlapping_skills": overlapping_skills,
             "missing_skills": missing_skills,
         }
-
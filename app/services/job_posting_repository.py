@@ -0,0 +1,184 @@
+# app/services/job_posting_repository.py
+"""
+Content-addressed store for job description text.
+
+Matches and tracked jobs reference a posting by `job_posting_id`
+(sha256 of the normalized description) instead of embedding the text.
+
+    python -m app.services.job_posting_repository report    # storage size per collection
+    python -m app.services.job_posting_repository migrate   # move inline descriptions into job_postings
+"""
+import asyncio
+import hashlib
+import sys
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List
+
+from pymongo import UpdateOne
+
+from app.core.database import get_database
+
+
+def normalize_description(text: str) -> str:
+    """
+    Collapse whitespace so re-pasted copies of a posting hash the same.
+    """
+    return " ".join((text or "").split())
+
+
+# one /jobs/match hashes the same description for the match cache, the
+# history, the tracked job and the similar-jobs index: compute it once
+@lru_cache(maxsize=64)
+def posting_id_for(text: str) -> str:
+    return hashlib.sha256(normalize_description(text).encode("utf-8")).hexdigest()
+
+
+def _posting_upsert(posting_id: str, description: str, now: datetime) -> UpdateOne:
+    return UpdateOne(
+        {"_id": posting_id},
+        {"$setOnInsert": {"description": description, "created_at": now}},
+        upsert=True,
+    )
+
+
+async def upsert_job_posting(description: str) -> str:
+    """
+    Store a description once (no-op if it already exists). Returns its id.
+    """
+    db = get_database()
+    posting_id = posting_id_for(description)
+    await db["job_postings"].update_one(
+        {"_id": posting_id},
+        {"$setOnInsert": {"description": description, "created_at": datetime.utcnow()}},
+        upsert=True,
+    )
+    return posting_id
+
+
+async def upsert_job_postings(descriptions: Iterable[str]) -> List[str]:
+    """
+    Batch version of upsert_job_posting (one bulk_write). Returns ids in input order.
+    """
+    db = get_database()
+    descriptions = list(descriptions)
+    ids = [posting_id_for(d) for d in descriptions]
+
+    now = datetime.utcnow()
+    unique = {posting_id: d for posting_id, d in zip(ids, descriptions)}
+    if unique:
+        await db["job_postings"].bulk_write(
+            [_posting_upsert(posting_id, d, now) for posting_id, d in unique.items()],
+            ordered=False,
+        )
+    return ids
+
+
+async def get_job_descriptions(posting_ids: Iterable[str]) -> Dict[str, str]:
+    """
+    posting_id -> description for the given ids (one query).
+    """
+    ids = list({i for i in posting_ids if i})
+    if not ids:
+        return {}
+
+    db = get_database()
+    cursor = db["job_postings"].find({"_id": {"$in": ids}}, {"description": 1})
+    return {doc["_id"]: doc.get("description", "") async for doc in cursor}
+
+
+async def attach_job_descriptions(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Fill `job_description` on match / tracked-job docs that only reference a posting.
+    Documents written before job_postings existed keep their inline text.
+    """
+    missing = [it.get("job_posting_id") for it in items if not it.get("job_description")]
+    descriptions = await get_job_descriptions(missing)
+    for it in items:
+        if not it.get("job_description") and it.get("job_posting_id"):
+            it["job_description"] = descriptions.get(it["job_posting_id"], "")
+    return items
+
+
+async def migrate_inline_descriptions(batch_size: int = 500) -> Dict[str, int]:
+    """
+    Move inline job_description text from job_matches / tracked_jobs into job_postings.
+    """
+    db = get_database()
+    counts: Dict[str, int] = {}
+
+    for collection in ("job_matches", "tracked_jobs"):
+        migrated = 0
+        cursor = db[collection].find({"job_description": {"$exists": True}}, {"job_description": 1})
+
+        batch: List[Dict[str, Any]] = []
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                migrated += await _migrate_batch(collection, batch)
+                batch = []
+        if batch:
+            migrated += await _migrate_batch(collection, batch)
+
+        counts[collection] = migrated
+
+    return counts
+
+
+async def _migrate_batch(collection: str, docs: List[Dict[str, Any]]) -> int:
+    db = get_database()
+    posting_ids = await upsert_job_postings(d.get("job_description") or "" for d in docs)
+    await db[collection].bulk_write(
+        [
+            UpdateOne(
+                {"_id": d["_id"]},
+                {"$set": {"job_posting_id": posting_id}, "$unset": {"job_description": ""}},
+            )
+            for d, posting_id in zip(docs, posting_ids)
+        ],
+        ordered=False,
+    )
+    return len(docs)
+
+
+async def storage_report() -> List[Dict[str, Any]]:
+    """
+    collStats summary for the collections that hold job / CV text.
+    """
+    db = get_database()
+    report = []
+    for name in ("cvs", "job_matches", "tracked_jobs", "job_postings"):
+        stats = await db.command("collStats", name)
+        report.append(
+            {
+                "collection": name,
+                "count": stats.get("count", 0),
+                "size": stats.get("size", 0),
+                "avg_obj_size": stats.get("avgObjSize", 0),
+                "storage_size": stats.get("storageSize", 0),
+            }
+        )
+    return report
+
+
+async def _main(argv: List[str]) -> None:
+    command = argv[0] if argv else "report"
+
+    if command == "migrate":
+        print(f"Migrated: {await migrate_inline_descriptions()}")
+    elif command == "report":
+        total = 0
+        for row in await storage_report():
+            total += row["size"]
+            print(
+                f"{row['collection']:14} docs={row['count']:>8}  "
+                f"size={row['size']:>12}  avg={row['avg_obj_size']:>8}  storage={row['storage_size']:>12}"
+            )
+        print(f"{'total':14} size={total:>12}")
+    else:
+        print(__doc__)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(_main(sys.argv[1:]))
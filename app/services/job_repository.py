@@ -1,11 +1,19 @@
 # app/services/job_repository.py
+import asyncio
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
 
 from app.core.database import get_database
-
-db = get_database()
+from app.core.pagination import fetch_page
+from app.services.job_index import schedule_job_index_removal, schedule_job_index_update
+from app.services.job_posting_repository import (
+    attach_job_descriptions,
+    posting_id_for,
+    upsert_job_posting,
+    upsert_job_postings,
+)
 
 def _oid(x: str):
     try:
@@ -13,46 +21,112 @@ def _oid(x: str):
     except Exception:
         return None
 
+def _with_posting_id(doc: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+    """
+    Replace an inline job_description with a job_posting_id reference.
+    Returns (doc, description) - description is None if the doc had none.
+    """
+    description = doc.get("job_description")
+    if not description:
+        return doc, None
+    doc = {k: v for k, v in doc.items() if k != "job_description"}
+    doc["job_posting_id"] = posting_id_for(description)
+    return doc, description
+
 # --------------------------
 # MATCH HISTORY (per user)
 # --------------------------
 async def save_job_match_for_user(user_id: str, match: Dict[str, Any]) -> str:
+    db = get_database()
     doc = {**match, "user_id": user_id, "created_at": datetime.utcnow()}
     res = await db.job_matches.insert_one(doc)
     return str(res.inserted_id)
 
-async def get_matches_by_cv_id_for_user(user_id: str, cv_id: str, limit: int = 50) -> List[Dict[str, Any]]:
-    cursor = (
-        db.job_matches
-        .find({"user_id": user_id, "cv_id": cv_id})
-        .sort("created_at", -1)
-        .limit(limit)
-    )
-    items = await cursor.to_list(length=limit)
+async def save_job_matches_for_user(user_id: str, matches: List[Dict[str, Any]]) -> List[str]:
+    """
+    Batch version of save_job_match_for_user (one insert_many round trip).
+    """
+    db = get_database()
+    if not matches:
+        return []
+    now = datetime.utcnow()
+    docs = [{**m, "user_id": user_id, "created_at": now} for m in matches]
+    res = await db.job_matches.insert_many(docs, ordered=True)
+    return [str(_id) for _id in res.inserted_ids]
+
+def _with_posting_ref(projection: Optional[Dict[str, int]]) -> Optional[Dict[str, int]]:
+    # job_description is resolved through job_posting_id, so load the reference with it
+    if projection and projection.get("job_description"):
+        return {**projection, "job_posting_id": 1}
+    return projection
+
+async def _finish_page(items: List[Dict[str, Any]], projection: Optional[Dict[str, int]]) -> List[Dict[str, Any]]:
     # normalize _id -> id
     for it in items:
         it["id"] = str(it["_id"])
+    if projection is None or projection.get("job_description"):
+        # ⚡ description text lives once in job_postings
+        await attach_job_descriptions(items)
     return items
 
+async def get_matches_by_cv_id_for_user(
+    user_id: str,
+    cv_id: str,
+    limit: int = 50,
+    after: Optional[str] = None,
+    projection: Optional[Dict[str, int]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of match history (newest first). Returns (items, next_cursor).
+    """
+    db = get_database()
+    items, next_cursor = await fetch_page(
+        db.job_matches,
+        {"user_id": user_id, "cv_id": cv_id},
+        limit=limit,
+        after=after,
+        projection=_with_posting_ref(projection),
+    )
+    return await _finish_page(items, projection), next_cursor
+
 # --------------------------
 # TRACKED JOBS (per user)
 # --------------------------
-async def get_tracked_jobs_for_user(user_id: str, cv_id: Optional[str] = None) -> List[Dict[str, Any]]:
+async def get_tracked_jobs_for_user(
+    user_id: str,
+    cv_id: Optional[str] = None,
+    limit: int = 200,
+    after: Optional[str] = None,
+    projection: Optional[Dict[str, int]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of tracked jobs (newest first). Returns (items, next_cursor).
+    """
+    db = get_database()
     q = {"user_id": user_id}
     if cv_id:
         q["cv_id"] = cv_id
-    cursor = db.tracked_jobs.find(q).sort("created_at", -1)
-    items = await cursor.to_list(length=200)
-    for it in items:
-        it["id"] = str(it["_id"])
-    return items
+    items, next_cursor = await fetch_page(
+        db.tracked_jobs,
+        q,
+        limit=limit,
+        after=after,
+        projection=_with_posting_ref(projection),
+    )
+    return await _finish_page(items, projection), next_cursor
 
 async def create_tracked_job_for_user(user_id: str, job: Dict[str, Any]) -> str:
+    db = get_database()
+    job, description = _with_posting_id(job)
+    if description:
+        await upsert_job_posting(description)
     doc = {**job, "user_id": user_id, "created_at": datetime.utcnow()}
     res = await db.tracked_jobs.insert_one(doc)
+    schedule_job_index_update(user_id, [_index_entry(job, description, tracked_job_id=str(res.inserted_id))])
     return str(res.inserted_id)
 
 async def update_tracked_job_for_user(user_id: str, job_id: str, updates: Dict[str, Any]) -> bool:
+    db = get_database()
     oid = _oid(job_id)
     if not oid:
         return False
@@ -63,19 +137,170 @@ async def update_tracked_job_for_user(user_id: str, job_id: str, updates: Dict[s
     return res.modified_count > 0
 
 async def delete_tracked_job_for_user(user_id: str, job_id: str) -> bool:
+    db = get_database()
     oid = _oid(job_id)
     if not oid:
         return False
     res = await db.tracked_jobs.delete_one({"_id": oid, "user_id": user_id})
+    if res.deleted_count:
+        # ⚡ so /jobs/similar stops returning it
+        schedule_job_index_removal(user_id, job_id)
     return res.deleted_count > 0
 
 async def upsert_tracked_job_from_match_for_user(user_id: str, payload: Dict[str, Any]) -> str:
+    db = get_database()
     # If you have your own rules, keep them. This is a safe default:
     q = {"user_id": user_id, "cv_id": payload.get("cv_id"), "job_title": payload.get("job_title"), "company": payload.get("company")}
     update = {"$set": {**payload, "user_id": user_id, "updated_at": datetime.utcnow()}, "$setOnInsert": {"created_at": datetime.utcnow()}}
-    res = await db.tracked_jobs.update_one(q, update, upsert=True)
-    # If inserted, upserted_id exists; otherwise fetch the matched doc
-    if res.upserted_id:
-        return str(res.upserted_id)
-    doc = await db.tracked_jobs.find_one(q)
+    if "job_posting_id" in payload:
+        # drop inline text left on docs written before job_postings existed
+        update["$unset"] = {"job_description": ""}
+    # One round trip for both insert and update: the server returns the doc's _id
+    doc = await db.tracked_jobs.find_one_and_update(
+        q,
+        update,
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+        projection={"_id": 1},
+    )
     return str(doc["_id"])
+
+
+def _tracked_job_key(payload: Dict[str, Any]):
+    return (payload.get("cv_id"), payload.get("job_title"), payload.get("company"))
+
+async def upsert_tracked_jobs_from_matches_for_user(user_id: str, payloads: List[Dict[str, Any]]) -> List[str]:
+    """
+    Batch version of upsert_tracked_job_from_match_for_user: one bulk_write,
+    plus one projected find for documents that already existed.
+    Returns tracked job ids in input order.
+    """
+    db = get_database()
+    if not payloads:
+        return []
+
+    now = datetime.utcnow()
+    ops = []
+    for payload in payloads:
+        cv_id, job_title, company = _tracked_job_key(payload)
+        q = {"user_id": user_id, "cv_id": cv_id, "job_title": job_title, "company": company}
+        update = {"$set": {**payload, "user_id": user_id, "updated_at": now}, "$setOnInsert": {"created_at": now}}
+        if "job_posting_id" in payload:
+            update["$unset"] = {"job_description": ""}
+        ops.append(UpdateOne(q, update, upsert=True))
+
+    res = await db.tracked_jobs.bulk_write(ops, ordered=True)
+
+    ids: List[Optional[str]] = [None] * len(payloads)
+    by_key: Dict[Any, str] = {}
+    for index, upserted_id in res.upserted_ids.items():
+        ids[index] = str(upserted_id)
+        by_key[_tracked_job_key(payloads[index])] = str(upserted_id)
+
+    # matched (already existing) docs: resolve their ids in one query
+    missing = {_tracked_job_key(payloads[i]) for i, x in enumerate(ids) if x is None} - set(by_key)
+    if missing:
+        or_terms = [{"cv_id": c, "job_title": t, "company": co} for (c, t, co) in missing]
+        cursor = db.tracked_jobs.find(
+            {"user_id": user_id, "$or": or_terms},
+            {"cv_id": 1, "job_title": 1, "company": 1},
+        )
+        async for doc in cursor:
+            by_key.setdefault(_tracked_job_key(doc), str(doc["_id"]))
+
+    return [x or by_key.get(_tracked_job_key(p), "") for x, p in zip(ids, payloads)]
+
+
+# --------------------------
+# MATCH WRITE PATH
+# --------------------------
+def _index_entry(doc: Dict[str, Any], description: Optional[str], **refs: Optional[str]) -> Dict[str, Any]:
+    # row for the similar-jobs index (updated in the background)
+    return {
+        "description": description,
+        "job_title": doc.get("job_title"),
+        "company": doc.get("company"),
+        "cv_id": doc.get("cv_id"),
+        **refs,
+    }
+
+async def save_match_and_track_for_user(
+    user_id: str,
+    match: Dict[str, Any],
+    tracked: Dict[str, Any],
+) -> Tuple[str, str]:
+    """
+    Insert the match history entry and upsert the tracked job concurrently
+    (two single-round-trip writes). The match _id is generated client-side so
+    the tracked job can reference it as job_match_id without waiting.
+    The job description is stored once in job_postings (its id is a content
+    hash, so that upsert runs alongside the other two) and both documents
+    reference it by job_posting_id.
+    Returns (match_id, tracked_job_id).
+    """
+    match, description = _with_posting_id(match)
+    tracked, tracked_description = _with_posting_id(tracked)
+    postings = {posting_id_for(d): d for d in (description, tracked_description) if d}
+
+    match_oid = ObjectId()
+    match_id, tracked_job_id, *_ = await asyncio.gather(
+        save_job_match_for_user(user_id, {**match, "_id": match_oid}),
+        upsert_tracked_job_from_match_for_user(user_id, {**tracked, "job_match_id": str(match_oid)}),
+        *(upsert_job_posting(d) for d in postings.values()),
+    )
+    schedule_job_index_update(
+        user_id,
+        [_index_entry(tracked, tracked_description or description, match_id=match_id, tracked_job_id=tracked_job_id)],
+    )
+    return match_id, tracked_job_id
+
+async def track_existing_match_for_user(
+    user_id: str,
+    match_id: str,
+    tracked: Dict[str, Any],
+) -> str:
+    """
+    Upsert the tracked job for an already saved match (no new history entry).
+    Returns tracked_job_id.
+    """
+    tracked, description = _with_posting_id(tracked)
+    if description:
+        await upsert_job_posting(description)
+    tracked_job_id = await upsert_tracked_job_from_match_for_user(user_id, {**tracked, "job_match_id": match_id})
+    schedule_job_index_update(
+        user_id,
+        [_index_entry(tracked, description, match_id=match_id, tracked_job_id=tracked_job_id)],
+    )
+    return tracked_job_id
+
+async def save_matches_and_track_for_user(
+    user_id: str,
+    matches: List[Dict[str, Any]],
+    tracked: List[Dict[str, Any]],
+) -> Tuple[List[str], List[str]]:
+    """
+    Batch version of save_match_and_track_for_user: insert_many + two bulk_writes, concurrently.
+    """
+    matches, match_descriptions = zip(*(_with_posting_id(m) for m in matches)) if matches else ((), ())
+    tracked, tracked_descriptions = zip(*(_with_posting_id(t) for t in tracked)) if tracked else ((), ())
+    descriptions = [d for d in (*match_descriptions, *tracked_descriptions) if d]
+
+    match_oids = [ObjectId() for _ in matches]
+    match_ids, tracked_job_ids, _ = await asyncio.gather(
+        save_job_matches_for_user(user_id, [{**m, "_id": oid} for m, oid in zip(matches, match_oids)]),
+        upsert_tracked_jobs_from_matches_for_user(
+            user_id,
+            [{**t, "job_match_id": str(oid)} for t, oid in zip(tracked, match_oids)],
+        ),
+        upsert_job_postings(descriptions),
+    )
+    schedule_job_index_update(
+        user_id,
+        [
+            _index_entry(t, td or md, match_id=match_id, tracked_job_id=tracked_job_id)
+            for t, td, md, match_id, tracked_job_id in zip(
+                tracked, tracked_descriptions, match_descriptions, match_ids, tracked_job_ids
+            )
+        ],
+    )
+    return match_ids, tracked_job_ids
@@ -0,0 +1,71 @@
+# app/services/match_cache.py
+"""
+Per-process cache of single CV-vs-job match results.
+
+Key: (user, cv_id, CV content version, posting hash of the description,
+scoring version). The scoring version covers the scoring backend (TF-IDF
+model version, ...), the weights and the skill taxonomy version, so a refit,
+backend switch or taxonomy edit never serves old scores;
+entries from the previous version are dropped the first time the new one is seen.
+"""
+import hashlib
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.lru import LRUCache
+from app.services.job_posting_repository import posting_id_for
+from app.services.scoring_backends import get_scoring_backend, scoring_weights
+from app.services.skill_taxonomy import get_taxonomy
+
+MATCH_CACHE_SIZE = int(os.getenv("MATCH_CACHE_SIZE", "1024"))
+MATCH_CACHE_TTL = float(os.getenv("MATCH_CACHE_TTL", "3600"))
+# On a hit, reuse the earlier job_matches entry instead of inserting a duplicate
+MATCH_CACHE_SKIP_DUPLICATE_HISTORY = os.getenv("MATCH_CACHE_SKIP_DUPLICATE_HISTORY", "0") == "1"
+
+MatchKey = Tuple[str, str, str, str, str]
+
+_cache = LRUCache("match_cache", MATCH_CACHE_SIZE, ttl=MATCH_CACHE_TTL)
+_scoring_version: Optional[str] = None
+_version_lock = threading.Lock()
+
+
+def cv_content_version(cv_doc: Dict[str, Any]) -> str:
+    """
+    Changes whenever the CV text or its skills change.
+    """
+    skills = ",".join(sorted(cv_doc.get("skill_ids") or cv_doc.get("skills") or []))
+    raw = "\n".join([cv_doc.get("content_hash") or "", skills])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def scoring_version() -> str:
+    """
+    Backend + weights + skill taxonomy version; drops cached results of older versions.
+    """
+    global _scoring_version
+    semantic, skill = scoring_weights()
+    version = f"{get_scoring_backend().version}|{semantic:.3f}/{skill:.3f}|{get_taxonomy().version}"
+    if version != _scoring_version:
+        with _version_lock:
+            if version != _scoring_version:
+                _cache.pop_where(lambda key: key[4] != version)
+                _scoring_version = version
+    return version
+
+
+def match_cache_key(user_id: str, cv_id: str, cv_doc: Dict[str, Any], job_description: str) -> MatchKey:
+    return (user_id, cv_id, cv_content_version(cv_doc), posting_id_for(job_description), scoring_version())
+
+
+def get_cached_match(key: MatchKey) -> Optional[Dict[str, Any]]:
+    cached = _cache.get(key)
+    return dict(cached) if cached is not None else None
+
+
+def put_cached_match(key: MatchKey, result: Dict[str, Any]) -> None:
+    _cache.put(key, dict(result))
+
+
+def clear_match_cache() -> None:
+    _cache.clear()
@@ -1,24 +1,112 @@
+import asyncio
 import os
-from typing import Dict, List
-from openai import OpenAI
+import random
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional, Tuple, Type
+
+from app.core import metrics
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+# Per-call timeouts (seconds). A cover letter is ~350 output tokens.
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "30"))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+# Retries on timeouts / connection errors / 429 / 5xx, with full-jitter backoff
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+OPENAI_RETRY_BASE_DELAY = float(os.getenv("OPENAI_RETRY_BASE_DELAY", "0.5"))
+OPENAI_RETRY_MAX_DELAY = float(os.getenv("OPENAI_RETRY_MAX_DELAY", "8"))
+# In-flight LLM calls per process; callers wait at most OPENAI_ACQUIRE_TIMEOUT
+# for a slot, then get LLMBusyError (the route falls back to the template)
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+OPENAI_ACQUIRE_TIMEOUT = float(os.getenv("OPENAI_ACQUIRE_TIMEOUT", "0.5"))
+# Pooled keep-alive connections to the API
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+
+
+class LLMBusyError(RuntimeError):
+    """
+    Raised when every LLM slot in this process is taken.
+    """
+
+
+class LLMEmptyResponseError(RuntimeError):
+    """
+    Raised when the model returned no text (callers fall back to the template).
+    """
+
+
+_client: Optional["AsyncOpenAI"] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def get_client() -> "AsyncOpenAI":
+    """
+    Lazily created async client (reads OPENAI_API_KEY / OPENAI_BASE_URL from env).
+    Retries are handled here, not by the SDK, so the backoff is jittered and bounded.
+    """
+    global _client
+    if _client is None:
+        # the SDK is only imported once the first letter is generated
+        import httpx
+        from openai import AsyncOpenAI
+
+        timeout = httpx.Timeout(OPENAI_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT)
+        _client = AsyncOpenAI(
+            timeout=timeout,
+            max_retries=0,
+            http_client=httpx.AsyncClient(
+                timeout=timeout,
+                limits=httpx.Limits(
+                    max_connections=OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=OPENAI_MAX_CONNECTIONS,
+                    keepalive_expiry=60,
+                ),
+            ),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+    return _semaphore
+
+
+def _retryable_errors() -> Tuple[Type[Exception], ...]:
+    from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+
+    return (APITimeoutError, APIConnectionError, RateLimitError, InternalServerError)
+
+
+def get_model_name() -> str:
+    return os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+
+def _backoff(attempt: int) -> float:
+    # full jitter: uniform(0, min(max, base * 2^attempt))
+    return random.uniform(0, min(OPENAI_RETRY_MAX_DELAY, OPENAI_RETRY_BASE_DELAY * (2 ** attempt)))
 
-# Let the SDK read OPENAI_API_KEY from environment
-client = OpenAI()
 
 def _safe_list(x) -> List[str]:
     if not x:
         return []
     return [str(i).strip() for i in x if str(i).strip()]
 
-def generate_cover_letter_llm(
+def build_cover_letter_prompt(
     cv_doc: Dict,
     job_title: str,
     company: str,
     job_description: str,
     tone: str
 ) -> str:
-    model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-
     skills = _safe_list(cv_doc.get("skills"))[:10]
 
     experience = _safe_list(cv_doc.get("experience"))[:6]
@@ -29,7 +117,7 @@ def generate_cover_letter_llm(
     if len(job_description) > 2000:
         job_description = job_description[:2000]
 
-    prompt = f"""
+    return f"""
 You are an expert career assistant. Write a tailored cover letter in plain text.
 
 Constraints:
@@ -57,10 +145,106 @@ Output format:
 - End with "Kind regards," then "[Your Name]"
 """.strip()
 
-    resp = client.responses.create(
-        model=model,
-        input=prompt,
-        max_output_tokens=350,
-    )
+async def generate_cover_letter_llm(
+    cv_doc: Dict,
+    job_title: str,
+    company: str,
+    job_description: str,
+    tone: str
+) -> str:
+    model = get_model_name()
+    prompt = build_cover_letter_prompt(cv_doc, job_title, company, job_description, tone)
+
+    semaphore = _get_semaphore()
+    try:
+        await asyncio.wait_for(semaphore.acquire(), timeout=OPENAI_ACQUIRE_TIMEOUT)
+    except asyncio.TimeoutError:
+        metrics.incr("llm_rejected")
+        raise LLMBusyError(f"{OPENAI_MAX_CONCURRENCY} LLM calls already in flight")
+
+    try:
+        client = get_client()
+        retryable = _retryable_errors()
+        for attempt in range(OPENAI_MAX_RETRIES + 1):
+            metrics.incr("llm_calls")
+            try:
+                resp = await client.responses.create(
+                    model=model,
+                    input=prompt,
+                    max_output_tokens=350,
+                )
+                letter = (resp.output_text or "").strip()
+                if not letter:
+                    raise LLMEmptyResponseError("The model returned no text")
+                return letter
+            except retryable:
+                if attempt < OPENAI_MAX_RETRIES:
+                    metrics.incr("llm_retries")
+                    await asyncio.sleep(_backoff(attempt))
+                    continue
+                metrics.incr("llm_failures")
+                raise
+            except Exception:
+                metrics.incr("llm_failures")
+                raise
+    finally:
+        semaphore.release()
+
+async def stream_cover_letter_llm(
+    cv_doc: Dict,
+    job_title: str,
+    company: str,
+    job_description: str,
+    tone: str
+) -> AsyncIterator[str]:
+    """
+    Same as generate_cover_letter_llm, but yields text deltas as they arrive.
+    Retries only happen before the first delta; after that errors propagate.
+    LLMBusyError is raised before anything is yielded; LLMEmptyResponseError
+    after the stream if it carried no text.
+    """
+    model = get_model_name()
+    prompt = build_cover_letter_prompt(cv_doc, job_title, company, job_description, tone)
+
+    semaphore = _get_semaphore()
+    try:
+        await asyncio.wait_for(semaphore.acquire(), timeout=OPENAI_ACQUIRE_TIMEOUT)
+    except asyncio.TimeoutError:
+        metrics.incr("llm_rejected")
+        raise LLMBusyError(f"{OPENAI_MAX_CONCURRENCY} LLM calls already in flight")
 
-    return (resp.output_text or "").strip()
+    try:
+        client = get_client()
+        retryable = _retryable_errors()
+        for attempt in range(OPENAI_MAX_RETRIES + 1):
+            metrics.incr("llm_calls")
+            started = False
+            has_text = False
+            try:
+                stream = await client.responses.create(
+                    model=model,
+                    input=prompt,
+                    max_output_tokens=350,
+                    stream=True,
+                )
+                async with stream:
+                    async for event in stream:
+                        if event.type == "response.output_text.delta" and event.delta:
+                            started = True
+                            has_text = has_text or bool(event.delta.strip())
+                            yield event.delta
+                if not has_text:
+                    raise LLMEmptyResponseError("The model streamed no text")
+                return
+            except retryable:
+                if not started and attempt < OPENAI_MAX_RETRIES:
+                    metrics.incr("llm_retries")
+                    await asyncio.sleep(_backoff(attempt))
+                    continue
+                metrics.incr("llm_failures")
+                raise
+            except Exception:
+                metrics.incr("llm_failures")
+                raise
+    finally:
+        semaphore.release()
@@ -0,0 +1,262 @@
+# app/services/scoring_backends.py
+"""
+Semantic similarity backends for JobMatcherService.
+
+- tfidf:     corpus TF-IDF cosine (default; uses stored CV vectors)
+- bm25:      Okapi BM25 with the corpus model's vocabulary / idf
+- embedding: local sentence-transformers model on CPU
+             (pip install sentence-transformers; loaded once per process)
+
+SCORING_BACKEND picks the backend, SCORING_SEMANTIC_WEIGHT / SCORING_SKILL_WEIGHT
+the mix with skill overlap. Compare backends on a fixture with
+    python -m app.services.scoring_harness
+"""
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.services.tfidf_model import build_vectorizer, tfidf_store
+
+SCORING_BACKEND = os.getenv("SCORING_BACKEND", "tfidf")
+SCORING_SEMANTIC_WEIGHT = float(os.getenv("SCORING_SEMANTIC_WEIGHT", "0.7"))
+SCORING_SKILL_WEIGHT = float(os.getenv("SCORING_SKILL_WEIGHT", "0.3"))
+
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+
+
+class ScoringBackend(ABC):
+    """
+    similarities(text, others) -> one 0–1 score per text in `others`. Blocking.
+
+    Backends that can use stored CV vectors (uses_stored_vectors) also accept
+    `text_vector` / `other_vectors`; the others ignore them and need raw text.
+    """
+
+    name = ""
+    uses_stored_vectors = False
+
+    @property
+    def version(self) -> str:
+        return self.name
+
+    def warmup(self) -> None:
+        pass
+
+    @abstractmethod
+    def similarities(
+        self,
+        text: str,
+        others: List[str],
+        text_vector: Optional[Dict[str, Any]] = None,
+        other_vectors: Optional[List[Optional[Dict[str, Any]]]] = None,
+    ) -> List[float]:
+        ...
+
+
+class TfidfBackend(ScoringBackend):
+    name = "tfidf"
+    uses_stored_vectors = True
+
+    @property
+    def version(self) -> str:
+        return tfidf_store.version or "tfidf-adhoc"
+
+    def warmup(self) -> None:
+        tfidf_store.sync()
+
+    def similarities(self, text, others, text_vector=None, other_vectors=None):
+        if not others:
+            return []
+
+        from scipy.sparse import vstack
+        from sklearn.metrics.pairwise import cosine_similarity  # heavy: first match only
+
+        from app.services.cv_vectors import decode_vector, decode_vectors
+
+        model = tfidf_store.sync()
+        if model is None:
+            # No corpus model yet: fall back to a throwaway fit on these documents
+            matrix = build_vectorizer().fit_transform([text, *others])
+            return [float(s) for s in cosine_similarity(matrix[0:1], matrix[1:])[0]]
+
+        def _current(stored):
+            return bool(stored) and stored.get("version") == model.version
+
+        # stored vectors built by the current model are used as-is
+        row = decode_vector(text_vector) if _current(text_vector) else model.vectorizer.transform([text])
+
+        current = [_current(v) for v in other_vectors] if other_vectors else [False] * len(others)
+        if all(current):
+            matrix = decode_vectors(other_vectors)
+        elif not any(current):
+            matrix = model.vectorizer.transform(others)
+        else:
+            matrix = vstack(
+                [decode_vector(v) if ok else model.vectorizer.transform([t]) for t, v, ok in zip(others, other_vectors, current)]
+            ).tocsr()
+
+        return [float(s) for s in cosine_similarity(row, matrix)[0]]
+
+
+class Bm25Backend(ScoringBackend):
+    """
+    `text` is the BM25 query over `others`. Term weights come from the corpus
+    model's idf (per-call document frequencies until one is fitted); scores
+    are divided by the query's maximum attainable score, so they fall in 0–1.
+    """
+
+    name = "bm25"
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+
+    @property
+    def version(self) -> str:
+        return f"bm25-{self.k1}-{self.b}-{tfidf_store.version or 'adhoc'}"
+
+    def warmup(self) -> None:
+        tfidf_store.sync()
+
+    def similarities(self, text, others, text_vector=None, other_vectors=None):
+        if not others:
+            return []
+
+        import numpy as np
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        model = tfidf_store.sync()
+        if model is not None:
+            counter = CountVectorizer(vocabulary=model.vectorizer.vocabulary_, analyzer=model.vectorizer.build_analyzer())
+            docs = counter.transform(others)
+            idf = model.vectorizer.idf_
+        else:
+            counter = CountVectorizer(stop_words="english")
+            counter.fit([text, *others])
+            docs = counter.transform(others)
+            df = np.bincount(docs.indices, minlength=docs.shape[1])
+            n = docs.shape[0]
+            idf = np.log1p((n - df + 0.5) / (df + 0.5))
+
+        query_terms = np.unique(counter.transform([text]).indices)
+        if not len(query_terms) or docs.shape[1] == 0:
+            return [0.0] * len(others)
+
+        lengths = np.asarray(docs.sum(axis=1)).ravel()
+        avg_length = max(lengths.mean(), 1.0)
+        tf = docs[:, query_terms].toarray()
+        norm = self.k1 * (1 - self.b + self.b * lengths / avg_length)
+        weights = idf[query_terms]
+
+        scores = (weights * tf * (self.k1 + 1) / (tf + norm[:, None])).sum(axis=1)
+        upper = (weights * (self.k1 + 1)).sum()
+        return [float(s / upper) if upper > 0 else 0.0 for s in scores]
+
+
+class EmbeddingBackend(ScoringBackend):
+    """
+    Cosine of normalized sentence embeddings. The model is loaded once per
+    process; texts are encoded in batches of EMBEDDING_BATCH_SIZE.
+    """
+
+    name = "embedding"
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL, batch_size: int = EMBEDDING_BATCH_SIZE):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> str:
+        return f"embedding-{self.model_name}"
+
+    def _get_model(self):
+        with self._lock:
+            if self._model is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                except ImportError:
+                    raise RuntimeError("SCORING_BACKEND=embedding needs the sentence-transformers package.")
+                self._model = SentenceTransformer(self.model_name, device="cpu")
+            return self._model
+
+    def warmup(self) -> None:
+        self._get_model()
+
+    def encode(self, texts: List[str]):
+        model = self._get_model()
+        # one inference at a time: torch already spreads a batch over every core
+        with self._lock:
+            return model.encode(
+                texts,
+                batch_size=self.batch_size,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            )
+
+    def similarities(self, text, others, text_vector=None, other_vectors=None):
+        if not others:
+            return []
+        embeddings = self.encode([text, *others])
+        scores = embeddings[1:] @ embeddings[0]
+        # cosine can be slightly negative; keep the 0–1 contract of the other backends
+        return [float(max(0.0, s)) for s in scores]
+
+
+_factories: Dict[str, Callable[[], ScoringBackend]] = {}
+_backends: Dict[str, ScoringBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def register_backend(name: str, factory: Callable[[], ScoringBackend]) -> None:
+    _factories[name] = factory
+
+
+register_backend("tfidf", TfidfBackend)
+register_backend("bm25", Bm25Backend)
+register_backend("embedding", EmbeddingBackend)
+
+
+def get_scoring_backend(name: Optional[str] = None) -> ScoringBackend:
+    """
+    The configured backend (or `name`); one instance per process.
+    """
+    name = name or SCORING_BACKEND
+    with _backends_lock:
+        backend = _backends.get(name)
+        if backend is None:
+            if name not in _factories:
+                raise ValueError(f"Unknown scoring backend: {name} (available: {', '.join(_factories)})")
+            backend = _backends[name] = _factories[name]()
+        return backend
+
+
+def backend_names() -> List[str]:
+    return list(_factories)
+
+
+def warmup_scoring() -> None:
+    """
+    Load the corpus model (stored CV vectors need it) and the configured backend. Blocking.
+    """
+    tfidf_store.sync()
+    get_scoring_backend().warmup()
+
+
+def scoring_weights() -> Tuple[float, float]:
+    """
+    (semantic, skill) weights, normalized to sum to 1 so match_score stays 0–100.
+    """
+    semantic = max(0.0, SCORING_SEMANTIC_WEIGHT)
+    skill = max(0.0, SCORING_SKILL_WEIGHT)
+    total = semantic + skill
+    if total <= 0:
+        raise ValueError("SCORING_SEMANTIC_WEIGHT + SCORING_SKILL_WEIGHT must be > 0")
+    return semantic / total, skill / total
@@ -0,0 +1,146 @@
+# app/services/scoring_harness.py
+"""
+Compare scoring backends on a fixture (every CV against every job).
+
+    python -m app.services.scoring_harness [--backends tfidf,bm25,embedding]
+                                           [--fixture path] [--repeat 5] [-k 3]
+
+Per backend: model load time, per-CV latency (p50 / p95), throughput in
+(CV, job) pairs per second, precision@k against the fixture's `relevant`
+jobs, and ranking agreement with the first backend (mean Spearman rho of
+the match scores, mean overlap of the top-k jobs). No database is needed.
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+from app.services.job_matcher import JobMatcherService
+from app.services.scoring_backends import backend_names, get_scoring_backend
+from app.services.skill_taxonomy import get_taxonomy
+
+SCORING_FIXTURE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "scoring_fixture.json")
+
+
+def load_fixture(path: str = SCORING_FIXTURE_PATH) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _spearman(a: List[float], b: List[float]) -> float:
+    from scipy.stats import spearmanr
+
+    if len(set(a)) < 2 or len(set(b)) < 2:
+        return 0.0  # undefined when one side is constant
+    return float(spearmanr(a, b).correlation)
+
+
+def run_backend(name: str, fixture: Dict[str, Any], repeat: int = 5, k: int = 3) -> Dict[str, Any]:
+    """
+    Score every fixture CV against every job with one backend. Blocking.
+    """
+    backend = get_scoring_backend(name)
+    started = time.perf_counter()
+    backend.warmup()
+    load_seconds = time.perf_counter() - started
+
+    matcher = JobMatcherService(backend=backend)
+    taxonomy = get_taxonomy()
+    jobs = [
+        {
+            "job_title": job.get("title"),
+            "job_description": job["text"],
+            "job_skills": [taxonomy.display(s) for s in taxonomy.extract_ids(job["text"])],
+        }
+        for job in fixture["jobs"]
+    ]
+    job_ids = [job["id"] for job in fixture["jobs"]]
+
+    # untimed first pass: lazy imports / first-call setup are not latency
+    cv = fixture["cvs"][0]
+    matcher.compute_match_results_batch(cv_id=cv["id"], cv_text=cv["text"], cv_skills=cv.get("skills", []), jobs=jobs)
+
+    latencies: List[float] = []
+    scores: Dict[str, List[float]] = {}
+    for _ in range(max(1, repeat)):
+        for cv in fixture["cvs"]:
+            t0 = time.perf_counter()
+            results = matcher.compute_match_results_batch(
+                cv_id=cv["id"],
+                cv_text=cv["text"],
+                cv_skills=cv.get("skills", []),
+                jobs=jobs,
+            )
+            latencies.append(time.perf_counter() - t0)
+            scores[cv["id"]] = [r["match_score"] for r in results]
+
+    precision = []
+    top_k: Dict[str, List[str]] = {}
+    for cv in fixture["cvs"]:
+        ranked = sorted(zip(job_ids, scores[cv["id"]]), key=lambda x: x[1], reverse=True)
+        top_k[cv["id"]] = [job_id for job_id, _ in ranked[:k]]
+        if cv.get("relevant"):
+            precision.append(len(set(top_k[cv["id"]]) & set(cv["relevant"])) / k)
+
+    return {
+        "backend": name,
+        "version": backend.version,
+        "load_s": load_seconds,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "pairs_per_s": len(latencies) * len(jobs) / sum(latencies),
+        "precision_at_k": statistics.mean(precision) if precision else None,
+        "scores": scores,
+        "top_k": top_k,
+    }
+
+
+def compare(reports: List[Dict[str, Any]], k: int) -> None:
+    baseline = reports[0]
+    print(f"{'backend':10} {'load s':>7} {'p50 ms':>8} {'p95 ms':>8} {'pairs/s':>9} {f'P@{k}':>6} {'rho':>6} {f'top{k}':>6}")
+    for report in reports:
+        rho = statistics.mean(
+            _spearman(baseline["scores"][cv_id], report["scores"][cv_id]) for cv_id in baseline["scores"]
+        )
+        overlap = statistics.mean(
+            len(set(baseline["top_k"][cv_id]) & set(report["top_k"][cv_id])) / k for cv_id in baseline["top_k"]
+        )
+        precision = report["precision_at_k"]
+        print(
+            f"{report['backend']:10} {report['load_s']:7.2f} {report['p50_ms']:8.2f} {report['p95_ms']:8.2f} "
+            f"{report['pairs_per_s']:9.0f} {precision if precision is not None else float('nan'):6.2f} "
+            f"{rho:6.2f} {overlap:6.2f}"
+        )
+    print(f"(rho / top{k}: agreement with {baseline['backend']})")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare scoring backends on a fixture.")
+    parser.add_argument("--backends", default=",".join(backend_names()))
+    parser.add_argument("--fixture", default=SCORING_FIXTURE_PATH)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("-k", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    fixture = load_fixture(args.fixture)
+    reports = []
+    for name in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        try:
+            reports.append(run_backend(name, fixture, repeat=args.repeat, k=args.k))
+        except (RuntimeError, ValueError) as e:
+            print(f"{name}: skipped ({e})")
+
+    if reports:
+        compare(reports, args.k)
+
+
+if __name__ == "__main__":
+    main()
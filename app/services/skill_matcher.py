@@ -0,0 +1,160 @@
+# app/services/skill_matcher.py
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+# Word tokens: letters/digits, keeping "node.js", "c++", "c#", "asp.net" whole.
+# Hyphens, slashes and spaces split tokens ("end-user" == "end user").
+_TOKEN_RE = re.compile(r"[^\W_]+(?:[.+#]+[^\W_]+)*[+#]*")
+# Punctuation and line breaks that end a phrase: a keyword never spans
+# "Azure, Active Directory" or "Azure\nActive Directory"
+_SEPARATOR_RE = re.compile(r"[,;:.!?()\[\]{}<>|\"•·\n\r\t]")
+
+# Plural folding is limited to these tokens ("its" is not "it", "macs" is not "mac")
+_PLURALS = {
+    "apis": "api",
+    "assets": "asset",
+    "consoles": "console",
+    "desktops": "desktop",
+    "devices": "device",
+    "directories": "directory",
+    "identities": "identity",
+    "incidents": "incident",
+    "suites": "suite",
+    "users": "user",
+}
+
+
+def _lower(text: str) -> str:
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # a few characters (e.g. "İ") grow when lowercased; keep offsets aligned
+        lowered = "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+    return lowered
+
+
+def tokenize(text: str) -> List[Tuple[str, int, int]]:
+    """
+    Lowercase word tokens with their (start, end) offsets in `text`.
+    """
+    return [(m.group(0), m.start(), m.end()) for m in _TOKEN_RE.finditer(_lower(text))]
+
+
+@dataclass(frozen=True)
+class SkillMatch:
+    skill: str
+    start: int
+    end: int
+
+
+class SkillAutomaton:
+    """
+    Aho–Corasick automaton whose alphabet is word tokens, not characters.
+
+    Matching runs in one pass over the text's tokens, so the cost no longer
+    grows with the number of keywords, and matches can only start and end on
+    word boundaries ("mac" does not match inside "machine").
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self._lengths: List[int] = []
+
+        seen = set()
+        for keyword in keywords:
+            tokens = tuple(t for t, _, _ in tokenize(keyword or ""))
+            if not tokens or tokens in seen:
+                continue
+            seen.add(tokens)
+            self._add(tokens, keyword)
+
+        self._build_failure_links()
+        self._max_len = max(self._lengths, default=0)
+        # every token that appears in some keyword; anything else resets to the root
+        self._vocab = {token for state in self._goto for token in state}
+
+    def _normalize(self, token: str) -> str:
+        # "apis" -> "api" (only if the plural itself is not a keyword token)
+        singular = _PLURALS.get(token)
+        if singular is not None and token not in self._vocab and singular in self._vocab:
+            return singular
+        return token
+
+    def _add(self, tokens: Tuple[str, ...], keyword: str) -> None:
+        state = 0
+        for token in tokens:
+            nxt = self._goto[state].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][token] = nxt
+            state = nxt
+
+        self._out[state].append(len(self.keywords))
+        self.keywords.append(keyword)
+        self._lengths.append(len(tokens))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_all(self, text: str) -> List[SkillMatch]:
+        """
+        Every keyword occurrence in `text`, with character offsets, in text order.
+        """
+        if not text or not self.keywords:
+            return []
+
+        goto, fail, out, lengths, vocab = self._goto, self._fail, self._out, self._lengths, self._vocab
+        starts: deque = deque(maxlen=self._max_len)
+        matches: List[SkillMatch] = []
+
+        lowered = _lower(text)
+        state = 0
+        previous_end = 0
+        for m in _TOKEN_RE.finditer(lowered):
+            start, end = m.span()
+            if state and _SEPARATOR_RE.search(lowered, previous_end, start):
+                state = 0
+            previous_end = end
+
+            token = self._normalize(m.group(0))
+            if token not in vocab:
+                # no keyword contains this token: skip the automaton entirely
+                state = 0
+                continue
+
+            starts.append(start)
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+
+            for index in out[state]:
+                matches.append(SkillMatch(self.keywords[index], starts[-lengths[index]], end))
+
+        return matches
+
+    def extract(self, text: str) -> List[str]:
+        """
+        Distinct keywords found in `text`, in order of first appearance.
+        """
+        found: Dict[str, None] = {}
+        for match in self.find_all(text):
+            found.setdefault(match.skill, None)
+        return list(found)
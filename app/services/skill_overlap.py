@@ -0,0 +1,76 @@
+# app/services/skill_overlap.py
+"""
+Skill overlap for many (CV, job) pairs at once.
+
+Every skill list is canonicalized once and encoded as a boolean row over the
+taxonomy's integer skill ids (SkillTaxonomy.skill_index). Overlap counts for
+all pairs then come from a single matrix product of the bit rows (AND +
+popcount), and overlapping / missing skills are read back with bit masks only
+for the pairs that are actually returned.
+"""
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.services.skill_taxonomy import SkillTaxonomy, get_taxonomy
+
+
+class SkillOverlap:
+    """
+    overlap = SkillOverlap(cv_skill_lists, job_skill_lists)
+    overlap.scores        # (n_cvs x n_jobs) skill_score matrix
+    overlap.result(i, j)  # same dict as JobMatcherService.compute_skill_overlap
+    """
+
+    def __init__(
+        self,
+        cv_skills: List[Iterable[str]],
+        job_skills: List[Iterable[str]],
+        taxonomy: Optional[SkillTaxonomy] = None,
+    ):
+        taxonomy = taxonomy or get_taxonomy()
+        self._taxonomy = taxonomy
+
+        # taxonomy skills have fixed columns (ordered by display name); names the
+        # taxonomy doesn't know (legacy data) get extra columns for this batch only
+        columns = dict(taxonomy.skill_index)
+        self._known = len(columns)
+
+        def encode(lists: List[Iterable[str]]) -> np.ndarray:
+            rows = [[columns.setdefault(s, len(columns)) for s in taxonomy.canonicalize(names)] for names in lists]
+            bits = np.zeros((len(rows), len(columns)), dtype=bool)
+            for i, cols in enumerate(rows):
+                bits[i, cols] = True
+            return bits
+
+        cv_bits = encode(cv_skills)
+        job_bits = encode(job_skills)
+        width = len(columns)
+        self.cv_bits = np.pad(cv_bits, ((0, 0), (0, width - cv_bits.shape[1])))
+        self.job_bits = job_bits
+        self._names = [taxonomy.display(s) for s in columns]
+
+        # |cv ∩ job| for every pair in one product; skill_score = |cv ∩ job| / |job|
+        self.overlap_counts = self.cv_bits.astype(np.int32) @ self.job_bits.T.astype(np.int32)
+        self.job_counts = self.job_bits.sum(axis=1)
+        self.scores = self.overlap_counts / np.maximum(self.job_counts, 1)
+
+    def _display(self, mask: np.ndarray) -> List[str]:
+        cols = np.flatnonzero(mask)
+        names = [self._names[c] for c in cols]
+        # columns are already in display order unless batch-only names are involved
+        if len(cols) and cols[-1] >= self._known:
+            names.sort()
+        return names
+
+    def result(self, cv_index: int, job_index: int) -> Dict[str, Any]:
+        job_row = self.job_bits[job_index]
+        if not self.job_counts[job_index]:
+            return {"overlapping_skills": [], "missing_skills": [], "skill_score": 0.0}
+
+        cv_row = self.cv_bits[cv_index]
+        return {
+            "overlapping_skills": self._display(job_row & cv_row),
+            "missing_skills": self._display(job_row & ~cv_row),
+            "skill_score": float(self.scores[cv_index, job_index]),
+        }
@@ -0,0 +1,189 @@
+# app/services/skill_taxonomy.py
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.services.skill_matcher import SkillAutomaton, SkillMatch, tokenize
+
+SKILL_TAXONOMY_PATH = os.getenv(
+    "SKILL_TAXONOMY_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "skills.json"),
+)
+# How often (seconds) get_taxonomy() checks the file for changes
+SKILL_TAXONOMY_CHECK_INTERVAL = float(os.getenv("SKILL_TAXONOMY_CHECK_INTERVAL", "30"))
+
+
+@dataclass(frozen=True)
+class Skill:
+    id: str
+    name: str
+    category: Optional[str]
+    synonyms: Tuple[str, ...]
+
+
+def normalize_term(term: str) -> str:
+    """
+    Lookup key for a skill name / synonym: lowercase word tokens joined by spaces
+    ("End-User  Support" -> "end user support").
+    """
+    return " ".join(token for token, _, _ in tokenize(term or ""))
+
+
+class SkillTaxonomy:
+    """
+    Compiled, immutable view of the skill data file:
+    canonical ids, a term -> id lookup, and a matcher over every name and synonym.
+    """
+
+    def __init__(self, version: str, skills: Iterable[Skill]):
+        self.version = version
+        self.skills: Dict[str, Skill] = {}
+        self._lookup: Dict[str, str] = {}
+
+        for skill in skills:
+            if skill.id in self.skills:
+                raise ValueError(f"Duplicate skill id: {skill.id}")
+            self.skills[skill.id] = skill
+
+            for term in (skill.id, skill.name, *skill.synonyms):
+                key = normalize_term(term)
+                if not key:
+                    continue
+                owner = self._lookup.setdefault(key, skill.id)
+                if owner != skill.id:
+                    raise ValueError(f"Term '{term}' maps to both '{owner}' and '{skill.id}'")
+
+        # integer id per skill, in display-name order (bit columns for skill_overlap)
+        self.skill_index: Dict[str, int] = {
+            skill_id: i
+            for i, skill_id in enumerate(sorted(self.skills, key=lambda s: (self.skills[s].name, s)))
+        }
+
+        self._automaton = SkillAutomaton(
+            term for skill in self.skills.values() for term in (skill.name, *skill.synonyms)
+        )
+
+    def resolve(self, term: str) -> Optional[str]:
+        """
+        Canonical id for a skill name, synonym or id (None if unknown).
+        """
+        return self._lookup.get(normalize_term(term))
+
+    def display(self, skill_id: str) -> str:
+        skill = self.skills.get(skill_id)
+        return skill.name if skill else skill_id
+
+    def canonicalize(self, names: Iterable[str]) -> List[str]:
+        """
+        Distinct canonical ids for `names`, in order. Unknown names are kept
+        as their normalized form so legacy data still compares sensibly.
+        """
+        ids: Dict[str, None] = {}
+        for name in names or []:
+            if not name or not str(name).strip():
+                continue
+            ids.setdefault(self.resolve(name) or normalize_term(name), None)
+        return list(ids)
+
+    def find(self, text: str) -> List[SkillMatch]:
+        """
+        Skill occurrences in `text` (match.skill is the canonical id).
+        Leftmost-longest match wins: "azure active directory" is azure-ad only,
+        not also azure / active-directory, and matches never overlap.
+        """
+        matches = sorted(self._automaton.find_all(text), key=lambda m: (m.start, -m.end))
+
+        kept: List[SkillMatch] = []
+        covered_until = -1
+        for m in matches:
+            if m.start < covered_until:
+                continue
+            kept.append(SkillMatch(self._lookup[normalize_term(m.skill)], m.start, m.end))
+            covered_until = m.end
+        return kept
+
+    def extract_ids(self, text: str) -> List[str]:
+        ids: Dict[str, None] = {}
+        for match in self.find(text):
+            ids.setdefault(match.skill, None)
+        return list(ids)
+
+
+def load_taxonomy(path: str = SKILL_TAXONOMY_PATH) -> SkillTaxonomy:
+    with open(path, "rb") as f:
+        raw = f.read()
+    data = json.loads(raw.decode("utf-8"))
+
+    skills = [
+        Skill(
+            id=str(item["id"]),
+            name=str(item.get("name") or item["id"]),
+            category=item.get("category"),
+            synonyms=tuple(str(s) for s in item.get("synonyms") or []),
+        )
+        for item in data.get("skills", [])
+    ]
+    # the content hash changes with every edit, even one without a "version" bump
+    digest = hashlib.sha1(raw).hexdigest()[:10]
+    return SkillTaxonomy(version=f"{data.get('version', 'unversioned')}-{digest}", skills=skills)
+
+
+class _TaxonomyHolder:
+    def __init__(self, path: str):
+        self.path = path
+        self._taxonomy: Optional[SkillTaxonomy] = None
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _file_mtime(self) -> Optional[float]:
+        try:
+            return os.path.getmtime(self.path)
+        except OSError:
+            return None
+
+    def reload(self) -> SkillTaxonomy:
+        """
+        Load + compile the file and swap it in. On error the old taxonomy stays.
+        """
+        with self._lock:
+            mtime = self._file_mtime()
+            taxonomy = load_taxonomy(self.path)
+            self._taxonomy = taxonomy
+            self._mtime = mtime
+            self._checked_at = time.monotonic()
+            return taxonomy
+
+    def get(self) -> SkillTaxonomy:
+        taxonomy = self._taxonomy
+        if taxonomy is None:
+            return self.reload()
+
+        # cheap stat() at most every SKILL_TAXONOMY_CHECK_INTERVAL seconds, so
+        # every worker process picks up an edited file without a restart
+        now = time.monotonic()
+        if now - self._checked_at > SKILL_TAXONOMY_CHECK_INTERVAL:
+            self._checked_at = now
+            mtime = self._file_mtime()
+            if mtime is not None and mtime != self._mtime:
+                try:
+                    return self.reload()
+                except Exception as e:
+                    print(f"Skill taxonomy reload failed: {type(e).__name__}: {e}")
+        return taxonomy
+
+
+_holder = _TaxonomyHolder(SKILL_TAXONOMY_PATH)
+
+
+def get_taxonomy() -> SkillTaxonomy:
+    return _holder.get()
+
+
+def reload_taxonomy() -> SkillTaxonomy:
+    return _holder.reload()
+
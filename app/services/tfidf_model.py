@@ -0,0 +1,290 @@
+# app/services/tfidf_model.py
+import asyncio
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+from app.core.database import get_database
+from app.core.executors import run_in_pool
+from app.core.filelock import FileLock
+
+TFIDF_MODEL_PATH = os.getenv("TFIDF_MODEL_PATH", "data/tfidf_model.pkl")
+# Seconds between scheduled refits (0 = only refit on demand)
+TFIDF_REFIT_INTERVAL = float(os.getenv("TFIDF_REFIT_INTERVAL", "0"))
+# How often each worker checks (on the scoring pool) whether another process saved a newer model
+TFIDF_RELOAD_CHECK_SECONDS = float(os.getenv("TFIDF_RELOAD_CHECK_SECONDS", "5"))
+TFIDF_MIN_CORPUS_DOCS = int(os.getenv("TFIDF_MIN_CORPUS_DOCS", "20"))
+TFIDF_MAX_CORPUS_DOCS = int(os.getenv("TFIDF_MAX_CORPUS_DOCS", "20000"))
+
+
+@dataclass(frozen=True)
+class TfidfModel:
+    vectorizer: "TfidfVectorizer"
+    version: str
+    fitted_at: float
+    n_docs: int
+
+
+def build_vectorizer() -> "TfidfVectorizer":
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    return TfidfVectorizer(stop_words="english")
+
+
+class TfidfModelStore:
+    """
+    Holds the corpus-fitted vectorizer used for transform-only scoring.
+
+    The current model is replaced with a single reference assignment, so
+    in-flight requests keep the model they started with and never see a
+    half-fitted vectorizer.
+
+    The model's version is persisted next to it (`<path>.version`). Every
+    worker process re-checks that file at most every TFIDF_RELOAD_CHECK_SECONDS
+    and reloads the model when another process has saved a new one, so all
+    workers converge on the same version.
+
+    `current` / `version` never touch the disk, so the event loop can read
+    them; loading and reloading happen in `sync()`, which blocks and is only
+    called from the scoring pool (warmup, scoring, tfidf_reload_loop).
+    """
+
+    def __init__(self, path: str = TFIDF_MODEL_PATH):
+        self.path = path
+        self.version_path = f"{path}.version"
+        self.lock_path = f"{path}.lock"
+        self._model: Optional[TfidfModel] = None
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        self._version_mtime: Optional[int] = None
+        self._checked_at = 0.0
+
+    @property
+    def current(self) -> Optional[TfidfModel]:
+        # a plain reference read: None until sync() / fit() has loaded a model
+        return self._model
+
+    def sync(self) -> Optional[TfidfModel]:
+        """
+        Load the persisted model on first use, and pick up a newer one saved
+        by another process (checked at most every TFIDF_RELOAD_CHECK_SECONDS).
+        Blocking (unpickling imports scikit-learn): scoring pool only.
+        """
+        if not self._loaded:
+            self.ensure_loaded()
+        elif time.monotonic() - self._checked_at >= TFIDF_RELOAD_CHECK_SECONDS:
+            self._reload_if_changed()
+        return self._model
+
+    @property
+    def version(self) -> Optional[str]:
+        model = self.current
+        return model.version if model else None
+
+    def ensure_loaded(self) -> bool:
+        """
+        Load the persisted model once. Returns True if a model is available.
+        """
+        with self._load_lock:
+            if not self._loaded:
+                self.load()
+        return self._model is not None
+
+    def persisted_info(self) -> Optional[Dict[str, Any]]:
+        """
+        {version, fitted_at, n_docs} of the model on disk (None if there is none).
+        """
+        try:
+            with open(self.version_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _reload_if_changed(self) -> None:
+        # one thread checks; the others keep using the current model meanwhile
+        if not self._load_lock.acquire(blocking=False):
+            return
+        try:
+            self._checked_at = time.monotonic()
+            try:
+                mtime = os.stat(self.version_path).st_mtime_ns
+            except OSError:
+                return
+            if mtime == self._version_mtime:
+                return
+            info = self.persisted_info()
+            if info and info.get("version") != (self._model.version if self._model else None):
+                self.load()
+            else:
+                self._version_mtime = mtime
+        finally:
+            self._load_lock.release()
+
+    def load(self) -> bool:
+        """
+        Load the persisted model from disk (if any).
+        """
+        try:
+            # version file first: if a save lands in between, the next check
+            # sees a newer mtime and compares versions again
+            try:
+                self._version_mtime = os.stat(self.version_path).st_mtime_ns
+            except OSError:
+                self._version_mtime = None
+            if not os.path.exists(self.path):
+                return False
+            with open(self.path, "rb") as f:
+                model = pickle.load(f)
+            if not isinstance(model, TfidfModel):
+                return False
+            self._model = model
+            return True
+        finally:
+            self._checked_at = time.monotonic()
+            self._loaded = True
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        # unique temp file + rename: concurrent writers never share a temp
+        # file and a crash never leaves a truncated file behind
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _save(self, model: TfidfModel) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # model first, then its version: a reader that sees the new version finds the new model
+        self._write_atomic(self.path, pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+        info = {"version": model.version, "fitted_at": model.fitted_at, "n_docs": model.n_docs}
+        self._write_atomic(self.version_path, json.dumps(info).encode("utf-8"))
+
+    def fit(self, texts: List[str]) -> TfidfModel:
+        """
+        Fit a new vectorizer on `texts`, persist it and swap it in. Blocking.
+        """
+        vectorizer = build_vectorizer()
+        vectorizer.fit(texts)
+
+        vocab_hash = hashlib.sha1(
+            "\n".join(sorted(vectorizer.vocabulary_)).encode("utf-8")
+        ).hexdigest()[:10]
+        fitted_at = time.time()
+
+        model = TfidfModel(
+            vectorizer=vectorizer,
+            version=f"tfidf-{int(fitted_at)}-{vocab_hash}",
+            fitted_at=fitted_at,
+            n_docs=len(texts),
+        )
+        with self._load_lock:
+            self._save(model)
+            self._model = model
+            self._version_mtime = os.stat(self.version_path).st_mtime_ns
+            self._loaded = True
+        return model
+
+
+tfidf_store = TfidfModelStore()
+
+_refit_lock = asyncio.Lock()
+
+
+async def load_corpus(limit: int = TFIDF_MAX_CORPUS_DOCS) -> List[str]:
+    """
+    Stored CV texts + distinct job descriptions (newest first).
+    """
+    db = get_database()
+    texts: List[str] = []
+
+    half = max(1, limit // 2)
+    async for doc in db["cvs"].find({}, {"parsed_text": 1}).sort("created_at", -1).limit(half):
+        if doc.get("parsed_text"):
+            texts.append(doc["parsed_text"])
+
+    remaining = max(1, limit - len(texts))
+    async for doc in db["job_postings"].find({}, {"description": 1}).sort("created_at", -1).limit(remaining):
+        if doc.get("description"):
+            texts.append(doc["description"])
+
+    # match history written before job_postings existed still carries inline text
+    remaining = limit - len(texts)
+    if remaining > 0:
+        legacy = db["job_matches"].find({"job_description": {"$exists": True}}, {"job_description": 1})
+        async for doc in legacy.sort("created_at", -1).limit(remaining):
+            if doc.get("job_description"):
+                texts.append(doc["job_description"])
+
+    return texts
+
+
+async def refit_tfidf_model(max_age: Optional[float] = None) -> Optional[TfidfModel]:
+    """
+    Refit the vectorizer on the stored corpus and hot-swap it.
+    Returns None if there is not enough data yet, or (with `max_age`) if the
+    persisted model is younger than `max_age` seconds.
+
+    Only one process refits at a time (flock on `<model path>.lock`); raises
+    BlockingIOError if another one is refitting.
+    """
+    async with _refit_lock:
+        with FileLock(tfidf_store.lock_path, blocking=False):
+            if max_age is not None:
+                # another worker may have refitted since this one last looked
+                info = tfidf_store.persisted_info()
+                if info and time.time() - info.get("fitted_at", 0) < max_age:
+                    return None
+
+            texts = await load_corpus()
+            if len(texts) < TFIDF_MIN_CORPUS_DOCS:
+                return None
+            return await run_in_pool("scoring", tfidf_store.fit, texts)
+
+
+async def tfidf_reload_loop(interval: float = TFIDF_RELOAD_CHECK_SECONDS) -> None:
+    """
+    Background task: load the model, then keep this worker on the persisted
+    version, on the scoring pool (requests only read `tfidf_store.current`).
+    """
+    while True:
+        try:
+            await run_in_pool("scoring", tfidf_store.sync)
+        except Exception as e:
+            # pool saturated / unreadable file: retried on the next tick
+            print(f"TF-IDF reload check failed: {type(e).__name__}: {e}")
+        await asyncio.sleep(max(interval, 1.0))
+
+
+async def tfidf_refit_loop(interval: float = TFIDF_REFIT_INTERVAL) -> None:
+    """
+    Background task: refit every `interval` seconds.
+
+    Runs in every worker, but a worker only refits when the persisted model
+    is older than the interval and no other worker is refitting, so there
+    is one refit per interval across all of them; the rest pick the new
+    model up from disk.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await refit_tfidf_model(max_age=interval * 0.9)
+        except BlockingIOError:
+            pass
+        except Exception as e:
+            print(f"TF-IDF refit failed: {type(e).__name__}: {e}")
@@ -3,6 +3,7 @@ export interface CvUploadResponse {
   file_name: string;
   skills: string[];
   experience: string[];
+  cached?: boolean; // true when the same PDF was already uploaded
 }
 
 export interface JobMatchResponse {
@@ -43,6 +44,7 @@ export interface CoverLetterResponse {
   cover_letter: string;
   mode: "openai" | "template" | "none"; // ✅ add none
   note?: string;
+  cached?: boolean;
 }
 
 export type CoverLetterHistoryItem = {
@@ -1,3 +1,6 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -9,10 +12,51 @@ from app.api.cv_routes import router as cv_router
 from app.api.auth_routes import router as auth_router
 from app.api.job_routes import router as job_router 
 from app.api.cover_letter_routes import router as cover_letter_router
-from app.core.auth import get_current_user_id
+from app.api.admin_routes import router as admin_router
+from app.api.task_routes import router as task_router
+from app.core.auth import get_current_user_id, require_admin_user_id
+from app.core import metrics
+from app.core.database import close_database, connect_database
+from app.core.executors import run_in_pool, shutdown_pools
+from app.core.indexes import ensure_indexes
+from app.core.tasks import task_queue
+from app.services.openai_cover_letter import close_client as close_llm_client
+from app.services.scoring_backends import warmup_scoring
+from app.services.tfidf_model import TFIDF_REFIT_INTERVAL, tfidf_refit_loop, tfidf_reload_loop
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # clients are created here, in the worker process, never at import time
+    connect_database()
+
+    # idempotent: creates any missing index on every collection
+    await ensure_indexes()
+
+    # background task workers (+ recovery of tasks left unfinished by the last run)
+    await task_queue.start()
 
+    # corpus TF-IDF model (falls back to per-call fitting until one exists) + the
+    # configured scoring backend; both pull in heavy libraries, so warm them up off the startup path
+    warmup_task = asyncio.create_task(run_in_pool("scoring", warmup_scoring))
+    # loads / reloads of the persisted model run on the scoring pool, never on the loop
+    reload_task = asyncio.create_task(tfidf_reload_loop())
+    refit_task = asyncio.create_task(tfidf_refit_loop()) if TFIDF_REFIT_INTERVAL > 0 else None
 
-app = FastAPI()
+    yield
+
+    warmup_task.cancel()
+    reload_task.cancel()
+    if refit_task:
+        refit_task.cancel()
+    await task_queue.stop()
+    # stop PDF / scoring / HTTP worker pools
+    shutdown_pools()
+    await close_llm_client()
+    close_database()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # allowed frontends (we'll use these later)
 origins = [
@@ -41,6 +85,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # ✅ pagination cursor for list endpoints
 )
 
 
@@ -49,6 +94,12 @@ def health_check():
     return {"status": "ok", "app": "JobPilot backend is running 🎯"}
 
 
+@app.get("/metrics")
+def metrics_snapshot(_: str = Depends(require_admin_user_id)):
+    # per-process counters (cache hits/misses, refreshes, ...); admins only
+    return metrics.snapshot()
+
+
 @app.get("/me")
 def me(user_id: str = Depends(get_current_user_id)):
     return {"user_id": user_id}
@@ -57,4 +108,6 @@ def me(user_id: str = Depends(get_current_user_id)):
 app.include_router(cv_router, tags=["CV"])
 app.include_router(job_router)
 app.include_router(cover_letter_router) 
-app.include_router(auth_router, tags=["Auth"])
\ No newline at end of file
+app.include_router(auth_router, tags=["Auth"])
+app.include_router(admin_router)
+app.include_router(task_router)
\ No newline at end of file
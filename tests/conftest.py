@@ -0,0 +1,63 @@
+# tests/conftest.py
+import os
+
+import pytest
+
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+
+
+@pytest.fixture
+def mongo(monkeypatch):
+    """
+    In-memory Mongo (mongomock-motor) behind app.core.database.get_database().
+    """
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    import mongomock.collection
+
+    from app.core import database
+
+    # pymongo >= 4.11 passes sort= to bulk updates; mongomock does not take it yet
+    add_update = mongomock.collection.BulkOperationBuilder.add_update
+    monkeypatch.setattr(
+        mongomock.collection.BulkOperationBuilder,
+        "add_update",
+        lambda self, *args, sort=None, **kwargs: add_update(self, *args, **kwargs),
+    )
+    monkeypatch.setattr(database, "client", mongomock_motor.AsyncMongoMockClient())
+    yield database.get_database()
+    monkeypatch.setattr(database, "client", None)
+
+
+@pytest.fixture
+def serve():
+    """
+    serve(asgi_app) -> base URL of the app running on a local port (uvicorn,
+    background thread), stopped after the test.
+    """
+    import socket
+    import threading
+    import time
+
+    import uvicorn
+
+    servers = []
+
+    def _serve(app) -> str:
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        servers.append((server, thread))
+        deadline = time.monotonic() + 10
+        while not server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("local test server did not start")
+            time.sleep(0.01)
+        return f"http://127.0.0.1:{port}"
+
+    yield _serve
+    for server, thread in servers:
+        server.should_exit = True
+        thread.join(timeout=5)
@@ -0,0 +1,84 @@
+# tests/fake_openai.py
+"""
+Local stand-in for the OpenAI Responses API (POST /v1/responses), with
+injectable latency and failures.
+"""
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+@dataclass
+class FakeResponses:
+    text: str = "Dear Hiring Manager, I would love to join Acme."
+    delay: float = 0.0  # seconds before responding
+    fail_first: int = 0  # this many requests get a 503 first
+    status: int = 503
+    token_delay: float = 0.0  # per streamed word; a non-streamed response waits for all of them
+    fail_after_tokens: int = -1  # stream: cut the connection after this many deltas
+    requests: List[dict] = field(default_factory=list)
+
+    def app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.post("/v1/responses")
+        async def responses(request: Request):
+            body = await request.json()
+            self.requests.append(body)
+            if len(self.requests) <= self.fail_first:
+                return JSONResponse({"error": {"message": "injected failure"}}, status_code=self.status)
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            if body.get("stream"):
+                return StreamingResponse(self._stream(), media_type="text/event-stream")
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay * len(self.text.split()))
+            return _response(self.text)
+
+        return app
+
+    async def _stream(self):
+        words = [w + " " for w in self.text.split()] if self.text else []
+        for i, word in enumerate(words):
+            if i == self.fail_after_tokens:
+                raise RuntimeError("injected disconnect")
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            event = {
+                "type": "response.output_text.delta",
+                "item_id": "msg_1",
+                "output_index": 0,
+                "content_index": 0,
+                "delta": word,
+                "sequence_number": i,
+                "logprobs": [],
+            }
+            yield f"event: response.output_text.delta\ndata: {json.dumps(event)}\n\n"
+        done = {"type": "response.completed", "sequence_number": len(words), "response": _response(self.text)}
+        yield f"event: response.completed\ndata: {json.dumps(done)}\n\n"
+
+
+def _response(text: str) -> dict:
+    return {
+        "id": "resp_1",
+        "object": "response",
+        "created_at": 0,
+        "model": "fake",
+        "status": "completed",
+        "output": [
+            {
+                "type": "message",
+                "id": "msg_1",
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }
+        ],
+        "parallel_tool_calls": False,
+        "tool_choice": "auto",
+        "tools": [],
+    }
@@ -0,0 +1,239 @@
+# tests/test_auth.py
+import asyncio
+import json
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.core import auth, metrics
+from app.core.auth import JWKSCache, VerifiedTokenCache
+
+ISSUER = "https://clerk.test"
+
+
+class _Keys:
+    def __init__(self, keys):
+        self.keys = keys
+        self.refreshes = 0
+
+    def peek(self, kid):
+        return self.keys.get(kid)
+
+    def maybe_refresh(self):
+        self.refreshes += 1
+
+
+def test_token_cache_serves_until_exp():
+    key = object()
+    jwks = _Keys({"k1": key})
+    cache = VerifiedTokenCache(maxsize=8)
+
+    cache.put("token-a", "user-a", time.time() + 60, "k1", key)
+    cache.put("token-b", "user-b", time.time() + 0.05, "k1", key)
+    cache.put("token-c", "user-c", time.time() - 1, "k1", key)
+    cache.put("token-d", "user-d", None, "k1", key)
+
+    assert cache.get("token-a", jwks) == "user-a"
+    assert cache.get("token-b", jwks) == "user-b"
+    time.sleep(0.1)
+    assert cache.get("token-b", jwks) is None
+    assert cache.get("token-c", jwks) is None
+    assert cache.get("token-d", jwks) is None
+    assert jwks.refreshes == 2
+
+
+def test_token_cache_drops_entries_of_rotated_keys():
+    old, new = object(), object()
+    jwks = _Keys({"k1": old})
+    cache = VerifiedTokenCache(maxsize=8)
+    cache.put("token", "user", time.time() + 60, "k1", old)
+    misses = metrics.get("auth_token_cache_misses")
+
+    jwks.keys["k1"] = new
+    assert cache.get("token", jwks) is None
+    jwks.keys["k1"] = old
+    assert cache.get("token", jwks) is None  # the entry is gone, not just skipped
+    assert metrics.get("auth_token_cache_misses") - misses == 2
+
+
+def test_token_cache_is_bounded():
+    key = object()
+    jwks = _Keys({"k1": key})
+    cache = VerifiedTokenCache(maxsize=2)
+    for name in ("a", "b", "c"):
+        cache.put(name, f"user-{name}", time.time() + 60, "k1", key)
+
+    assert cache.get("a", jwks) is None
+    assert [cache.get(n, jwks) for n in ("b", "c")] == ["user-b", "user-c"]
+
+
+class _Issuer:
+    """
+    Stand-in for the issuer's /.well-known/jwks.json (served by the `serve` fixture).
+    """
+
+    def __init__(self):
+        self.private_keys = {}
+        self.fetches = 0
+        self.down = False
+
+    def add_key(self, kid):
+        self.private_keys[kid] = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    def token(self, kid, sub="user-1", exp_in=60):
+        claims = {"sub": sub, "iss": ISSUER, "exp": int(time.time()) + exp_in}
+        return jwt.encode(claims, self.private_keys[kid], algorithm="RS256", headers={"kid": kid})
+
+    def app(self):
+        app = FastAPI()
+
+        @app.get("/.well-known/jwks.json")
+        def jwks():
+            self.fetches += 1
+            if self.down:
+                return JSONResponse({"error": "unavailable"}, status_code=503)
+            keys = []
+            for kid, private_key in self.private_keys.items():
+                jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+                keys.append({**jwk, "kid": kid, "use": "sig", "alg": "RS256"})
+            return {"keys": keys}
+
+        return app
+
+
+@pytest.fixture
+def issuer(serve):
+    issuer = _Issuer()
+    issuer.add_key("k1")
+    issuer.url = serve(issuer.app()) + "/.well-known/jwks.json"
+    return issuer
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_keys_are_fetched_once_and_served_from_memory(issuer):
+    jwks = JWKSCache(issuer.url)
+    hits = metrics.get("jwks_hits")
+
+    key = jwks.get_signing_key("k1")
+    assert all(jwks.get_signing_key("k1") is key for _ in range(20))
+    assert issuer.fetches == 1
+    assert metrics.get("jwks_hits") - hits == 20
+
+
+def test_unknown_kid_refetches_at_most_once_per_interval(issuer):
+    jwks = JWKSCache(issuer.url, min_refetch_interval=60)
+    jwks.get_signing_key("k1")
+
+    for _ in range(5):
+        with pytest.raises(jwt.PyJWKClientError):
+            jwks.get_signing_key("nope")
+    assert issuer.fetches == 1  # the cold fetch was recent: no refetch for random kids
+
+
+def test_rotated_key_is_picked_up_by_one_refetch(issuer):
+    jwks = JWKSCache(issuer.url, min_refetch_interval=0)
+    old = jwks.get_signing_key("k1")
+    issuer.add_key("k2")
+
+    assert jwks.get_signing_key("k2") is not None
+    assert issuer.fetches == 2
+    # unchanged kids keep their key object, so verified tokens stay cached
+    assert jwks.get_signing_key("k1") is old
+
+
+def test_stale_keys_refresh_in_the_background(issuer):
+    jwks = JWKSCache(issuer.url, ttl=0.05, min_refetch_interval=0)
+    key = jwks.get_signing_key("k1")
+    refreshes = metrics.get("jwks_refreshes")
+    time.sleep(0.1)
+
+    assert jwks.get_cached_key("k1") is key  # served right away, refresh started
+    _wait_for(lambda: metrics.get("jwks_refreshes") > refreshes)
+    assert issuer.fetches == 2
+
+
+def test_last_good_keys_are_served_while_the_issuer_is_down(issuer):
+    jwks = JWKSCache(issuer.url, ttl=0.05, min_refetch_interval=0)
+    key = jwks.get_signing_key("k1")
+    failures = metrics.get("jwks_refresh_failures")
+    issuer.down = True
+    time.sleep(0.1)
+
+    assert jwks.get_cached_key("k1") is key
+    _wait_for(lambda: metrics.get("jwks_refresh_failures") > failures)
+    assert jwks.refresh() is False
+    assert jwks.get_signing_key("k1") is key
+
+
+def test_get_current_user_id_verifies_once_per_token(issuer, monkeypatch):
+    monkeypatch.setattr(auth, "CLERK_ISSUER", ISSUER)
+    monkeypatch.setattr(auth, "_jwks_cache", JWKSCache(issuer.url))
+    monkeypatch.setattr(auth, "token_cache", VerifiedTokenCache(maxsize=8))
+
+    def _user_id(token):
+        creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+        return asyncio.run(auth.get_current_user_id(creds))
+
+    token = issuer.token("k1", sub="user-42")
+    hits = metrics.get("auth_token_cache_hits")
+    assert _user_id(token) == "user-42"
+    assert _user_id(token) == "user-42"
+    assert issuer.fetches == 1
+    assert metrics.get("auth_token_cache_hits") - hits == 1
+
+    with pytest.raises(HTTPException) as exc:
+        _user_id(issuer.token("k1", exp_in=-60))
+    assert exc.value.status_code == 401
+
+
+def test_token_cache_benchmark(issuer, monkeypatch, requests=500):
+    monkeypatch.setattr(auth, "CLERK_ISSUER", ISSUER)
+    monkeypatch.setattr(auth, "_jwks_cache", JWKSCache(issuer.url))
+    creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=issuer.token("k1"))
+
+    async def _per_second(cache_size):
+        monkeypatch.setattr(auth, "token_cache", VerifiedTokenCache(maxsize=cache_size))
+        await auth.get_current_user_id(creds)  # cold JWKS fetch / first verification
+        started = time.perf_counter()
+        for _ in range(requests):
+            await auth.get_current_user_id(creds)
+        return requests / (time.perf_counter() - started)
+
+    off = asyncio.run(_per_second(0))
+    on = asyncio.run(_per_second(1024))
+    print(f"\nauth requests/s (same token): cache off {off:,.0f}, cache on {on:,.0f} ({on / off:.1f}x)")
+    assert on > off * 2
+
+
+@pytest.mark.parametrize("user_id, status", [(None, 401), ("user-1", 403), ("admin-1", 200)])
+def test_metrics_are_admin_only(monkeypatch, user_id, status):
+    from fastapi.testclient import TestClient
+
+    import main
+
+    async def current_user_id():
+        if user_id is None:
+            raise HTTPException(status_code=401, detail="Missing bearer token")
+        return user_id
+
+    monkeypatch.setattr(auth, "ADMIN_USER_IDS", {"admin-1"})
+    monkeypatch.setitem(main.app.dependency_overrides, auth.get_current_user_id, current_user_id)
+    metrics.incr("metrics_route_test")
+
+    # no `with`: the app's lifespan (database, task workers) is not started
+    response = TestClient(main.app).get("/metrics")
+
+    assert response.status_code == status
+    if status == 200:
+        assert response.json()["metrics_route_test"] >= 1
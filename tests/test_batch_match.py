@@ -0,0 +1,123 @@
+# tests/test_batch_match.py
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.api import job_routes
+from app.schemas.job_match_schema import BatchJobMatchRequest
+
+_JOBS = [
+    ("Receptionist", "Front desk, phone calls and visitor scheduling"),
+    ("Backend Engineer", "Python, FastAPI and PostgreSQL services running on Docker and Kubernetes"),
+    ("Data Engineer", "Python and SQL pipelines with Airflow and Spark"),
+    ("Frontend Engineer", "React and TypeScript user interfaces"),
+    ("Platform Engineer", "Docker, Kubernetes and Terraform on AWS with Python tooling"),
+]
+
+
+def _insert_cv(mongo, user_id="user-1"):
+    cv_id = ObjectId()
+    asyncio.run(mongo["cvs"].insert_one({
+        "_id": cv_id,
+        "user_id": user_id,
+        "parsed_text": "Backend developer: Python, FastAPI, PostgreSQL, Docker and Kubernetes in production",
+        "skills": ["Python", "FastAPI", "PostgreSQL", "Docker", "Kubernetes"],
+        "created_at": datetime.utcnow(),
+    }))
+    return str(cv_id)
+
+
+def _payload(cv_id, stream=False, jobs=_JOBS):
+    return BatchJobMatchRequest(
+        cv_id=cv_id,
+        stream=stream,
+        jobs=[{"job_title": title, "company": "Acme", "job_description": text} for title, text in jobs],
+    )
+
+
+async def _ndjson(response):
+    chunks = [chunk async for chunk in response.body_iterator]
+    return chunks, [json.loads(line) for line in "".join(chunks).splitlines()]
+
+
+def _counts(mongo, user_id="user-1"):
+    async def _count():
+        return (
+            await mongo["job_matches"].count_documents({"user_id": user_id}),
+            await mongo["tracked_jobs"].count_documents({"user_id": user_id}),
+        )
+
+    return asyncio.run(_count())
+
+
+def test_json_mode_ranks_and_saves_every_result(mongo):
+    cv_id = _insert_cv(mongo)
+
+    result = asyncio.run(job_routes.match_jobs_batch(_payload(cv_id), "user-1"))
+
+    assert (result["cv_id"], result["count"]) == (cv_id, len(_JOBS))
+    scores = [item["match_score"] for item in result["results"]]
+    assert scores == sorted(scores, reverse=True)
+    assert result["results"][0]["job_title"] == "Backend Engineer"
+    assert all(item["match_id"] == item["id"] and item["tracked_job_id"] for item in result["results"])
+    assert len({item["match_id"] for item in result["results"]}) == len(_JOBS)
+    assert _counts(mongo) == (len(_JOBS), len(_JOBS))
+
+
+def test_ndjson_mode_saves_the_whole_batch_before_streaming(mongo, monkeypatch):
+    monkeypatch.setattr(job_routes, "BATCH_STREAM_CHUNK", 2)
+    cv_id = _insert_cv(mongo)
+
+    async def _scenario():
+        response = await job_routes.match_jobs_batch(_payload(cv_id, stream=True), "user-1")
+        # nothing read yet: a client that disconnects now still has the whole batch saved
+        saved_before_streaming = await mongo["job_matches"].count_documents({"user_id": "user-1"})
+        return response, saved_before_streaming, await _ndjson(response)
+
+    response, saved_before_streaming, (chunks, items) = asyncio.run(_scenario())
+
+    assert response.media_type == "application/x-ndjson"
+    assert saved_before_streaming == len(_JOBS)
+    assert len(chunks) == 3  # 2 + 2 + 1 lines
+    assert [item["job_title"] for item in items][0] == "Backend Engineer"
+    scores = [item["match_score"] for item in items]
+    assert scores == sorted(scores, reverse=True)
+    assert all(item["match_id"] and item["tracked_job_id"] for item in items)
+    assert _counts(mongo) == (len(_JOBS), len(_JOBS))
+
+
+def test_both_modes_return_the_same_items(mongo):
+    cv_id = _insert_cv(mongo)
+
+    async def _both():
+        plain = await job_routes.match_jobs_batch(_payload(cv_id), "user-1")
+        streamed = await job_routes.match_jobs_batch(_payload(cv_id, stream=True), "user-1")
+        return plain["results"], (await _ndjson(streamed))[1]
+
+    plain, streamed = asyncio.run(_both())
+
+    strip = lambda items: [{k: v for k, v in item.items() if k not in ("id", "match_id", "tracked_job_id")} for item in items]
+    assert strip(streamed) == strip(plain)
+
+
+@pytest.mark.parametrize("jobs, status", [([], 400), (_JOBS * 3, 400)])
+def test_batch_size_limits(mongo, monkeypatch, jobs, status):
+    monkeypatch.setattr(job_routes, "MAX_BATCH_JOBS", 10)
+
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(job_routes.match_jobs_batch(_payload(_insert_cv(mongo), jobs=jobs), "user-1"))
+    assert e.value.status_code == status
+    assert _counts(mongo) == (0, 0)
+
+
+def test_another_users_cv_is_not_found(mongo):
+    cv_id = _insert_cv(mongo, user_id="user-2")
+
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(job_routes.match_jobs_batch(_payload(cv_id, stream=True), "user-1"))
+    assert e.value.status_code == 404
+    assert _counts(mongo) == (0, 0)
@@ -0,0 +1,35 @@
+# tests/test_batch_match_task.py
+import asyncio
+
+from app.api import job_routes
+from app.services.job_posting_repository import posting_id_for
+
+
+def test_task_result_references_postings_instead_of_descriptions(mongo, monkeypatch):
+    jobs = [
+        {"job_title": f"Engineer {i}", "company": "Acme", "job_description": f"Python role number {i}. " * 200}
+        for i in range(3)
+    ]
+    results = [
+        {"cv_id": "cv-1", "job_title": j["job_title"], "company": "Acme", "match_score": 90 - i,
+         "semantic_score": 0.5, "skill_score": 0.5, "job_skills": [], "overlapping_skills": [], "missing_skills": []}
+        for i, j in enumerate(jobs)
+    ]
+
+    async def rank_batch(user_id, request):
+        return jobs, results
+
+    monkeypatch.setattr(job_routes, "_rank_batch", rank_batch)
+    payload = {"cv_id": "cv-1", "jobs": [{k: j[k] for k in ("job_title", "company", "job_description")} for j in jobs]}
+
+    result = asyncio.run(job_routes._batch_match_task("user-1", payload))
+
+    assert result["count"] == 3
+    for job, item in zip(jobs, result["results"]):
+        assert "job_description" not in item
+        assert item["job_posting_id"] == posting_id_for(job["job_description"])
+        assert item["match_id"] and item["tracked_job_id"]
+
+    # the postings the ids point at were stored by the match write itself
+    stored = asyncio.run(mongo["job_postings"].count_documents({"_id": {"$in": [posting_id_for(j["job_description"]) for j in jobs]}}))
+    assert stored == 3
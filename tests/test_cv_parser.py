@@ -0,0 +1,114 @@
+# tests/test_cv_parser.py
+"""
+    python -m pytest tests/test_cv_parser.py -k benchmark -s   # prints the parse times per PDF size
+"""
+import asyncio
+import os
+import random
+import re
+import tempfile
+import time
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+
+from app.core.executors import shutdown_pools
+from app.services import cv_parser
+from app.services.cv_parser import PdfLimitError, parse_pdf_pages, parse_pdf_parallel
+
+
+def _pdf(pages: int) -> bytes:
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((72, 72), f"Page {i} python docker")
+    return doc.tobytes()
+
+
+@pytest.fixture(autouse=True)
+def _pools():
+    yield
+    shutdown_pools()
+
+
+def test_pages_from_bytes_and_path(tmp_path):
+    data = _pdf(5)
+    path = tmp_path / "cv.pdf"
+    path.write_bytes(data)
+
+    assert parse_pdf_pages(data, 1, 3) == parse_pdf_pages(str(path), 1, 3)
+    text, page_count = parse_pdf_pages(str(path), 1, 3)
+    assert page_count == 5
+    assert "Page 1" in text and "Page 2" in text and "Page 3" not in text
+
+
+def test_parallel_parse_keeps_page_order_and_cleans_up(monkeypatch):
+    monkeypatch.setattr(cv_parser, "PDF_PARALLEL_MIN_PAGES", 2)
+    monkeypatch.setattr(cv_parser, "PDF_PAGES_PER_TASK", 3)
+    monkeypatch.setattr(cv_parser, "PDF_TARGET_CHARS", 0)
+    before = set(os.listdir(tempfile.gettempdir()))
+
+    text = asyncio.run(parse_pdf_parallel(_pdf(12)))
+
+    assert re.findall(r"Page (\d+)", text) == [str(i) for i in range(12)]
+    leftovers = {n for n in set(os.listdir(tempfile.gettempdir())) - before if n.startswith("cv-")}
+    assert not leftovers
+
+
+def test_page_limit():
+    with pytest.raises(PdfLimitError):
+        parse_pdf_pages(_pdf(3), 0, 3, max_pages=2)
+
+
+_WORDS = "python docker kubernetes postgres react led built designed shipped migrated team platform api".split()
+
+
+def _dense_pdf(pages: int, seed: int = 0) -> bytes:
+    # a CV-like page: ~45 lines of text
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for i in range(pages):
+        lines = [f"Page {i}"] + [" ".join(rng.choice(_WORDS) for _ in range(12)) for _ in range(45)]
+        doc.new_page().insert_text((36, 36), "\n".join(lines), fontsize=8)
+    return doc.tobytes()
+
+
+def _best_of(fn, runs=3):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000, result
+
+
+def test_parse_benchmark_by_pdf_size(monkeypatch):
+    sizes = [1, 5, 10, 20, 30]
+    pdfs = {pages: _dense_pdf(pages, seed=pages) for pages in sizes}
+    # the first call starts the PDF worker processes
+    asyncio.run(parse_pdf_parallel(pdfs[1]))
+
+    rows = []
+    for pages in sizes:
+        data = pdfs[pages]
+        monkeypatch.setattr(cv_parser, "PDF_TARGET_CHARS", 0)
+        sequential_ms, sequential = _best_of(lambda: cv_parser.parse_pdf_pages(data, 0, pages, max_chars=0)[0])
+        parallel_ms, parallel = _best_of(lambda: asyncio.run(parse_pdf_parallel(data)))
+        monkeypatch.setattr(cv_parser, "PDF_TARGET_CHARS", 50000)
+        capped_ms, capped = _best_of(lambda: asyncio.run(parse_pdf_parallel(data)))
+
+        # the page-range split and the early stop never reorder or drop the text they read
+        # (ranges are stripped before joining, so only the whitespace between them differs)
+        words = sequential.split()
+        assert parallel.split() == words
+        assert capped.split() == words[:len(capped.split())]
+        rows.append((pages, len(data) // 1024, len(sequential), sequential_ms, parallel_ms, capped_ms, len(capped)))
+
+    print(f"\n{'pages':>5} {'KiB':>6} {'chars':>7} {'in-proc ms':>10} {'pool ms':>8} {'capped ms':>9} {'capped chars':>12}")
+    for row in rows:
+        print("{:>5} {:>6} {:>7} {:>10.1f} {:>8.1f} {:>9.1f} {:>12}".format(*row))
+
+    # past PDF_TARGET_CHARS the remaining pages are skipped, so the cost stops growing
+    largest = rows[-1]
+    assert largest[6] < largest[2]
+    assert largest[5] < largest[4]
@@ -0,0 +1,141 @@
+# tests/test_cv_repository.py
+import asyncio
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.api import cv_routes
+from app.core import metrics
+from app.services.cv_repository import (
+    clear_cv_cache,
+    delete_cv_for_user,
+    get_cv_profile_for_user,
+    insert_cv,
+    update_cv_for_user,
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    clear_cv_cache()
+    yield
+    clear_cv_cache()
+
+
+def _insert_cv(mongo, user_id="user-1"):
+    cv_id = ObjectId()
+    asyncio.run(mongo["cvs"].insert_one({
+        "_id": cv_id,
+        "user_id": user_id,
+        "parsed_text": "Python developer",
+        "skills": ["Python"],
+        "created_at": datetime.utcnow(),
+    }))
+    return str(cv_id)
+
+
+def _run(*steps):
+    async def _all():
+        return [await step for step in steps]
+
+    return asyncio.run(_all())
+
+
+def test_profiles_are_cached_without_raw_text(mongo):
+    cv_id = _insert_cv(mongo)
+    hits = metrics.get("cv_cache_hits")
+
+    async def _read_write_read():
+        first = await get_cv_profile_for_user(cv_id, "user-1")
+        first["score"] = 1.0  # callers get a copy they may add fields to
+        # a write that bypasses the repository is not seen until the entry goes
+        await mongo["cvs"].update_one({"_id": ObjectId(cv_id)}, {"$set": {"skills": ["Go"]}})
+        return first, await get_cv_profile_for_user(cv_id, "user-1")
+
+    first, second = asyncio.run(_read_write_read())
+
+    assert "parsed_text" not in first
+    assert second["skills"] == ["Python"] and second["id"] == cv_id
+    assert "score" not in second
+    assert metrics.get("cv_cache_hits") - hits == 1
+
+
+def test_update_invalidates_the_cached_profile(mongo):
+    cv_id = _insert_cv(mongo)
+
+    before, updated, after = _run(
+        get_cv_profile_for_user(cv_id, "user-1"),
+        update_cv_for_user(cv_id, "user-1", {"skills": ["Python", "Go"]}),
+        get_cv_profile_for_user(cv_id, "user-1"),
+    )
+
+    assert before["skills"] == ["Python"]
+    assert updated is True
+    assert after["skills"] == ["Python", "Go"]
+
+
+def test_update_of_another_users_cv_changes_nothing(mongo):
+    cv_id = _insert_cv(mongo)
+
+    updated, profile = _run(
+        update_cv_for_user(cv_id, "user-2", {"skills": []}),
+        get_cv_profile_for_user(cv_id, "user-1"),
+    )
+
+    assert updated is False
+    assert profile["skills"] == ["Python"]
+
+
+def test_delete_invalidates_the_cached_profile(mongo):
+    cv_id = _insert_cv(mongo)
+
+    cached, deleted, after = _run(
+        get_cv_profile_for_user(cv_id, "user-1"),
+        delete_cv_for_user(cv_id, "user-1"),
+        get_cv_profile_for_user(cv_id, "user-1"),
+    )
+
+    assert cached is not None
+    assert deleted is True
+    assert after is None
+
+
+def test_delete_only_removes_the_users_own_cv(mongo):
+    cv_id = _insert_cv(mongo)
+
+    deleted, invalid, profile = _run(
+        delete_cv_for_user(cv_id, "user-2"),
+        delete_cv_for_user("not-an-id", "user-1"),
+        get_cv_profile_for_user(cv_id, "user-1"),
+    )
+
+    assert (deleted, invalid) == (False, False)
+    assert profile["skills"] == ["Python"]
+
+
+def test_insert_drops_a_cached_miss(mongo):
+    async def _insert_and_read():
+        cv_id = await insert_cv({"parsed_text": "Go developer", "skills": ["Go"]}, user_id="user-1")
+        return cv_id, await get_cv_profile_for_user(cv_id, "user-1")
+
+    cv_id, profile = asyncio.run(_insert_and_read())
+
+    assert profile["id"] == cv_id and profile["skills"] == ["Go"]
+
+
+def test_delete_route(mongo):
+    cv_id = _insert_cv(mongo)
+
+    async def _delete_twice():
+        response = await cv_routes.delete_cv(cv_id, "user-1")
+        with pytest.raises(HTTPException) as e:
+            await cv_routes.delete_cv(cv_id, "user-1")
+        return response, e.value
+
+    response, error = asyncio.run(_delete_twice())
+
+    assert response.status_code == 204
+    assert error.status_code == 404
+    assert asyncio.run(mongo["cvs"].count_documents({})) == 0
@@ -0,0 +1,147 @@
+# tests/test_cv_upload.py
+import asyncio
+import io
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException, UploadFile
+from pymongo.errors import DuplicateKeyError
+from starlette.datastructures import Headers
+
+fitz = pytest.importorskip("fitz")
+
+from app.api import cv_routes
+from app.core import metrics
+from app.core.executors import shutdown_pools
+from app.services.cv_repository import get_cv_profile_for_user
+from app.services.skill_taxonomy import get_taxonomy
+
+CV_TEXT = "Jane Doe\nSkills: Python, Docker, FastAPI\nExperience\nBackend Engineer at Acme 2019-2024"
+
+
+def _pdf(text=CV_TEXT) -> bytes:
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    return doc.tobytes()
+
+
+def _upload_file(data: bytes) -> UploadFile:
+    return UploadFile(
+        file=io.BytesIO(data),
+        filename="cv.pdf",
+        size=len(data),
+        headers=Headers({"content-type": "application/pdf"}),
+    )
+
+
+@pytest.fixture(autouse=True)
+def _pools():
+    yield
+    shutdown_pools()
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    calls = []
+    parse = cv_routes.parse_pdf_parallel
+
+    async def counting_parse(file_bytes):
+        calls.append(len(file_bytes))
+        return await parse(file_bytes)
+
+    monkeypatch.setattr(cv_routes, "parse_pdf_parallel", counting_parse)
+    return calls
+
+
+def _upload(user_id, *datas):
+    async def _all():
+        return [await cv_routes.upload_cv(_upload_file(data), user_id) for data in datas]
+
+    return asyncio.run(_all())
+
+
+def test_dedup_miss_then_hit(mongo, parses):
+    data = _pdf()
+    hits, misses = metrics.get("cv_upload_dedup_hits"), metrics.get("cv_upload_dedup_misses")
+
+    first, second = _upload("user-1", data, data)
+
+    assert (first["cached"], second["cached"]) == (False, True)
+    assert second["cv_id"] == first["cv_id"]
+    assert second["skills"] == first["skills"] == ["python", "docker", "fastapi"]
+    assert second["experience"] == first["experience"]
+    assert len(parses) == 1
+    assert (metrics.get("cv_upload_dedup_hits") - hits, metrics.get("cv_upload_dedup_misses") - misses) == (1, 1)
+    assert asyncio.run(mongo["cvs"].count_documents({"user_id": "user-1"})) == 1
+
+
+def test_dedup_is_per_user_and_per_file(mongo, parses):
+    data = _pdf()
+
+    [mine] = _upload("user-1", data)
+    [theirs] = _upload("user-2", data)
+    [other_file] = _upload("user-1", _pdf(CV_TEXT + "\nGo"))
+
+    assert not theirs["cached"] and not other_file["cached"]
+    assert len({mine["cv_id"], theirs["cv_id"], other_file["cv_id"]}) == 3
+    assert len(parses) == 3
+
+
+def test_concurrent_duplicate_returns_the_stored_upload(mongo, monkeypatch):
+    insert_cv = cv_routes.insert_cv
+    winner = []
+
+    async def racing_insert(cv_doc, user_id):
+        # the other request's insert lands first; the unique index rejects this one
+        winner.append(await insert_cv(dict(cv_doc), user_id=user_id))
+        raise DuplicateKeyError("E11000 duplicate key error (user_id, content_hash)")
+
+    monkeypatch.setattr(cv_routes, "insert_cv", racing_insert)
+
+    [result] = _upload("user-1", _pdf())
+
+    assert result["cached"] is True
+    assert result["cv_id"] == winner[0]
+    assert result["skills"] == ["python", "docker", "fastapi"]
+
+
+def test_concurrent_duplicate_that_vanished_is_a_500(mongo, monkeypatch):
+    async def failing_insert(cv_doc, user_id):
+        raise DuplicateKeyError("E11000 duplicate key error")
+
+    monkeypatch.setattr(cv_routes, "insert_cv", failing_insert)
+
+    with pytest.raises(HTTPException) as e:
+        _upload("user-1", _pdf())
+    assert e.value.status_code == 500
+
+
+def test_a_hit_re_derives_skills_that_predate_the_taxonomy(mongo, parses):
+    data = _pdf()
+    [first] = _upload("user-1", data)
+    # stored under an older taxonomy, which did not know FastAPI
+    asyncio.run(mongo["cvs"].update_one(
+        {"_id": ObjectId(first["cv_id"])},
+        {"$set": {"skills": ["Python", "Docker"], "skill_ids": ["docker", "python"], "skills_version": "old"}},
+    ))
+    refreshes = metrics.get("cv_upload_dedup_skill_refreshes")
+
+    async def _hit_then_profile():
+        stale_profile = await get_cv_profile_for_user(first["cv_id"], "user-1")
+        hit = await cv_routes.upload_cv(_upload_file(data), "user-1")
+        return stale_profile, hit, await get_cv_profile_for_user(first["cv_id"], "user-1")
+
+    stale_profile, hit, profile = asyncio.run(_hit_then_profile())
+
+    assert stale_profile["skills_version"] == "old"
+    assert hit["cached"] is True
+    assert hit["skills"] == ["python", "docker", "fastapi"]
+    assert len(parses) == 1  # re-derived from the stored text, not re-parsed
+    assert metrics.get("cv_upload_dedup_skill_refreshes") - refreshes == 1
+    # written back, and the cached profile was invalidated
+    assert profile["skills_version"] == get_taxonomy().version
+    assert profile["skill_ids"] == ["docker", "fastapi", "python"]
+
+    # the next hit finds current skills: nothing to re-derive
+    _upload("user-1", data)
+    assert metrics.get("cv_upload_dedup_skill_refreshes") - refreshes == 1
@@ -0,0 +1,186 @@
+# tests/test_cv_vectors.py
+import asyncio
+import random
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.api import admin_routes
+from app.services import cv_vectors, scoring_backends
+from app.services.cv_parser import cv_skill_fields
+from app.services.cv_repository import clear_cv_cache, get_cv_profile_for_user
+from app.services.skill_taxonomy import get_taxonomy
+from app.services.tfidf_model import TfidfModelStore
+
+_WORDS = "Python FastAPI Docker PostgreSQL React TypeScript Spark Airflow SQL pipelines APIs".split()
+
+
+def _text(seed, words=40):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+@pytest.fixture
+def model(tmp_path, monkeypatch):
+    store = TfidfModelStore(str(tmp_path / "tfidf_model.pkl"))
+    store.fit([_text(i) for i in range(50)])
+    for module in (scoring_backends, cv_vectors, admin_routes):
+        monkeypatch.setattr(module, "tfidf_store", store)
+    clear_cv_cache()
+    yield store.current
+    clear_cv_cache()
+
+
+def _insert_cv(mongo, seed, vector="current", skills="current", text=True, user_id="user-1"):
+    parsed_text = _text(seed)
+    doc = {"_id": ObjectId(), "user_id": user_id, "created_at": datetime.utcnow(), **cv_skill_fields(parsed_text)}
+    if text:
+        doc["parsed_text"] = parsed_text
+    if vector == "current":
+        doc["vector"] = cv_vectors.compute_cv_vector(parsed_text)
+    elif vector == "stale":
+        doc["vector"] = {**cv_vectors.compute_cv_vector(parsed_text), "version": "tfidf-old"}
+    if skills == "stale":
+        doc.update(skills=["Python"], skill_ids=["python"], skills_version="old")
+    asyncio.run(mongo["cvs"].insert_one(doc))
+    return str(doc["_id"])
+
+
+def _stored(mongo):
+    docs = asyncio.run(mongo["cvs"].find({}, {"vector": 1, "skills_version": 1, "skill_ids": 1}).to_list(None))
+    return {str(d["_id"]): d for d in docs}
+
+
+def _seed_mixed(mongo):
+    return {
+        "current": _insert_cv(mongo, 1),
+        "stale_vector": _insert_cv(mongo, 2, vector="stale"),
+        "missing_vector": _insert_cv(mongo, 3, vector=None),
+        "stale_skills": _insert_cv(mongo, 4, skills="stale"),
+        "no_text": _insert_cv(mongo, 5, vector=None, text=False),
+    }
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 200])
+def test_backfill_recomputes_only_what_is_stale(mongo, model, batch_size):
+    ids = _seed_mixed(mongo)
+    before = _stored(mongo)
+
+    result = asyncio.run(cv_vectors.backfill_cv_vectors(batch_size=batch_size))
+
+    assert result == {"updated": 3, "skipped": 1}
+    stored = _stored(mongo)
+    for name in ("current", "stale_vector", "missing_vector", "stale_skills"):
+        assert stored[ids[name]]["vector"]["version"] == model.version
+        assert stored[ids[name]]["skills_version"] == get_taxonomy().version
+    assert stored[ids["current"]] == before[ids["current"]]
+    assert set(stored[ids["stale_skills"]]["skill_ids"]) > {"python"}
+    assert "vector" not in stored[ids["no_text"]]
+
+    # nothing left to do
+    assert asyncio.run(cv_vectors.backfill_cv_vectors(batch_size=batch_size)) == {"updated": 0, "skipped": 1}
+
+
+def test_forced_backfill_rewrites_every_cv_with_text(mongo, model):
+    _seed_mixed(mongo)
+
+    assert asyncio.run(cv_vectors.backfill_cv_vectors(force=True)) == {"updated": 4, "skipped": 1}
+
+
+def test_backfill_drops_cached_profiles(mongo, model):
+    cv_id = _insert_cv(mongo, 1, vector="stale")
+
+    async def _cache_backfill_read():
+        cached = await get_cv_profile_for_user(cv_id, "user-1")
+        await cv_vectors.backfill_cv_vectors()
+        return cached, await get_cv_profile_for_user(cv_id, "user-1")
+
+    cached, after = asyncio.run(_cache_backfill_read())
+
+    assert cached["vector"]["version"] == "tfidf-old"
+    assert after["vector"]["version"] == model.version
+
+
+def test_backfill_without_a_model(mongo, tmp_path, monkeypatch):
+    store = TfidfModelStore(str(tmp_path / "missing.pkl"))
+    monkeypatch.setattr(cv_vectors, "tfidf_store", store)
+    monkeypatch.setattr(admin_routes, "tfidf_store", store)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cv_vectors.backfill_cv_vectors())
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(admin_routes.backfill_vectors(force=False, _="admin"))
+    assert e.value.status_code == 409
+
+
+def test_backfill_endpoint(mongo, model):
+    _seed_mixed(mongo)
+
+    assert asyncio.run(admin_routes.backfill_vectors(force=False, _="admin")) == {"updated": 3, "skipped": 1}
+    assert asyncio.run(admin_routes.backfill_vectors(force=True, _="admin")) == {"updated": 4, "skipped": 1}
+
+
+def test_backfill_command(mongo, model, monkeypatch, capsys):
+    ids = _seed_mixed(mongo)
+    # a fresh process: the command loads the model from disk
+    model_path = cv_vectors.tfidf_store.path
+    monkeypatch.setattr(cv_vectors, "tfidf_store", TfidfModelStore(model_path))
+
+    asyncio.run(cv_vectors._main([]))
+
+    assert f"CV vectors ({model.version}): {{'updated': 3, 'skipped': 1}}" in capsys.readouterr().out
+    assert _stored(mongo)[ids["missing_vector"]]["vector"]["version"] == model.version
+
+    monkeypatch.setattr(cv_vectors, "tfidf_store", TfidfModelStore(model_path + ".missing"))
+    with pytest.raises(SystemExit) as e:
+        asyncio.run(cv_vectors._main(["--force"]))
+    assert e.value.code == 1
+
+
+def test_matching_recomputes_a_stale_vector_once(mongo, model, monkeypatch):
+    fresh = _insert_cv(mongo, 1)
+    stale = _insert_cv(mongo, 2, vector="stale", skills="stale")
+
+    text_loads = []
+    get_cv = cv_vectors.get_cv_by_id_for_user
+
+    async def recording_get_cv(cv_id, user_id, projection=None):
+        text_loads.append(cv_id)
+        return await get_cv(cv_id, user_id, projection)
+
+    monkeypatch.setattr(cv_vectors, "get_cv_by_id_for_user", recording_get_cv)
+
+    async def _load_all():
+        return [await cv_vectors.load_cv_for_matching(cv_id, "user-1") for cv_id in (fresh, stale, stale)]
+
+    fresh_doc, recomputed, again = asyncio.run(_load_all())
+
+    # text is only read for the stale CV, and only the first time
+    assert text_loads == [stale]
+    assert "parsed_text" not in fresh_doc and "parsed_text" not in again
+    assert recomputed["vector"]["version"] == again["vector"]["version"] == model.version
+    assert recomputed["skills_version"] == get_taxonomy().version
+    stored = _stored(mongo)[stale]
+    assert stored["vector"] == recomputed["vector"]
+    assert stored["skills_version"] == get_taxonomy().version
+
+
+def test_matching_with_a_text_backend_keeps_stored_vectors(mongo, model, monkeypatch):
+    cv_id = _insert_cv(mongo, 1)
+    monkeypatch.setattr(cv_vectors, "get_scoring_backend", lambda: scoring_backends.Bm25Backend())
+    before = _stored(mongo)[cv_id]
+
+    doc = asyncio.run(cv_vectors.load_cv_for_matching(cv_id, "user-1"))
+
+    # the backend scores text, so the text is loaded; the current vector is left alone
+    assert doc["parsed_text"]
+    assert _stored(mongo)[cv_id] == before
+
+
+def test_matching_another_users_cv(mongo, model):
+    cv_id = _insert_cv(mongo, 1, vector="stale")
+
+    assert asyncio.run(cv_vectors.load_cv_for_matching(cv_id, "user-2")) is None
+    assert _stored(mongo)[cv_id]["vector"]["version"] == "tfidf-old"
@@ -0,0 +1,60 @@
+# tests/test_executors.py
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.executors import BoundedPool
+
+
+def test_rejects_beyond_workers_plus_queue():
+    pool = BoundedPool("test", kind="thread", workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.ensure_future(pool.run(release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as exc:
+            await pool.run(release.wait, 5)
+        assert exc.value.status_code == 503
+
+        release.set()
+        assert await asyncio.gather(*running) == [True, True]
+        assert pool.in_flight == 0
+
+    asyncio.run(scenario())
+    pool.shutdown()
+
+
+def test_cancelled_caller_keeps_slot_until_job_finishes():
+    pool = BoundedPool("test", kind="thread", workers=1, max_queue=0)
+    started = threading.Event()
+    release = threading.Event()
+
+    def job():
+        started.set()
+        release.wait(5)
+
+    async def scenario():
+        task = asyncio.ensure_future(pool.run(job))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+
+        # e.g. the client disconnected: the job is still running on the worker
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert pool.in_flight == 1
+        with pytest.raises(HTTPException):
+            await pool.run(job)
+
+        release.set()
+        for _ in range(100):
+            if pool.in_flight == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert pool.in_flight == 0
+
+    asyncio.run(scenario())
+    pool.shutdown()
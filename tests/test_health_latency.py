@@ -0,0 +1,120 @@
+# tests/test_health_latency.py
+"""
+/health stays responsive while /jobs/match requests with large job
+descriptions keep the scoring pool busy: skill extraction and scoring must
+never run on the event loop.
+
+The pool threads still contend for the GIL, which shows up as short spikes
+on some probes; a scan running on the loop instead holds every probe that
+arrives during it for the whole scan, so the budget is on the median.
+
+    HEALTH_MEDIAN_BUDGET_MS=100 python -m pytest tests/test_health_latency.py -s
+"""
+import asyncio
+import itertools
+import json
+import os
+import random
+import statistics
+import threading
+import time
+from datetime import datetime
+
+import httpx
+from bson import ObjectId
+from fastapi import FastAPI
+
+from app.api.job_routes import router as job_router
+from app.core.auth import get_current_user_id
+
+# a match blocking the loop would hold /health for its whole skill scan (~250ms here)
+HEALTH_MEDIAN_BUDGET_MS = float(os.getenv("HEALTH_MEDIAN_BUDGET_MS", "150"))
+LOAD_SECONDS = float(os.getenv("HEALTH_LOAD_SECONDS", "3"))
+LOAD_CLIENTS = 2
+DESCRIPTION_WORDS = 50000
+
+_WORDS = (
+    "python django fastapi postgres redis kubernetes docker react typescript aws terraform "
+    "team experience work years company role responsible strong communication"
+).split()
+
+
+def _app():
+    from main import health_check
+
+    app = FastAPI()
+    app.get("/health")(health_check)
+    app.include_router(job_router)
+    app.dependency_overrides[get_current_user_id] = lambda: "user-1"
+    return app
+
+
+def _match_bodies(cv_id, count):
+    # built up front, so the load clients don't compete with the server for the GIL
+    rng = random.Random(7)
+    return [
+        json.dumps({
+            "cv_id": str(cv_id),
+            "job_title": "Backend Engineer",
+            "company": "Acme",
+            "job_description": " ".join(rng.choice(_WORDS) for _ in range(DESCRIPTION_WORDS)),
+        }).encode("utf-8")
+        for _ in range(count)
+    ]
+
+
+def test_health_latency_under_match_load(serve, mongo):
+    cv_id = ObjectId()
+    asyncio.run(mongo["cvs"].insert_one({
+        "_id": cv_id,
+        "user_id": "user-1",
+        "parsed_text": "Python developer building FastAPI services on Postgres and Docker",
+        "skills": ["Python", "FastAPI", "PostgreSQL", "Docker"],
+        "created_at": datetime.utcnow(),
+    }))
+    warmup, *bodies = _match_bodies(cv_id, 41)
+    # different descriptions: every request is scored, none is a match cache hit
+    next_body = itertools.cycle(bodies).__next__
+    headers = {"Content-Type": "application/json"}
+    base = serve(_app())
+
+    # the first match pays for the scikit-learn import and the model load
+    with httpx.Client(base_url=base, timeout=60) as client:
+        assert client.post("/jobs/match", content=warmup, headers=headers).status_code == 200
+
+    stop = threading.Event()
+    statuses = []
+
+    def load():
+        with httpx.Client(base_url=base, timeout=60) as client:
+            while not stop.is_set():
+                statuses.append(client.post("/jobs/match", content=next_body(), headers=headers).status_code)
+
+    threads = [threading.Thread(target=load, daemon=True) for _ in range(LOAD_CLIENTS)]
+    for thread in threads:
+        thread.start()
+
+    latencies = []
+    with httpx.Client(base_url=base, timeout=30) as client:
+        deadline = time.monotonic() + LOAD_SECONDS
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            assert client.get("/health").status_code == 200
+            latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.02)
+
+    stop.set()
+    for thread in threads:
+        thread.join(timeout=60)
+
+    median = statistics.median(latencies)
+    p95 = statistics.quantiles(latencies, n=20)[-1]
+    print(f"\n/health under load: {len(latencies)} probes, median {median:.1f}ms, "
+          f"p95 {p95:.1f}ms, max {max(latencies):.1f}ms; {statuses.count(200)} matches served")
+
+    # the pool may shed load with 503, but matches did run alongside the probes
+    assert statuses.count(200) >= LOAD_CLIENTS
+    assert set(statuses) <= {200, 503}
+    assert median <= HEALTH_MEDIAN_BUDGET_MS, (
+        f"/health median {median:.0f}ms under load (budget {HEALTH_MEDIAN_BUDGET_MS:.0f}ms)"
+    )
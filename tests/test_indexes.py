@@ -0,0 +1,124 @@
+# tests/test_indexes.py
+import asyncio
+
+import pytest
+from pymongo import ASCENDING, IndexModel
+
+from app.core import indexes
+
+
+def test_ensure_indexes_is_idempotent(mongo):
+    asyncio.run(indexes.ensure_indexes())
+    asyncio.run(indexes.ensure_indexes())
+
+    info = asyncio.run(mongo["tasks"].index_information())
+    assert info["finished_at_ttl"]["expireAfterSeconds"] == indexes.TASK_RESULT_TTL
+    assert "jobs" not in indexes.INDEXES
+
+
+def test_changed_ttl_is_applied_with_collmod(mongo, monkeypatch):
+    collection = mongo["cover_letter_cache"]
+    asyncio.run(collection.create_indexes(
+        [IndexModel([("created_at", ASCENDING)], name="created_at_ttl", expireAfterSeconds=60)]
+    ))
+
+    calls = []
+
+    async def coll_mod(self, command, name, index):
+        # mongomock has no collMod: emulate it by recreating the index
+        calls.append((command, name, index))
+        await self[name].drop_index(index["name"])
+        await self[name].create_indexes(
+            [IndexModel([("created_at", ASCENDING)], name=index["name"], expireAfterSeconds=index["expireAfterSeconds"])]
+        )
+
+    monkeypatch.setattr(type(mongo), "command", coll_mod)
+    asyncio.run(indexes.ensure_indexes())
+
+    ttl = indexes.COVER_LETTER_CACHE_TTL
+    assert calls == [("collMod", "cover_letter_cache", {"name": "created_at_ttl", "expireAfterSeconds": ttl})]
+    info = asyncio.run(collection.index_information())
+    assert info["created_at_ttl"]["expireAfterSeconds"] == ttl
+
+
+def _usable_fields(spec):
+    # fields an index can bound ($exists scans the whole index: treat it as unbounded)
+    return {
+        field for field, value in spec.items()
+        if not field.startswith("$") and not (isinstance(value, dict) and "$exists" in value)
+    }
+
+
+def _index_scan(index_info, spec, sort):
+    fields = _usable_fields(spec)
+    for name, info in index_info.items():
+        partial = info.get("partialFilterExpression") or {}
+        if not set(partial) <= fields:
+            continue  # the query doesn't imply the partial filter
+        first = list(info["key"])[0][0]
+        if first in fields or (sort and sort[0][0] == first):
+            return {"stage": "IXSCAN", "indexName": name}
+    return None
+
+
+def _plan(index_info, spec, sort):
+    """
+    A small stand-in for the query planner (mongomock has no explain()):
+    an IXSCAN if an index can bound the filter or serve the sort, an OR of
+    IXSCANs if every $or branch can use one, a COLLSCAN otherwise.
+    """
+    scan = _index_scan(index_info, spec, sort)
+    if scan is None and "$or" in spec:
+        rest = {k: v for k, v in spec.items() if k != "$or"}
+        branches = [_index_scan(index_info, {**rest, **branch}, []) for branch in spec["$or"]]
+        if all(branches):
+            scan = {"stage": "OR", "inputStages": branches}
+    return {"stage": "FETCH", "inputStage": scan} if scan else {"stage": "COLLSCAN"}
+
+
+@pytest.fixture
+def explain(mongo, monkeypatch):
+    async def _explain(self):
+        cursor = self._AsyncCursor__cursor
+        # every collection has the _id index, even when mongomock doesn't list it
+        index_info = {"_id_": {"key": [("_id", 1)]}, **cursor.collection.index_information()}
+        plan = _plan(index_info, cursor._spec, cursor._sort or [])
+        return {"queryPlanner": {"winningPlan": plan}}
+
+    monkeypatch.setattr(type(mongo["any"].find()), "explain", _explain, raising=False)
+
+
+def test_every_repository_query_uses_an_index(mongo, explain, capsys):
+    asyncio.run(indexes.ensure_indexes())
+
+    assert asyncio.run(indexes.verify_query_plans()) == []
+    assert "COLLSCAN" not in capsys.readouterr().out
+
+
+def test_a_missing_index_is_reported(mongo, explain):
+    asyncio.run(indexes.ensure_indexes())
+    asyncio.run(mongo["job_postings"].drop_index("created_at"))
+    asyncio.run(mongo["cover_letters"].drop_index("user_job_created_at_id"))
+
+    assert asyncio.run(indexes.verify_query_plans()) == [
+        "tfidf_model.load_corpus (job_postings)",
+        "cover_letter_repository.get_latest_cover_letter_by_job_id",
+        "cover_letter_repository.get_cover_letter_history_by_job_id",
+    ]
+
+
+def test_verify_command_exits_on_a_collection_scan(mongo, explain, monkeypatch):
+    asyncio.run(indexes._main(["--verify"]))
+
+    monkeypatch.setitem(indexes.INDEXES, "tasks", [])
+    asyncio.run(mongo["tasks"].drop_indexes())
+    with pytest.raises(SystemExit) as e:
+        asyncio.run(indexes._main(["--verify"]))
+    assert e.value.code == 1
+
+
+def test_queries_cover_indexed_collections():
+    assert {collection for _, collection, _, _ in indexes.QUERIES} <= set(indexes.INDEXES)
+    # keyset entries are built with the pagination builder, so they follow its $or
+    after = [q for name, _, q, _ in indexes.QUERIES if "cursor" in name]
+    assert len(after) == 2 and all("$or" in q for q in after)
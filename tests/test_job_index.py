@@ -0,0 +1,171 @@
+# tests/test_job_index.py
+import asyncio
+import os
+import random
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.services import job_index as job_index_module
+from app.services.job_index import JobIndex, rebuild_job_index
+from app.services.job_posting_repository import posting_id_for
+from app.services.tfidf_model import TfidfModelStore
+
+_TOPICS = {
+    "backend": "python django fastapi postgres redis api microservices kafka docker",
+    "frontend": "react typescript javascript css html redux webpack accessibility components",
+    "data": "spark airflow sql warehouse pipelines pandas dbt etl analytics",
+}
+
+
+def _doc(topic, seed):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(_TOPICS[topic].split()) for _ in range(60))
+
+
+@pytest.fixture
+def model(tmp_path, monkeypatch):
+    store = TfidfModelStore(str(tmp_path / "tfidf_model.pkl"))
+    store.fit([_doc(topic, i) for topic in _TOPICS for i in range(30)])
+    monkeypatch.setattr(job_index_module, "tfidf_store", store)
+    return store.current
+
+
+@pytest.fixture
+def index(tmp_path, model, monkeypatch):
+    idx = JobIndex(str(tmp_path / "job_index"), dim=64)
+    monkeypatch.setattr(job_index_module, "job_index", idx)
+    build = str(tmp_path / "job_index.build")
+    idx.write_build(build, len(model.vectorizer.vocabulary_))
+    idx.swap_in(build, model)
+    idx.refresh()
+    return idx
+
+
+def _search(idx, user_id, text, k=10):
+    # like a request: pick up appended rows first (_search_ready)
+    idx.refresh()
+    return idx.search(user_id, idx.embed([text])[0], k)
+
+
+def test_search_ranks_by_similarity_and_is_scoped_per_user(index):
+    index.add("user-1", [
+        {"description": _doc("backend", 1), "job_title": "Backend", "match_id": "m1"},
+        {"description": _doc("frontend", 2), "job_title": "Frontend", "match_id": "m2"},
+    ])
+    index.add("user-2", [{"description": _doc("backend", 3), "job_title": "Other user's backend", "match_id": "m3"}])
+
+    results = _search(index, "user-1", _doc("backend", 99))
+    assert [r["job_title"] for r in results] == ["Backend", "Frontend"]
+    assert results[0]["similarity"] > results[1]["similarity"]
+    assert [r["match_id"] for r in _search(index, "user-2", _doc("backend", 99))] == ["m3"]
+    assert _search(index, "user-3", _doc("backend", 99)) == []
+
+
+def test_add_supersedes_the_same_posting_and_keeps_its_refs(index):
+    description = _doc("data", 1)
+    index.add("user-1", [{"description": description, "job_title": "Data", "match_id": "m1"}])
+    index.add("user-1", [{"description": description, "tracked_job_id": "t1"}])
+
+    [result] = _search(index, "user-1", description)
+    assert (result["match_id"], result["tracked_job_id"], result["job_title"]) == ("m1", "t1", "Data")
+    assert result["job_posting_id"] == posting_id_for(description)
+    assert index.posting_for_ref("user-1", "m1") == index.posting_for_ref("user-1", "t1")
+    assert index.stats()["rows"] == 2 and index.stats()["live_rows"] == 1
+
+
+def test_remove_tracked_job(index):
+    kept, gone = _doc("backend", 1), _doc("frontend", 2)
+    index.add("user-1", [
+        {"description": kept, "match_id": "m1", "tracked_job_id": "t1"},
+        {"description": gone, "tracked_job_id": "t2"},
+    ])
+
+    assert index.remove_tracked_job("user-1", "t1") == 1
+    assert index.remove_tracked_job("user-1", "t2") == 1
+    assert index.remove_tracked_job("user-1", "t2") == 0
+    assert index.remove_tracked_job("user-2", "t1") == 0
+
+    # the posting still referenced by match history stays, without the tracked job
+    results = _search(index, "user-1", kept)
+    assert [(r["match_id"], r.get("tracked_job_id")) for r in results] == [("m1", None)]
+    assert index.posting_for_ref("user-1", "t1") is None
+    assert index.posting_for_ref("user-1", "t2") is None
+
+    # another process sees the same state from the files
+    other = JobIndex(index.directory, dim=64)
+    other.refresh()
+    assert [r["match_id"] for r in _search(other, "user-1", gone)] == ["m1"]
+
+
+def test_compact_keeps_only_live_rows(index):
+    for i in range(3):
+        index.add("user-1", [{"description": _doc("backend", 1), "match_id": f"m{i}"}])
+    index.add("user-1", [{"description": _doc("data", 2), "tracked_job_id": "t1"}])
+    index.add("user-2", [{"description": _doc("frontend", 3), "match_id": "x1"}])
+    index.remove_tracked_job("user-1", "t1")
+    before = _search(index, "user-1", _doc("backend", 5))
+
+    assert index.compact() == {"rows": 2, "dropped": 4}
+    assert _search(index, "user-1", _doc("backend", 5)) == before
+    assert [r["match_id"] for r in _search(index, "user-2", _doc("frontend", 5))] == ["x1"]
+
+    other = JobIndex(index.directory, dim=64)
+    other.refresh()
+    assert other.stats()["rows"] == other.stats()["live_rows"] == 2
+    assert not [p for p in os.listdir(os.path.dirname(index.directory)) if ".old-" in p or ".compact-" in p]
+
+
+def test_swap_in_replaces_the_live_index(index, model, tmp_path):
+    index.add("user-1", [{"description": _doc("backend", 1), "match_id": "m1"}])
+    reader = JobIndex(index.directory, dim=64)
+    reader.refresh()
+
+    build = str(tmp_path / "job_index.build2")
+    projection = index.write_build(build, len(model.vectorizer.vocabulary_))
+    vectors = index.project(model.vectorizer.transform([_doc("data", 2)]), projection)
+    index._append(build, vectors, [{"user_id": "user-1", "posting_id": "p-data", "match_id": "m2"}])
+    index.swap_in(build, model)
+
+    assert reader.refresh()
+    assert [r["match_id"] for r in _search(reader, "user-1", _doc("backend", 1))] == ["m2"]
+    assert reader.meta["model_version"] == model.version
+    assert not os.path.exists(build)
+
+
+def test_rebuild_from_mongo(index, mongo):
+    now = datetime.utcnow()
+    postings = {topic: _doc(topic, i) for i, topic in enumerate(_TOPICS)}
+
+    async def _seed():
+        await mongo["job_postings"].insert_many(
+            [{"_id": posting_id_for(text), "description": text, "created_at": now} for text in postings.values()]
+        )
+        match_id = ObjectId()
+        await mongo["job_matches"].insert_many([
+            {"_id": match_id, "user_id": "user-1", "job_posting_id": posting_id_for(postings["backend"]),
+             "job_title": "Backend", "created_at": now},
+            {"user_id": "user-2", "job_posting_id": posting_id_for(postings["frontend"]),
+             "job_title": "Frontend", "created_at": now},
+            # legacy document with inline text
+            {"user_id": "user-1", "job_description": postings["data"], "job_title": "Data", "created_at": now},
+        ])
+        tracked = await mongo["tracked_jobs"].insert_one(
+            {"user_id": "user-1", "job_posting_id": posting_id_for(postings["backend"]), "job_title": "Backend",
+             "job_match_id": str(match_id), "created_at": now}
+        )
+        return str(match_id), str(tracked.inserted_id)
+
+    match_id, tracked_id = asyncio.run(_seed())
+    assert index.needs_rebuild() is False  # built for the current model by the fixture
+
+    result = asyncio.run(rebuild_job_index())
+
+    assert result["rows"] == 3
+    index.refresh()
+    backend = _search(index, "user-1", postings["backend"])
+    assert [r["job_title"] for r in backend] == ["Backend", "Data"]
+    assert (backend[0]["match_id"], backend[0]["tracked_job_id"]) == (match_id, tracked_id)
+    assert [r["job_title"] for r in _search(index, "user-2", postings["backend"])] == ["Frontend"]
+    assert asyncio.run(rebuild_job_index(only_if_stale=True)) is None
@@ -0,0 +1,71 @@
+# tests/test_job_postings.py
+"""
+Storage benchmark on a synthetic dataset: inline job descriptions (as written
+before job_postings existed) vs the same data after migrate_inline_descriptions.
+
+    python -m pytest tests/test_job_postings.py -s   # prints the size report
+"""
+import asyncio
+import random
+from datetime import datetime
+
+import bson
+
+from app.services.job_posting_repository import attach_job_descriptions, migrate_inline_descriptions
+
+COLLECTIONS = ("job_matches", "tracked_jobs", "job_postings")
+_WORDS = "python fastapi react docker kubernetes aws team product customers scale data api design".split()
+
+
+def _synthetic_dataset(users=20, postings=150, matches_per_user=40, seed=7):
+    rng = random.Random(seed)
+    descriptions = [" ".join(rng.choice(_WORDS) for _ in range(rng.randint(300, 900))) for _ in range(postings)]
+    matches, tracked = [], []
+    for u in range(users):
+        for m in range(matches_per_user):
+            p = rng.randrange(postings)
+            common = {
+                "user_id": f"user-{u}", "cv_id": f"cv-{u}", "job_title": f"Engineer {p}", "company": f"Company {p}",
+                "job_description": descriptions[p], "match_score": rng.randint(0, 100), "created_at": datetime.utcnow(),
+            }
+            matches.append({**common, "semantic_score": rng.random(), "skill_score": rng.random(),
+                            "job_skills": ["Python", "Docker"], "overlapping_skills": ["Python"], "missing_skills": ["Docker"]})
+            tracked.append({**common, "status": "saved", "source": "manual", "job_url": None})
+    return matches, tracked
+
+
+async def _sizes(db):
+    sizes = {}
+    for name in COLLECTIONS:
+        total = 0
+        async for doc in db[name].find({}):
+            total += len(bson.encode(doc))
+        sizes[name] = total
+    return sizes
+
+
+def test_job_postings_store_each_description_once(mongo):
+    matches, tracked = _synthetic_dataset()
+
+    async def _run():
+        await mongo["job_matches"].insert_many(matches)
+        await mongo["tracked_jobs"].insert_many(tracked)
+        before = await _sizes(mongo)
+        migrated = await migrate_inline_descriptions()
+        after = await _sizes(mongo)
+        sample = await mongo["tracked_jobs"].find({}).to_list(length=None)
+        return before, migrated, after, await attach_job_descriptions(sample)
+
+    before, migrated, after, resolved = asyncio.run(_run())
+
+    print(f"\n{'collection':14} {'before':>12} {'after':>12}")
+    for name in COLLECTIONS:
+        print(f"{name:14} {before[name]:>12} {after[name]:>12}")
+    print(f"{'total':14} {sum(before.values()):>12} {sum(after.values()):>12}")
+
+    assert migrated == {"job_matches": len(matches), "tracked_jobs": len(tracked)}
+    assert after["job_postings"] and not before["job_postings"]
+    # 1600 inline copies of 150 postings -> each posting stored once
+    assert sum(after.values()) < sum(before.values()) / 4
+    # nothing is lost: every tracked job still resolves its own description
+    assert [doc["job_description"] for doc in resolved] == [t["job_description"] for t in tracked]
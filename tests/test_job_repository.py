@@ -0,0 +1,99 @@
+# tests/test_job_repository.py
+"""
+Mongo round trips of the match write path, counted on mongomock-motor.
+"""
+import asyncio
+from collections import Counter
+
+import pytest
+
+from app.services import job_repository
+
+_OPERATIONS = (
+    "insert_one", "insert_many", "update_one", "update_many", "find_one", "find",
+    "find_one_and_update", "bulk_write", "delete_one", "count_documents", "aggregate",
+)
+
+
+@pytest.fixture
+def round_trips(mongo, monkeypatch):
+    """
+    Counter of (collection, operation) for every call that reaches the database.
+    """
+    import threading
+
+    import mongomock.collection
+
+    calls = Counter()
+    # mongomock implements some operations with others (find_one_and_update -> find);
+    # only the outermost call is a round trip
+    nested = threading.local()
+    for name in _OPERATIONS:
+        original = getattr(mongomock.collection.Collection, name)
+
+        def _counted(self, *args, _name=name, _original=original, **kwargs):
+            if getattr(nested, "depth", 0) == 0:
+                calls[(self.name, _name)] += 1
+            nested.depth = getattr(nested, "depth", 0) + 1
+            try:
+                return _original(self, *args, **kwargs)
+            finally:
+                nested.depth -= 1
+
+        monkeypatch.setattr(mongomock.collection.Collection, name, _counted)
+    # the similar-jobs index is updated in the background, outside the request
+    monkeypatch.setattr(job_repository, "schedule_job_index_update", lambda *args, **kwargs: None)
+    return calls
+
+
+def _match(i=0):
+    return {"cv_id": "cv-1", "job_title": f"Engineer {i}", "company": "Acme",
+            "job_description": f"Python role {i}", "match_score": 80}
+
+
+def _tracked(i=0):
+    return {**_match(i), "job_url": None, "source": "manual"}
+
+
+def test_match_write_is_one_round_trip_per_collection(round_trips):
+    async def _two_matches():
+        first = await job_repository.save_match_and_track_for_user("user-1", _match(), _tracked())
+        after_insert = Counter(round_trips)
+        round_trips.clear()
+        # re-match of the same job: the tracked job already exists
+        second = await job_repository.save_match_and_track_for_user("user-1", _match(), _tracked())
+        return first, second, after_insert
+
+    (match_1, tracked_1), (match_2, tracked_2), inserted = asyncio.run(_two_matches())
+    expected = Counter({
+        ("job_matches", "insert_one"): 1,
+        ("tracked_jobs", "find_one_and_update"): 1,
+        ("job_postings", "update_one"): 1,
+    })
+
+    assert inserted == expected
+    assert round_trips == expected
+    assert match_1 != match_2
+    assert tracked_1 == tracked_2
+
+
+def test_batch_match_write_round_trips(round_trips):
+    async def _two_batches():
+        matches, tracked = [_match(i) for i in range(20)], [_tracked(i) for i in range(20)]
+        first = await job_repository.save_matches_and_track_for_user("user-1", matches, tracked)
+        after_insert = Counter(round_trips)
+        round_trips.clear()
+        second = await job_repository.save_matches_and_track_for_user("user-1", matches, tracked)
+        return first, second, after_insert
+
+    (_, tracked_1), (_, tracked_2), inserted = asyncio.run(_two_batches())
+    writes = Counter({
+        ("job_matches", "insert_many"): 1,
+        ("tracked_jobs", "bulk_write"): 1,
+        ("job_postings", "bulk_write"): 1,
+    })
+
+    assert inserted == writes
+    # existing tracked jobs: their ids come from one projected find for the whole batch
+    assert round_trips == writes + Counter({("tracked_jobs", "find"): 1})
+    assert tracked_1 == tracked_2 and len(set(tracked_1)) == 20
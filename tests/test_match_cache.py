@@ -0,0 +1,151 @@
+# tests/test_match_cache.py
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+
+from app.api import job_routes
+from app.core import metrics
+from app.schemas.job_match_schema import JobMatchRequest
+from app.services import match_cache, scoring_backends
+from app.services.match_cache import get_cached_match, match_cache_key, put_cached_match
+
+CV = {"content_hash": "abc", "skill_ids": ["docker", "python"]}
+JOB = "Python and Docker services.\nKubernetes a plus."
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache(monkeypatch):
+    match_cache.clear_match_cache()
+    monkeypatch.setattr(match_cache, "_scoring_version", None)
+    yield
+    match_cache.clear_match_cache()
+
+
+def test_key_building():
+    key = match_cache_key("user-1", "cv-1", CV, JOB)
+
+    assert match_cache_key("user-1", "cv-1", dict(CV), JOB) == key
+    # a re-pasted copy of the same posting is the same posting
+    assert match_cache_key("user-1", "cv-1", CV, "  Python and Docker   services. Kubernetes a plus.\n") == key
+    # skills in another order are the same CV content
+    assert match_cache_key("user-1", "cv-1", {**CV, "skill_ids": ["python", "docker"]}, JOB) == key
+
+    assert match_cache_key("user-2", "cv-1", CV, JOB) != key
+    assert match_cache_key("user-1", "cv-2", CV, JOB) != key
+    assert match_cache_key("user-1", "cv-1", {**CV, "content_hash": "def"}, JOB) != key
+    assert match_cache_key("user-1", "cv-1", {**CV, "skill_ids": ["python"]}, JOB) != key
+    assert match_cache_key("user-1", "cv-1", CV, JOB + " Go.") != key
+
+
+def test_hits_are_copies():
+    key = match_cache_key("user-1", "cv-1", CV, JOB)
+    put_cached_match(key, {"match_score": 80.0})
+
+    hit = get_cached_match(key)
+    hit["match_score"] = 0.0
+    assert get_cached_match(key) == {"match_score": 80.0}
+
+
+def _change_taxonomy(monkeypatch):
+    taxonomy = match_cache.get_taxonomy()
+    monkeypatch.setattr(match_cache, "get_taxonomy", lambda: SimpleNamespace(version=taxonomy.version + "-edited"))
+
+
+def _change_model(monkeypatch):
+    backend = match_cache.get_scoring_backend()
+    monkeypatch.setattr(match_cache, "get_scoring_backend", lambda: SimpleNamespace(version=backend.version + "-refit"))
+
+
+def _change_weights(monkeypatch):
+    monkeypatch.setattr(scoring_backends, "SCORING_SEMANTIC_WEIGHT", 0.5)
+    monkeypatch.setattr(scoring_backends, "SCORING_SKILL_WEIGHT", 0.5)
+
+
+@pytest.mark.parametrize("change", [_change_taxonomy, _change_model, _change_weights])
+def test_a_new_scoring_version_drops_older_results(monkeypatch, change):
+    old_key = match_cache_key("user-1", "cv-1", CV, JOB)
+    put_cached_match(old_key, {"match_score": 80.0})
+    assert get_cached_match(old_key) is not None
+
+    change(monkeypatch)
+    new_key = match_cache_key("user-1", "cv-1", CV, JOB)
+
+    assert new_key != old_key
+    assert get_cached_match(new_key) is None
+    # dropped, not just unreachable
+    assert get_cached_match(old_key) is None
+    assert len(match_cache._cache) == 0
+
+
+def _insert_cv(mongo, user_id="user-1"):
+    cv_id = ObjectId()
+    asyncio.run(mongo["cvs"].insert_one({
+        "_id": cv_id,
+        "user_id": user_id,
+        "parsed_text": "Python developer shipping Docker and Kubernetes services",
+        "skills": ["Python", "Docker", "Kubernetes"],
+        "content_hash": "cv-hash",
+        "created_at": datetime.utcnow(),
+    }))
+    return str(cv_id)
+
+
+def _match_twice(cv_id, first_title="Backend Engineer", second_title="Backend Engineer"):
+    async def _both():
+        first = await job_routes.match_job(JobMatchRequest(cv_id=cv_id, job_title=first_title, company="Acme", job_description=JOB), "user-1")
+        second = await job_routes.match_job(JobMatchRequest(cv_id=cv_id, job_title=second_title, company="Acme", job_description=JOB), "user-1")
+        return first, second
+
+    return asyncio.run(_both())
+
+
+def _history(mongo):
+    async def _count():
+        return (
+            await mongo["job_matches"].count_documents({"user_id": "user-1"}),
+            await mongo["tracked_jobs"].count_documents({"user_id": "user-1"}),
+        )
+
+    return asyncio.run(_count())
+
+
+def test_a_repeat_match_is_served_from_the_cache(mongo):
+    cv_id = _insert_cv(mongo)
+    hits = metrics.get("match_cache_hits")
+
+    first, second = _match_twice(cv_id)
+
+    assert metrics.get("match_cache_hits") - hits == 1
+    scores = ("match_score", "semantic_score", "skill_score", "job_skills")
+    assert {k: second[k] for k in scores} == {k: first[k] for k in scores}
+    # duplicate history by default: every match is its own history entry
+    assert second["match_id"] != first["match_id"]
+    assert second["tracked_job_id"] == first["tracked_job_id"]
+    assert _history(mongo) == (2, 1)
+
+
+def test_skip_duplicate_history_reuses_the_saved_match(mongo, monkeypatch):
+    monkeypatch.setattr(job_routes, "MATCH_CACHE_SKIP_DUPLICATE_HISTORY", True)
+    cv_id = _insert_cv(mongo)
+
+    first, second = _match_twice(cv_id)
+
+    assert second["match_id"] == second["id"] == first["match_id"]
+    assert second["tracked_job_id"] == first["tracked_job_id"]
+    assert _history(mongo) == (1, 1)
+
+
+def test_skip_duplicate_history_still_saves_a_retitled_match(mongo, monkeypatch):
+    monkeypatch.setattr(job_routes, "MATCH_CACHE_SKIP_DUPLICATE_HISTORY", True)
+    cv_id = _insert_cv(mongo)
+
+    first, second = _match_twice(cv_id, second_title="Senior Backend Engineer")
+
+    # same scores from the cache, but the history keeps what the user saved
+    assert second["match_score"] == first["match_score"]
+    assert second["match_id"] != first["match_id"]
+    assert second["job_title"] == "Senior Backend Engineer"
+    assert _history(mongo)[0] == 2
@@ -0,0 +1,296 @@
+# tests/test_openai_cover_letter.py
+"""
+The LLM client against a local fake Responses API (tests/fake_openai.py),
+with injected latency and failures.
+
+    python -m pytest tests/test_openai_cover_letter.py -k ttfb -s   # prints the TTFB numbers
+"""
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.core import metrics
+from app.services import openai_cover_letter as llm
+from tests.fake_openai import FakeResponses
+
+CV = {"skills": ["Python", "FastAPI"], "experience": ["Built a FastAPI service handling 2k requests/s"]}
+
+
+@pytest.fixture
+def fake_llm(serve, monkeypatch):
+    fake = FakeResponses()
+    monkeypatch.setenv("OPENAI_BASE_URL", serve(fake.app()) + "/v1")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(llm, "OPENAI_RETRY_BASE_DELAY", 0.0)
+    # the client and the semaphore are bound to the event loop of the test that created them
+    monkeypatch.setattr(llm, "_client", None)
+    monkeypatch.setattr(llm, "_semaphore", None)
+    yield fake
+    llm._client = None
+    llm._semaphore = None
+
+
+def _generate():
+    return llm.generate_cover_letter_llm(CV, "Backend Engineer", "Acme", "Python APIs", "professional")
+
+
+async def _stream():
+    parts = []
+    async for delta in llm.stream_cover_letter_llm(CV, "Backend Engineer", "Acme", "Python APIs", "professional"):
+        parts.append(delta)
+    return parts
+
+
+def test_generate_returns_the_output_text(fake_llm):
+    assert asyncio.run(_generate()) == fake_llm.text
+    assert fake_llm.requests[0]["max_output_tokens"] == 350
+    assert "Title: Backend Engineer" in fake_llm.requests[0]["input"]
+
+
+def test_generate_retries_server_errors(fake_llm):
+    fake_llm.fail_first = 2
+    retries = metrics.get("llm_retries")
+
+    assert asyncio.run(_generate()) == fake_llm.text
+    assert len(fake_llm.requests) == 3
+    assert metrics.get("llm_retries") - retries == 2
+
+
+def test_generate_gives_up_after_max_retries(fake_llm, monkeypatch):
+    from openai import InternalServerError
+
+    monkeypatch.setattr(llm, "OPENAI_MAX_RETRIES", 1)
+    fake_llm.fail_first = 5
+    failures = metrics.get("llm_failures")
+
+    with pytest.raises(InternalServerError):
+        asyncio.run(_generate())
+    assert len(fake_llm.requests) == 2
+    assert metrics.get("llm_failures") - failures == 1
+
+
+def test_client_errors_are_not_retried(fake_llm):
+    from openai import BadRequestError
+
+    fake_llm.fail_first, fake_llm.status = 1, 400
+
+    with pytest.raises(BadRequestError):
+        asyncio.run(_generate())
+    assert len(fake_llm.requests) == 1
+
+
+def test_generate_times_out(fake_llm, monkeypatch):
+    from openai import APITimeoutError
+
+    monkeypatch.setattr(llm, "OPENAI_TIMEOUT", 0.2)
+    monkeypatch.setattr(llm, "OPENAI_MAX_RETRIES", 1)
+    fake_llm.delay = 1.0
+
+    with pytest.raises(APITimeoutError):
+        asyncio.run(_generate())
+    assert len(fake_llm.requests) == 2
+
+
+def test_concurrency_cap_rejects_instead_of_queueing(fake_llm, monkeypatch):
+    monkeypatch.setattr(llm, "OPENAI_MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(llm, "OPENAI_ACQUIRE_TIMEOUT", 0.05)
+    fake_llm.delay = 0.5
+    rejected = metrics.get("llm_rejected")
+
+    async def _two_calls():
+        return await asyncio.gather(_generate(), _generate(), return_exceptions=True)
+
+    results = asyncio.run(_two_calls())
+    assert results.count(fake_llm.text) == 1
+    assert sum(isinstance(r, llm.LLMBusyError) for r in results) == 1
+    assert len(fake_llm.requests) == 1
+    assert metrics.get("llm_rejected") - rejected == 1
+
+
+def test_stream_yields_deltas(fake_llm):
+    fake_llm.token_delay = 0.01
+
+    parts = asyncio.run(_stream())
+    assert len(parts) > 1
+    assert "".join(parts).strip() == fake_llm.text
+    assert fake_llm.requests[0]["stream"] is True
+
+
+def test_stream_retries_before_the_first_delta(fake_llm):
+    fake_llm.fail_first = 1
+
+    assert "".join(asyncio.run(_stream())).strip() == fake_llm.text
+    assert len(fake_llm.requests) == 2
+
+
+def test_stream_does_not_retry_after_the_first_delta(fake_llm):
+    fake_llm.fail_after_tokens = 3
+
+    with pytest.raises(Exception):
+        asyncio.run(_stream())
+    assert len(fake_llm.requests) == 1
+
+
+def _insert_cv(mongo, user_id):
+    cv_id = ObjectId()
+    asyncio.run(mongo["cvs"].insert_one({"_id": cv_id, "user_id": user_id, "created_at": datetime.utcnow(), **CV}))
+    return str(cv_id)
+
+
+def _request(cv_id):
+    from app.schemas.cover_letter_schema import CoverLetterRequest
+
+    return CoverLetterRequest(
+        cv_id=cv_id, job_id=str(ObjectId()), job_title="Backend Engineer", company="Acme", job_description="Python APIs"
+    )
+
+
+async def _stream_route(user_id, req):
+    from app.api.cover_letter_routes import generate_cover_letter_stream
+
+    response = await generate_cover_letter_stream(req, user_id)
+    events = []
+    async for chunk in response.body_iterator:
+        for block in chunk.strip().split("\n\n"):
+            event, data = block.split("\n", 1)
+            events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_route_uses_and_caches_the_llm_letter(fake_llm, mongo):
+    from app.api.cover_letter_routes import _generate_cover_letter
+
+    user_id = f"user-{uuid.uuid4()}"
+    req = _request(_insert_cv(mongo, user_id))
+
+    first = asyncio.run(_generate_cover_letter(user_id, req))
+    second = asyncio.run(_generate_cover_letter(user_id, req))
+
+    assert (first["mode"], first["cached"]) == ("openai", False)
+    assert (second["mode"], second["cached"]) == ("openai", True)
+    assert second["cover_letter"] == fake_llm.text
+    assert len(fake_llm.requests) == 1
+
+
+def test_route_falls_back_to_the_template_when_the_llm_fails(fake_llm, mongo):
+    from app.api.cover_letter_routes import _generate_cover_letter
+
+    fake_llm.fail_first = 10
+    user_id = f"user-{uuid.uuid4()}"
+    result = asyncio.run(_generate_cover_letter(user_id, _request(_insert_cv(mongo, user_id))))
+
+    assert result["mode"] == "template"
+    assert result["note"] == "OpenAI failed: InternalServerError"
+    assert result["cover_letter"]
+    assert asyncio.run(mongo["cover_letter_cache"].count_documents({})) == 0
+
+
+def test_stream_route_resets_to_the_template_on_a_mid_stream_failure(fake_llm, mongo):
+    fake_llm.fail_after_tokens = 3
+    user_id = f"user-{uuid.uuid4()}"
+
+    events = asyncio.run(_stream_route(user_id, _request(_insert_cv(mongo, user_id))))
+    names = [name for name, _ in events]
+
+    assert names[:3] == ["delta"] * 3
+    assert names[3] == "reset"
+    done = events[-1][1]
+    assert names[-1] == "done" and done["mode"] == "template"
+    assert done["cover_letter"] == "".join(data["text"] for name, data in events[4:] if name == "delta").strip()
+
+
+def test_empty_output_is_an_error(fake_llm):
+    fake_llm.text = ""
+
+    async def _both():
+        return await asyncio.gather(_generate(), _stream(), return_exceptions=True)
+
+    assert [type(r) for r in asyncio.run(_both())] == [llm.LLMEmptyResponseError] * 2
+
+
+def test_stream_route_falls_back_when_the_stream_is_empty(fake_llm, mongo):
+    fake_llm.text = ""
+    user_id = f"user-{uuid.uuid4()}"
+    req = _request(_insert_cv(mongo, user_id))
+
+    done = asyncio.run(_stream_route(user_id, req))[-1][1]
+
+    assert done["mode"] == "template"
+    assert done["note"] == "OpenAI failed: LLMEmptyResponseError"
+    assert done["cover_letter"]
+    assert asyncio.run(mongo["cover_letter_cache"].count_documents({})) == 0
+    saved = asyncio.run(mongo["cover_letters"].find_one({"user_id": user_id}))
+    assert (saved["mode"], saved["text"]) == ("template", done["cover_letter"])
+
+
+def test_a_failed_cache_write_keeps_the_llm_letter(fake_llm, mongo, monkeypatch):
+    from app.api import cover_letter_routes
+
+    async def broken_cache(key, text):
+        raise RuntimeError("cache collection unavailable")
+
+    monkeypatch.setattr(cover_letter_routes, "put_cached_cover_letter", broken_cache)
+    user_id = f"user-{uuid.uuid4()}"
+    cv_id = _insert_cv(mongo, user_id)
+
+    async def _both():
+        return (
+            await cover_letter_routes._generate_cover_letter(user_id, _request(cv_id)),
+            await _stream_route(user_id, _request(cv_id)),
+        )
+
+    result, events = asyncio.run(_both())
+
+    assert (result["mode"], result["note"], result["cover_letter"]) == ("openai", None, fake_llm.text)
+    assert "reset" not in [name for name, _ in events]
+    assert (events[-1][1]["mode"], events[-1][1]["cover_letter"]) == ("openai", fake_llm.text)
+
+
+def test_stream_ttfb_benchmark(fake_llm, mongo, serve):
+    # time to first byte of a letter: first SSE delta vs the JSON route's whole response
+    import httpx
+    from fastapi import FastAPI
+
+    from app.api.cover_letter_routes import router
+    from app.core.auth import get_current_user_id
+
+    fake_llm.text = " ".join(["word"] * 60)
+    fake_llm.token_delay = 0.01  # ~0.6s of generation
+    user_id = f"user-{uuid.uuid4()}"
+    body = _request(_insert_cv(mongo, user_id)).model_dump()
+    body["force_regenerate"] = True
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_current_user_id] = lambda: user_id
+    base = serve(app)
+
+    ttfb, stream_total, json_total = [], [], []
+    with httpx.Client(base_url=base, timeout=30) as client:
+        for _ in range(3):
+            start = time.perf_counter()
+            with client.stream("POST", "/cover-letter/generate/stream", json=body) as response:
+                chunks = response.iter_text()
+                first = next(chunks)
+                ttfb.append(time.perf_counter() - start)
+                text = first + "".join(chunks)
+            stream_total.append(time.perf_counter() - start)
+            assert first.startswith("event: delta")
+            assert '"mode": "openai"' in text.rsplit("event: done", 1)[1]
+
+            start = time.perf_counter()
+            assert client.post("/cover-letter/generate", json=body).json()["mode"] == "openai"
+            json_total.append(time.perf_counter() - start)
+
+    ms = lambda values: statistics.median(values) * 1000
+    print(f"\nstream: first delta {ms(ttfb):.0f}ms, done {ms(stream_total):.0f}ms; JSON route: {ms(json_total):.0f}ms")
+
+    # the first words arrive after a couple of tokens, not after the whole letter
+    assert ms(ttfb) < ms(json_total) / 4
+    assert ms(stream_total) < ms(json_total) * 1.5
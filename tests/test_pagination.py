@@ -0,0 +1,149 @@
+# tests/test_pagination.py
+import asyncio
+import base64
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException, Response
+
+from app.core.pagination import (
+    NEXT_CURSOR_HEADER,
+    build_projection,
+    decode_cursor,
+    encode_cursor,
+    fetch_page,
+    keyset_query,
+    set_next_cursor,
+)
+
+
+@pytest.mark.parametrize("created_at", [datetime(2026, 3, 1, 12, 30, 5, 123000), datetime(2026, 3, 1), None])
+def test_cursor_round_trip(created_at):
+    _id = ObjectId()
+    cursor = encode_cursor(created_at, _id)
+
+    assert "=" not in cursor and "/" not in cursor and "+" not in cursor
+    assert decode_cursor(cursor) == (created_at, _id)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor",
+        base64.urlsafe_b64encode(b"2026-03-01T00:00:00|not-an-object-id").decode(),
+        base64.urlsafe_b64encode(f"yesterday|{ObjectId()}".encode()).decode(),
+        base64.urlsafe_b64encode(b"no separator").decode(),
+    ],
+)
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as e:
+        decode_cursor(cursor)
+    assert e.value.status_code == 400
+
+
+def test_keyset_query():
+    query = {"user_id": "user-1"}
+    created_at, _id = datetime(2026, 3, 1), ObjectId()
+
+    assert keyset_query(query, None) is query
+    assert keyset_query(query, encode_cursor(created_at, _id)) == {
+        "user_id": "user-1",
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": _id}},
+            {"created_at": None},
+        ],
+    }
+    assert keyset_query(query, encode_cursor(None, _id)) == {
+        "user_id": "user-1",
+        "$or": [{"created_at": None, "_id": {"$lt": _id}}],
+    }
+
+
+def _seed(mongo):
+    base = datetime(2026, 3, 1)
+    docs = [{"_id": ObjectId(), "user_id": "user-1", "created_at": base + timedelta(minutes=i // 2)} for i in range(7)]
+    # legacy documents: created_at null, or missing (newer _id, so it comes first)
+    docs += [{"_id": ObjectId(), "user_id": "user-1", "created_at": None}, {"_id": ObjectId(), "user_id": "user-1"}]
+    docs += [{"_id": ObjectId(), "user_id": "user-2", "created_at": base}]
+    asyncio.run(mongo["items"].insert_many(docs))
+    dated = sorted((d for d in docs[:7]), key=lambda d: (d["created_at"], d["_id"]), reverse=True)
+    undated = sorted(docs[7:9], key=lambda d: d["_id"], reverse=True)
+    return [d["_id"] for d in dated + undated]
+
+
+def _all_pages(mongo, limit, projection=None):
+    async def _walk():
+        pages, after = [], None
+        while True:
+            items, after = await fetch_page(mongo["items"], {"user_id": "user-1"}, limit, after, projection)
+            pages.append(items)
+            if after is None:
+                return pages
+
+    return asyncio.run(_walk())
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 9, 50])
+def test_pages_cover_every_document_once_in_order(mongo, limit):
+    expected = _seed(mongo)
+
+    pages = _all_pages(mongo, limit)
+
+    assert [d["_id"] for page in pages for d in page] == expected
+    assert all(len(page) == limit for page in pages[:-1])
+    assert 0 < len(pages[-1]) <= limit
+
+
+def test_a_page_ending_on_an_undated_document(mongo):
+    # the 8th document has no created_at; it used to raise KeyError (a 500)
+    expected = _seed(mongo)
+
+    pages = _all_pages(mongo, 8, projection={"user_id": 1, "created_at": 1})
+
+    assert [len(page) for page in pages] == [8, 1]
+    assert "created_at" not in pages[0][-1]
+    assert [d["_id"] for page in pages for d in page] == expected
+
+
+def test_set_next_cursor():
+    response = Response()
+    set_next_cursor(response, None)
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+    set_next_cursor(response, "abc")
+    assert response.headers[NEXT_CURSOR_HEADER] == "abc"
+
+
+_ALWAYS = ("created_at", "cv_id")
+_ALLOWED = ("notes", "job_description", "job_url", "source")
+_SUMMARY = ("job_url", "source")
+
+
+@pytest.mark.parametrize(
+    "fields, summary, expected",
+    [
+        (None, False, ["created_at", "cv_id", "job_description", "job_url", "notes", "source"]),
+        (None, True, ["created_at", "cv_id", "job_url", "source"]),
+        ("notes", False, ["created_at", "cv_id", "notes"]),
+        # `fields` wins over `summary`; spaces and empty entries are ignored
+        (" source , notes,,", True, ["created_at", "cv_id", "notes", "source"]),
+        # naming an always-included field is allowed
+        ("cv_id,notes", False, ["created_at", "cv_id", "notes"]),
+    ],
+)
+def test_build_projection(fields, summary, expected):
+    projection = build_projection(fields, summary, _ALWAYS, _ALLOWED, _SUMMARY)
+
+    assert sorted(projection) == expected
+    assert set(projection.values()) == {1}
+
+
+def test_build_projection_rejects_unknown_fields():
+    with pytest.raises(HTTPException) as e:
+        build_projection("notes,salary,password", False, _ALWAYS, _ALLOWED, _SUMMARY)
+
+    assert e.value.status_code == 400
+    assert e.value.detail.startswith("Unknown fields: password, salary.")
+    assert "Allowed: job_description, job_url, notes, source" in e.value.detail
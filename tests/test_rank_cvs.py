@@ -0,0 +1,132 @@
+# tests/test_rank_cvs.py
+import asyncio
+import random
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.api import job_routes
+from app.schemas.job_match_schema import RankCvsRequest
+from app.services import cv_vectors, scoring_backends
+from app.services.cv_parser import cv_skill_fields
+from app.services.cv_repository import clear_cv_cache
+from app.services.tfidf_model import TfidfModelStore
+
+_TOPICS = {
+    "backend": "Python Django FastAPI PostgreSQL Redis APIs microservices Kafka Docker",
+    "frontend": "React TypeScript JavaScript CSS HTML Redux webpack accessibility components",
+    "data": "Spark Airflow SQL warehouse pipelines pandas dbt ETL analytics",
+}
+
+
+def _doc(topic, seed, words=60):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(_TOPICS[topic].split()) for _ in range(words))
+
+
+@pytest.fixture
+def model(tmp_path, monkeypatch):
+    store = TfidfModelStore(str(tmp_path / "tfidf_model.pkl"))
+    store.fit([_doc(topic, i) for topic in _TOPICS for i in range(30)])
+    monkeypatch.setattr(scoring_backends, "tfidf_store", store)
+    monkeypatch.setattr(cv_vectors, "tfidf_store", store)
+    clear_cv_cache()
+    yield store.current
+    clear_cv_cache()
+
+
+def _insert_cv(mongo, user_id, topic, seed, vector="current", skills="current"):
+    text = _doc(topic, seed)
+    doc = {
+        "_id": ObjectId(),
+        "user_id": user_id,
+        "file_name": f"{topic}.pdf",
+        "parsed_text": text,
+        "created_at": datetime.utcnow(),
+        **cv_skill_fields(text),
+    }
+    if vector == "current":
+        doc["vector"] = cv_vectors.compute_cv_vector(text)
+    elif vector == "stale":
+        doc["vector"] = {**cv_vectors.compute_cv_vector(text), "version": "tfidf-old"}
+    if skills == "stale":
+        doc.update(skills=["Python"], skill_ids=["python"], skills_version="old")
+    asyncio.run(mongo["cvs"].insert_one(doc))
+    return str(doc["_id"])
+
+
+def _rank(user_id, description, title="Engineer"):
+    payload = RankCvsRequest(job_title=title, company="Acme", job_description=description)
+    return asyncio.run(job_routes.rank_cvs_for_job(payload, user_id))
+
+
+def test_ranks_the_users_cvs_best_first(mongo, model):
+    ids = {topic: _insert_cv(mongo, "user-1", topic, seed=i) for i, topic in enumerate(_TOPICS)}
+    _insert_cv(mongo, "user-2", "backend", seed=10)
+
+    result = _rank("user-1", _doc("backend", 99))
+
+    assert result["count"] == 3
+    assert [r["cv_id"] for r in result["results"]][0] == ids["backend"]
+    assert {r["cv_id"] for r in result["results"]} == set(ids.values())
+    scores = [r["match_score"] for r in result["results"]]
+    assert scores == sorted(scores, reverse=True)
+    assert result["results"][0]["file_name"] == "backend.pdf"
+    assert "python" in result["job_skills"]
+
+    data_first = _rank("user-1", _doc("data", 98))
+    assert data_first["results"][0]["cv_id"] == ids["data"]
+
+
+def test_stale_vectors_are_recomputed_and_written_back(mongo, model, monkeypatch):
+    fresh = _insert_cv(mongo, "user-1", "frontend", seed=1)
+    stale = _insert_cv(mongo, "user-1", "backend", seed=2, vector="stale")
+    missing = _insert_cv(mongo, "user-1", "data", seed=3, vector=None)
+
+    loaded = []
+    get_texts = cv_vectors.get_cv_texts_for_user
+
+    async def recording_get_texts(user_id, cv_ids):
+        loaded.extend(cv_ids)
+        return await get_texts(user_id, cv_ids)
+
+    monkeypatch.setattr(cv_vectors, "get_cv_texts_for_user", recording_get_texts)
+
+    result = _rank("user-1", _doc("backend", 99))
+
+    # only the CVs whose vector can't be used had their text loaded
+    assert sorted(loaded) == sorted([stale, missing])
+    assert result["results"][0]["cv_id"] == stale
+
+    stored = {
+        str(doc["_id"]): doc["vector"]["version"]
+        for doc in asyncio.run(mongo["cvs"].find({"user_id": "user-1"}, {"vector.version": 1}).to_list(None))
+    }
+    assert stored == {fresh: model.version, stale: model.version, missing: model.version}
+
+    # scores match a ranking where every vector was current to begin with
+    loaded.clear()
+    assert _rank("user-1", _doc("backend", 99)) == result
+    assert loaded == []
+
+
+def test_outdated_skills_are_re_extracted(mongo, model):
+    cv_id = _insert_cv(mongo, "user-1", "backend", seed=1, skills="stale")
+
+    result = _rank("user-1", "FastAPI services on Docker")
+
+    doc = asyncio.run(mongo["cvs"].find_one({"_id": ObjectId(cv_id)}))
+    assert doc["skills_version"] != "old"
+    assert {"fastapi", "docker"} <= set(doc["skill_ids"])
+    assert result["job_skills"] == ["fastapi", "docker"]
+    assert set(result["results"][0]["overlapping_skills"]) == {"fastapi", "docker"}
+
+
+def test_no_cvs_and_empty_descriptions(mongo, model):
+    assert _rank("user-1", "Python developer") == {"count": 0, "job_skills": [], "results": []}
+
+    with pytest.raises(HTTPException) as e:
+        _rank("user-1", "   ")
+    assert e.value.status_code == 400
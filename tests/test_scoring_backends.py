@@ -0,0 +1,151 @@
+# tests/test_scoring_backends.py
+import random
+
+import pytest
+
+from app.services import scoring_backends
+from app.services.scoring_backends import (
+    Bm25Backend,
+    ScoringBackend,
+    backend_names,
+    get_scoring_backend,
+    register_backend,
+    scoring_weights,
+)
+from app.services.tfidf_model import TfidfModelStore
+
+_TOPICS = {
+    "backend": "python django fastapi postgres redis api microservices kafka docker",
+    "frontend": "react typescript javascript css html redux webpack accessibility components",
+    "data": "spark airflow sql warehouse pipelines pandas dbt etl analytics",
+}
+
+
+def _doc(topic, seed, words=80):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(_TOPICS[topic].split()) for _ in range(words))
+
+
+@pytest.fixture
+def corpus_store(tmp_path, monkeypatch):
+    store = TfidfModelStore(str(tmp_path / "tfidf_model.pkl"))
+    store.fit([_doc(topic, i) for topic in _TOPICS for i in range(30)])
+    monkeypatch.setattr(scoring_backends, "tfidf_store", store)
+    return store
+
+
+@pytest.fixture
+def no_model(tmp_path, monkeypatch):
+    store = TfidfModelStore(str(tmp_path / "missing.pkl"))
+    monkeypatch.setattr(scoring_backends, "tfidf_store", store)
+    return store
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    # registrations and cached instances made by a test don't leak into the others
+    monkeypatch.setattr(scoring_backends, "_factories", dict(scoring_backends._factories))
+    monkeypatch.setattr(scoring_backends, "_backends", {})
+
+
+def test_a_backend_must_implement_similarities():
+    class Incomplete(ScoringBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        ScoringBackend()
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+@pytest.mark.parametrize("store", ["corpus_store", "no_model"])
+def test_bm25_ranks_the_matching_document_first(store, request):
+    request.getfixturevalue(store)
+    query = "python fastapi postgres"
+    others = [_doc("frontend", 100), _doc("backend", 101), _doc("data", 102)]
+
+    scores = Bm25Backend().similarities(query, others)
+
+    assert len(scores) == 3
+    assert max(scores) == scores[1]
+    assert all(0.0 <= s <= 1.0 for s in scores)
+    assert scores[0] == scores[2] == 0.0
+
+
+def test_bm25_length_normalization(corpus_store):
+    short = "python fastapi " + _doc("frontend", 1, words=10)
+    long = "python fastapi " + _doc("frontend", 2, words=200)
+
+    normalized = Bm25Backend(b=0.75).similarities("python fastapi", [short, long])
+    flat = Bm25Backend(b=0.0).similarities("python fastapi", [short, long])
+
+    # same term counts: with b > 0 the shorter document wins, with b = 0 they tie
+    assert normalized[0] > normalized[1]
+    assert flat[0] == pytest.approx(flat[1])
+
+
+def test_bm25_edge_cases(corpus_store):
+    backend = Bm25Backend()
+
+    assert backend.similarities("python", []) == []
+    # no query term in the vocabulary
+    assert backend.similarities("zzz qqq", [_doc("backend", 1), _doc("data", 2)]) == [0.0, 0.0]
+    assert backend.version == f"bm25-{backend.k1}-{backend.b}-{corpus_store.version}"
+
+
+def test_bm25_version_without_a_corpus_model(no_model):
+    assert Bm25Backend(k1=1.5, b=0.5).version == "bm25-1.5-0.5-adhoc"
+
+
+@pytest.mark.parametrize(
+    "semantic, skill, expected",
+    [
+        (0.7, 0.3, (0.7, 0.3)),
+        (3.0, 1.0, (0.75, 0.25)),
+        (2.0, 2.0, (0.5, 0.5)),
+        (1.0, -1.0, (1.0, 0.0)),  # negative weights count as 0
+    ],
+)
+def test_scoring_weights_are_normalized(semantic, skill, expected, monkeypatch):
+    monkeypatch.setattr(scoring_backends, "SCORING_SEMANTIC_WEIGHT", semantic)
+    monkeypatch.setattr(scoring_backends, "SCORING_SKILL_WEIGHT", skill)
+
+    assert scoring_weights() == pytest.approx(expected)
+
+
+def test_scoring_weights_reject_a_zero_total(monkeypatch):
+    monkeypatch.setattr(scoring_backends, "SCORING_SEMANTIC_WEIGHT", 0.0)
+    monkeypatch.setattr(scoring_backends, "SCORING_SKILL_WEIGHT", -1.0)
+
+    with pytest.raises(ValueError):
+        scoring_weights()
+
+
+def test_registry_returns_one_instance_per_backend(registry, monkeypatch):
+    monkeypatch.setattr(scoring_backends, "SCORING_BACKEND", "bm25")
+
+    assert {"tfidf", "bm25", "embedding"} <= set(backend_names())
+    assert isinstance(get_scoring_backend(), Bm25Backend)
+    assert get_scoring_backend() is get_scoring_backend("bm25")
+    assert get_scoring_backend("tfidf").name == "tfidf"
+
+
+def test_registry_rejects_unknown_names(registry):
+    with pytest.raises(ValueError) as e:
+        get_scoring_backend("nope")
+    assert "nope" in str(e.value) and "bm25" in str(e.value)
+
+
+def test_register_backend(registry):
+    class Constant(ScoringBackend):
+        name = "constant"
+
+        def similarities(self, text, others, text_vector=None, other_vectors=None):
+            return [0.5] * len(others)
+
+    register_backend("constant", Constant)
+
+    assert "constant" in backend_names()
+    backend = get_scoring_backend("constant")
+    assert backend.version == "constant"
+    assert backend.similarities("a", ["b", "c"]) == [0.5, 0.5]
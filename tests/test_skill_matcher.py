@@ -0,0 +1,139 @@
+# tests/test_skill_matcher.py
+"""
+    python -m pytest tests/test_skill_matcher.py -k benchmark -s   # prints the large-description numbers
+"""
+import random
+import time
+
+import pytest
+
+from app.services.skill_matcher import SkillAutomaton
+from app.services.skill_taxonomy import load_taxonomy
+
+
+@pytest.fixture(scope="module")
+def taxonomy():
+    return load_taxonomy()
+
+
+@pytest.mark.parametrize(
+    "text, absent",
+    [
+        # the old substring scan matched inside words
+        ("Built a machine learning pipeline", "macos"),
+        ("Strong interest in people", "rest"),
+        ("Referee: William Jones", "iam"),
+        # plural folding is limited to an explicit map
+        ("Escalated to its support team", "it-support"),
+        ("Uses Macs", "macos"),
+    ],
+)
+def test_no_false_positives(taxonomy, text, absent):
+    assert absent not in taxonomy.extract_ids(text)
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        # keywords that a missing comma used to fuse ("awsit support")
+        ("AWS, IT support", ["aws", "it-support"]),
+        ("Skills: Microsoft Azure, Active Directory, Okta", ["azure", "active-directory", "okta"]),
+        ("Tools: Azure\nActive Directory", ["azure", "active-directory"]),
+        ("Azure Active Directory admin", ["azure-ad"]),
+        ("Mac and Windows support", ["macos", "windows"]),
+        ("Designed REST APIs", ["rest"]),
+        ("End-user support for 400 users", ["end-user-support"]),
+    ],
+)
+def test_extracts_expected_ids(taxonomy, text, expected):
+    assert taxonomy.extract_ids(text) == expected
+
+
+def test_phrases_do_not_span_separators():
+    automaton = SkillAutomaton(["active directory", "azure"])
+
+    assert automaton.extract("azure active directory") == ["azure", "active directory"]
+    assert automaton.extract("active; directory") == []
+    assert automaton.extract("active\r\ndirectory") == []
+    assert automaton.extract("active (directory)") == []
+
+
+def test_match_offsets():
+    automaton = SkillAutomaton(["node.js", "c++", "it support"])
+    text = "Node.js, C++ and IT-Support"
+
+    matches = automaton.find_all(text)
+    assert [(m.skill, text[m.start:m.end]) for m in matches] == [
+        ("node.js", "Node.js"),
+        ("c++", "C++"),
+        ("it support", "IT-Support"),
+    ]
+
+
+_FILLER = (
+    "the team will work with our customers to deliver high quality results "
+    "and strong collaboration across departments in a fast paced environment "
+    # words the substring scan misread as skills (rest, iam, it support)
+    "interest William escalated its support"
+).split()
+
+
+def _large_description(taxonomy, words, seed=0):
+    """
+    (text, ids of the skills placed in it): filler sentences with a skill
+    keyword as every ~50th word, set off by commas so phrases never join.
+    """
+    rng = random.Random(seed)
+    keywords = sorted(taxonomy._automaton.keywords)
+    out, placed = [], {}
+    for i in range(words):
+        if rng.random() < 0.02:
+            keyword = rng.choice(keywords)
+            out.append(f", {keyword},")
+            placed.setdefault(taxonomy.resolve(keyword), None)
+        else:
+            out.append(rng.choice(_FILLER) + ("." if i % 15 == 14 else ""))
+    return " ".join(out), set(placed)
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def test_large_description_benchmark(taxonomy):
+    keywords = sorted(taxonomy._automaton.keywords)
+
+    def substring_scan(text):
+        # the scan the automaton replaced
+        lowered = text.lower()
+        return {taxonomy.resolve(k) for k in keywords if k in lowered}
+
+    rows = []
+    for words in (1_000, 10_000, 50_000, 100_000):
+        text, placed = _large_description(taxonomy, words, seed=words)
+        automaton_ms, found = _timed(taxonomy.extract_ids, text)
+        scan_ms, scanned = _timed(substring_scan, text)
+
+        assert set(found) == placed
+        rows.append((words, len(text), automaton_ms, scan_ms, len(placed), len(scanned - placed)))
+
+    print(f"\n{'words':>7} {'chars':>8} {'automaton ms':>12} {'substring ms':>12} {'skills':>6} {'substring false +':>17}")
+    for row in rows:
+        print("{:>7} {:>8} {:>12.1f} {:>12.1f} {:>6} {:>17}".format(*row))
+
+    # linear in the text: the cost per character at 100k words stays near the 10k one
+    per_char = [ms / chars for _, chars, ms, *_ in rows]
+    assert per_char[-1] < max(per_char[1], 1e-4) * 5
+    # ~700 KB of description stays well under a second
+    assert rows[-1][2] < 1000
+
+
+def test_repeated_phrase_prefixes_stay_linear(taxonomy):
+    # "active active active ...": every token restarts the "active directory" branch
+    small_ms, _ = _timed(taxonomy.extract_ids, " ".join(["active"] * 5_000))
+    large_ms, found = _timed(taxonomy.extract_ids, " ".join(["active"] * 50_000) + " directory")
+
+    assert found == ["active-directory"]
+    assert large_ms < max(small_ms, 1.0) * 30
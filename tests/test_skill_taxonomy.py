@@ -0,0 +1,52 @@
+# tests/test_skill_taxonomy.py
+import json
+
+from app.services.skill_taxonomy import Skill, SkillTaxonomy, load_taxonomy
+
+
+def _skill(skill_id, name, *synonyms):
+    return Skill(id=skill_id, name=name, category=None, synonyms=synonyms)
+
+
+def test_partly_overlapping_matches_keep_the_leftmost():
+    taxonomy = SkillTaxonomy("test", [
+        _skill("google-workspace", "google workspace"),
+        _skill("workspace-admin", "workspace admin"),
+    ])
+
+    matches = taxonomy.find("google workspace admin")
+    assert [m.skill for m in matches] == ["google-workspace"]
+    assert taxonomy.extract_ids("workspace admin") == ["workspace-admin"]
+
+
+def test_longest_match_wins():
+    taxonomy = SkillTaxonomy("test", [
+        _skill("azure", "azure"),
+        _skill("active-directory", "active directory"),
+        _skill("azure-ad", "azure ad", "azure active directory"),
+    ])
+
+    assert taxonomy.extract_ids("Azure Active Directory") == ["azure-ad"]
+
+
+def test_synonyms_resolve_to_canonical_ids():
+    taxonomy = load_taxonomy()
+
+    assert taxonomy.resolve("GSuite") == "google-workspace"
+    assert taxonomy.resolve("O365") == "office-365"
+    assert taxonomy.canonicalize(["gsuite", "Google Workspace", "o365"]) == ["google-workspace", "office-365"]
+
+
+def test_version_changes_with_content(tmp_path):
+    path = tmp_path / "skills.json"
+    data = {"version": "1", "skills": [{"id": "python", "name": "python"}]}
+    path.write_text(json.dumps(data))
+    before = load_taxonomy(str(path)).version
+
+    # an edit without a "version" bump still gets a new version
+    data["skills"].append({"id": "sql", "name": "sql"})
+    path.write_text(json.dumps(data))
+    after = load_taxonomy(str(path)).version
+
+    assert before.startswith("1-") and after.startswith("1-")
+    assert before != after
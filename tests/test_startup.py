@@ -0,0 +1,47 @@
+# tests/test_startup.py
+"""
+Import-time budget for `import main` (cold interpreter, measured with -X importtime).
+
+    IMPORT_TIME_BUDGET_MS=1500 python -m pytest tests/test_startup.py
+"""
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "2000"))
+# imported on first use, never at startup
+LAZY_MODULES = ("sklearn", "scipy", "fitz", "openai", "motor", "httpx")
+
+_LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _import_main():
+    """
+    {top-level module: cumulative microseconds} for one `import main`.
+    """
+    env = {**os.environ, "MONGO_URI": os.environ.get("MONGO_URI", "mongodb://localhost:27017")}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+
+    modules = {}
+    for match in _LINE_RE.finditer(proc.stderr):
+        _, cumulative, _, name = match.groups()
+        modules[name] = int(cumulative)
+    return modules
+
+
+def test_heavy_libraries_are_not_imported_at_startup():
+    loaded = {name.split(".")[0] for name in _import_main()}
+    assert not loaded & set(LAZY_MODULES)
+
+
+def test_import_time_budget():
+    # best of three runs, so a busy CI host does not fail the build on noise
+    best_ms = min(_import_main()["main"] for _ in range(3)) / 1000
+    assert best_ms <= IMPORT_TIME_BUDGET_MS, f"import main took {best_ms:.0f}ms (budget {IMPORT_TIME_BUDGET_MS:.0f}ms)"
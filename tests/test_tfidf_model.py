@@ -0,0 +1,127 @@
+# tests/test_tfidf_model.py
+"""
+Corpus-fitted TF-IDF (transform only) vs the per-call two-document fit it
+replaced: per-match latency and score stability on a synthetic corpus.
+
+    python -m pytest tests/test_tfidf_model.py -s   # prints the numbers
+"""
+import random
+import statistics
+import time
+
+import pytest
+
+from app.services import scoring_backends
+from app.services.cv_vectors import compute_cv_vector
+from app.services.tfidf_model import TfidfModelStore, build_vectorizer
+
+_TOPICS = {
+    "backend": "python django fastapi postgres redis api microservices kafka docker kubernetes",
+    "frontend": "react typescript javascript css html redux webpack accessibility design components",
+    "data": "spark airflow sql warehouse pipelines pandas dbt etl analytics modeling",
+    "support": "helpdesk tickets windows active directory office365 networking printers onboarding",
+}
+_COMMON = "team experience work years company role responsible skills strong communication"
+
+
+def _doc(rng, topic, words=120):
+    pool = _TOPICS[topic].split() * 3 + _COMMON.split()
+    return " ".join(rng.choice(pool) for _ in range(words))
+
+
+@pytest.fixture
+def corpus_store(tmp_path, monkeypatch):
+    rng = random.Random(3)
+    store = TfidfModelStore(str(tmp_path / "tfidf_model.pkl"))
+    store.fit([_doc(rng, topic) for topic in _TOPICS for _ in range(100)])
+    monkeypatch.setattr(scoring_backends, "tfidf_store", store)
+    monkeypatch.setattr("app.services.cv_vectors.tfidf_store", store)
+    return store
+
+
+def _per_call_fit(cv_text, job_texts):
+    # the scoring before the corpus model: a throwaway fit on just these documents
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    matrix = build_vectorizer().fit_transform([cv_text, *job_texts])
+    return [float(s) for s in cosine_similarity(matrix[0:1], matrix[1:])[0]]
+
+
+def test_persisted_model_scores_the_same_after_reload(corpus_store):
+    rng = random.Random(5)
+    cv, jobs = _doc(rng, "backend"), [_doc(rng, topic) for topic in _TOPICS]
+    backend = scoring_backends.TfidfBackend()
+    scores = backend.similarities(cv, jobs)
+
+    reloaded = TfidfModelStore(corpus_store.path)
+    assert reloaded.current is None  # reading never loads; sync() does, on the scoring pool
+    assert reloaded.sync().version == corpus_store.version
+    assert (reloaded.current.vectorizer.transform(jobs) != corpus_store.current.vectorizer.transform(jobs)).nnz == 0
+    # a stored CV vector gives the same scores as vectorizing the CV text
+    assert backend.similarities(cv, jobs, text_vector=compute_cv_vector(cv)) == pytest.approx(scores)
+
+
+def test_current_never_blocks_or_reads_the_disk(corpus_store, monkeypatch):
+    from app.services import tfidf_model
+
+    monkeypatch.setattr(tfidf_model, "TFIDF_RELOAD_CHECK_SECONDS", 0)
+    model = corpus_store.current
+    other = TfidfModelStore(corpus_store.path)
+    other.fit([_doc(random.Random(i), "frontend") for i in range(30)])
+
+    with corpus_store._load_lock:  # e.g. a load running on the scoring pool
+        started = time.perf_counter()
+        assert corpus_store.current is model
+        assert corpus_store.version == model.version
+        assert time.perf_counter() - started < 0.01
+
+    # the other process's model is picked up by sync(), not by reading
+    assert corpus_store.sync().version == other.version
+    assert corpus_store.current.version == other.version
+
+
+def test_benchmark_latency_and_stability(corpus_store, matches=200):
+    rng = random.Random(7)
+    backend = scoring_backends.TfidfBackend()
+    cv = _doc(rng, "backend")
+    cv_vector = compute_cv_vector(cv)
+    jobs = [_doc(rng, topic) for topic in _TOPICS for _ in range(matches // len(_TOPICS))]
+
+    def _latencies(score):
+        times = []
+        for job in jobs:
+            started = time.perf_counter()
+            score(job)
+            times.append(time.perf_counter() - started)
+        return statistics.median(times) * 1000, sorted(times)[int(len(times) * 0.95)] * 1000
+
+    fitted = _latencies(lambda job: backend.similarities(cv, [job], text_vector=cv_vector))
+    per_call = _latencies(lambda job: _per_call_fit(cv, [job]))
+
+    # stability: a job's score must not depend on which other jobs are scored with it
+    def _drift(score):
+        alone = [score([job])[0] for job in jobs[:20]]
+        batched = score(jobs[:20] + jobs[-20:])[:20]
+        return max(abs(a - b) for a, b in zip(alone, batched))
+
+    fitted_drift = _drift(lambda js: backend.similarities(cv, js, text_vector=cv_vector))
+    per_call_drift = _drift(lambda js: _per_call_fit(cv, js))
+
+    # relevance: same-topic jobs should outrank the others
+    def _same_topic_first(score):
+        scores = score(jobs)
+        backend_jobs = set(range(matches // len(_TOPICS)))
+        top = sorted(range(len(jobs)), key=lambda i: scores[i], reverse=True)[: len(backend_jobs)]
+        return len(backend_jobs & set(top)) / len(backend_jobs)
+
+    print(
+        f"\nper match (median / p95): corpus model {fitted[0]:.2f} / {fitted[1]:.2f}ms, "
+        f"per-call fit {per_call[0]:.2f} / {per_call[1]:.2f}ms"
+        f"\nmax score drift alone vs batched: corpus model {fitted_drift:.4f}, per-call fit {per_call_drift:.4f}"
+        f"\nsame-topic precision: corpus model {_same_topic_first(lambda js: backend.similarities(cv, js, text_vector=cv_vector)):.2f}, "
+        f"per-call fit {_same_topic_first(lambda js: _per_call_fit(cv, js)):.2f}"
+    )
+
+    assert fitted[0] < per_call[0]
+    assert fitted_drift < 1e-9
+    assert per_call_drift > 0.01